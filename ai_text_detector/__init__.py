@@ -1,9 +1,25 @@
 __all__ = [
+    "admission",
+    "bundle",
     "cli",
     "config",
+    "corpus",
     "datasets",
+    "dedup",
+    "distill",
+    "embeddings",
     "evaluate",
+    "hashing",
+    "jobs",
+    "linear",
     "models",
+    "packing",
+    "pipeline",
+    "profiling",
+    "scheduler",
+    "scores",
+    "serving",
+    "splits",
     "train",
     "utils",
 ]
@@ -0,0 +1,88 @@
+"""
+Admission control in front of a `PriorityScheduler`.
+
+Before a request is queued, its wait is estimated from the scheduler's queue
+depth and recent time per batch. A request that can't be answered within its
+class's wait budget is rejected immediately with a Retry-After hint. This
+beats letting it sit in the queue until the client times out. Under moderate
+pressure requests can instead be scored with a shorter `max_length`, which is
+cheaper.
+"""
+import math
+import threading
+from collections import namedtuple
+
+Decision = namedtuple("Decision", ["admitted", "status", "retry_after", "max_length", "reason", "estimated_wait"])
+
+class AdmissionController:
+    """
+    Args:
+        scheduler: A `PriorityScheduler`.
+        max_wait: Mapping of priority class -> wait budget in seconds.
+        max_queue: Hard cap on queued texts across all classes (503 above it).
+        degrade_at: Fraction of the wait budget above which requests are
+            scored with `degraded_max_length` instead.
+        degraded_max_length: Token limit used under pressure (None disables).
+    """
+    def __init__(self, scheduler, max_wait=None, max_queue=2000, degrade_at=0.5, degraded_max_length=None):
+        self.scheduler = scheduler
+        self.max_wait = dict(max_wait or {"interactive": 2.0, "bulk": 120.0})
+        self.max_queue = max_queue
+        self.degrade_at = degrade_at
+        self.degraded_max_length = degraded_max_length
+        self._lock = threading.Lock()
+        self._counts = {name: {"admitted": 0, "degraded": 0, "shed_wait": 0, "shed_queue": 0}
+                        for name in scheduler.classes}
+
+    def estimated_wait(self, priority, n_texts=1) -> float:
+        """Seconds until `n_texts` more texts of class `priority` would be scored."""
+        # The scheduler serves classes in priority order, so only work at this
+        # priority or higher is ahead; +1 batch for whatever is running now
+        names = list(self.scheduler.classes)
+        ahead = sum(self.scheduler.queue_depth(n) for n in names[:names.index(priority) + 1])
+        batches = math.ceil((ahead + n_texts) / self.scheduler.max_batch_size) + 1
+        return batches * self.scheduler.batch_seconds()
+
+    def admit(self, priority, n_texts=1, max_length=768) -> Decision:
+        """Decide whether to queue a request; `max_length` may come back reduced."""
+        if priority not in self._counts:
+            raise ValueError(f"Unknown priority class {priority!r}; expected one of {list(self._counts)}")
+        budget = self.max_wait.get(priority, math.inf)
+        wait = self.estimated_wait(priority, n_texts)
+        queued = self.scheduler.queue_depth()
+        counts = self._counts[priority]
+
+        if queued + n_texts > self.max_queue:
+            with self._lock:
+                counts["shed_queue"] += 1
+            retry = max(1, math.ceil(wait))
+            return Decision(False, 503, retry, max_length, "queue full", wait)
+        if wait > budget:
+            with self._lock:
+                counts["shed_wait"] += 1
+            # Roughly when the work ahead will have drained below the budget
+            retry = max(1, math.ceil(wait - budget))
+            return Decision(False, 429, retry, max_length, "estimated wait over budget", wait)
+
+        degraded = (self.degraded_max_length is not None and self.degraded_max_length < max_length
+                    and wait > self.degrade_at * budget)
+        with self._lock:
+            counts["admitted"] += 1
+            if degraded:
+                counts["degraded"] += 1
+        return Decision(True, 200, 0, self.degraded_max_length if degraded else max_length,
+                        "degraded" if degraded else "ok", wait)
+
+    def stats(self):
+        """Per-class counters, current wait estimate and budget (ms)."""
+        with self._lock:
+            counts = {name: dict(c) for name, c in self._counts.items()}
+        for name, c in counts.items():
+            c["estimated_wait_ms"] = self.estimated_wait(name, 1) * 1000
+            c["wait_budget_ms"] = self.max_wait[name] * 1000 if name in self.max_wait else None
+            c["queued_texts"] = self.scheduler.queue_depth(name)
+        return {
+            "max_queue": self.max_queue,
+            "degraded_max_length": self.degraded_max_length,
+            "classes": counts,
+        }
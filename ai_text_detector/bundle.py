@@ -0,0 +1,175 @@
+"""
+Fast-load model bundles.
+
+A bundle is one directory holding everything needed to serve a detector:
+
+* ``model.safetensors`` - weights
+* ``config.json``       - backbone config
+* tokenizer files
+* ``bundle.json``       - manifest (architecture, head type, dtype, source)
+
+`load_bundle` maps the safetensors file into memory copy-on-write and builds
+the model around those pages in one step, instead of probing
+`from_pretrained` / `cached_file` and copying weights into private memory.
+Processes that load the same bundle share the page cache for the weights.
+"""
+import os
+import sys
+import json
+import mmap
+import struct
+import subprocess
+from contextlib import nullcontext
+import torch
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
+from .models import DetectorModel, DesklibAIDetectionModel
+from .scores import save_calibration
+
+BUNDLE_MANIFEST = "bundle.json"
+WEIGHTS_NAME = "model.safetensors"
+BUNDLE_FORMAT = "ai-detector-bundle"
+BUNDLE_VERSION = 1
+
+_SAFETENSORS_DTYPES = {
+    "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+    "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8,
+    "U8": torch.uint8, "BOOL": torch.bool,
+}
+
+def is_bundle_dir(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, BUNDLE_MANIFEST))
+
+def write_bundle(detector: DetectorModel, path: str) -> str:
+    """Write `detector` as a bundle directory and return its path."""
+    from safetensors.torch import save_model
+    os.makedirs(path, exist_ok=True)
+    model = detector.model
+    # save_model de-duplicates tied/shared tensors, which save_file rejects
+    save_model(model, os.path.join(path, WEIGHTS_NAME))
+    model.config.save_pretrained(path)
+    detector.tokenizer.save_pretrained(path)
+
+    dtype = next(model.parameters()).dtype
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "architecture": "desklib" if detector.use_desklib else "sequence_classification",
+        "head": "mean_pool_linear" if detector.use_desklib else "sequence_classification",
+        "model_type": model.config.model_type,
+        "num_labels": 1 if detector.use_desklib else model.config.num_labels,
+        "dtype": str(dtype).replace("torch.", ""),
+        "source": detector.model_name,
+        "weights": WEIGHTS_NAME,
+    }
+    with open(os.path.join(path, BUNDLE_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    save_calibration(detector.calibration, path)
+    return path
+
+def mmap_safetensors(path: str) -> dict:
+    """
+    Zero-copy view of a safetensors file: every tensor is backed by a
+    copy-on-write mmap of the file rather than by private memory.
+    """
+    with open(path, "rb") as f:
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len))
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    base = 8 + header_len
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = _SAFETENSORS_DTYPES[info["dtype"]]
+        start, end = info["data_offsets"]
+        if end == start:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        count = (end - start) // torch.empty((), dtype=dtype).element_size()
+        tensors[name] = torch.frombuffer(buf, dtype=dtype, count=count,
+                                         offset=base + start).reshape(info["shape"])
+    return tensors
+
+def _skip_init():
+    # Random init is wasted work when every weight is about to be replaced
+    try:
+        from transformers.modeling_utils import no_init_weights
+        return no_init_weights()
+    except ImportError:
+        return nullcontext()
+
+def _untied_missing_keys(model, missing_keys) -> list:
+    """Missing keys that tie_weights() didn't point at a loaded tensor (those would stay uninitialized)."""
+    params = model.state_dict(keep_vars=True)
+    missing = set(missing_keys)
+    loaded = {params[k].data_ptr() for k in params if k not in missing}
+    return [k for k in missing_keys if params[k].data_ptr() not in loaded]
+
+def load_bundle(path: str) -> DetectorModel:
+    """Load a bundle written by `write_bundle`."""
+    with open(os.path.join(path, BUNDLE_MANIFEST), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT or manifest.get("version", 0) > BUNDLE_VERSION:
+        raise ValueError(f"Unsupported bundle in {path}: {manifest.get('format')} v{manifest.get('version')}")
+
+    use_desklib = manifest["architecture"] == "desklib"
+    config = AutoConfig.from_pretrained(path)
+    with _skip_init():
+        if use_desklib:
+            model = DesklibAIDetectionModel(config)
+        else:
+            model = AutoModelForSequenceClassification.from_config(config)
+
+    state_dict = mmap_safetensors(os.path.join(path, manifest["weights"]))
+    try:
+        # assign=True keeps the mmap-backed tensors instead of copying into the fresh ones
+        result = model.load_state_dict(state_dict, strict=False, assign=True)
+    except TypeError:  # torch < 2.1
+        result = model.load_state_dict(state_dict, strict=False)
+    model.tie_weights()
+    if result.unexpected_keys:
+        raise ValueError(f"Bundle weights don't match the architecture: {result.unexpected_keys[:5]}")
+    missing = _untied_missing_keys(model, result.missing_keys)
+    if missing:
+        raise ValueError(f"Bundle in {path} is missing weights: {missing[:5]}")
+    model.eval()
+
+    tokenizer = AutoTokenizer.from_pretrained(path, use_fast=True)
+    return DetectorModel.from_parts(model, tokenizer, use_desklib=use_desklib, model_name=path)
+
+_MEASURE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from ai_text_detector.models import DetectorModel
+import os
+path = sys.argv[1]
+model = DetectorModel.load(path) if os.path.isdir(path) else DetectorModel(path)
+model.predict("warm-up text", max_length=32)
+elapsed = time.perf_counter() - start
+mem = {}
+try:
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                mem[key] = int(value.split()[0]) * 1024
+except OSError:
+    from ai_text_detector.profiling import current_rss_bytes
+    mem["VmRSS"] = current_rss_bytes()
+print("MEASURE " + json.dumps({"seconds": elapsed, **mem}))
+"""
+
+def measure_cold_start(path: str) -> dict:
+    """
+    Load `path` (bundle, saved model dir or Hub name) in a fresh interpreter and
+    return its cold-start seconds and RSS (split into private/file-backed on Linux).
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _MEASURE_SCRIPT, path],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("MEASURE "):
+            return json.loads(line[len("MEASURE "):])
+    raise RuntimeError(f"Measurement failed: {result.stderr}")
@@ -1,29 +1,426 @@
+import os
+import time
 import argparse
-from sklearn.model_selection import train_test_split
 from .config import load_config
-from .datasets import DatasetLoader
-from .models import DetectorModel
-from .train import build_trainer
-from .evaluate import evaluate
+from .profiling import build_profiler, add_profile_arguments
+
+# Heavy dependencies (pandas, sklearn, torch, transformers) are imported inside
+# the subcommands that need them, so `ai-detector --help` starts instantly.
+# scripts/check_import_time.py holds the startup budget.
+
+DEFAULT_MODEL = "desklib/ai-text-detector-v1.01"
+
+BENCH_TEXTS = [
+    "The sunset painted the sky in hues of crimson and gold, casting long shadows across the meadow.",
+    "I went to the store yesterday and bought some milk and bread. It was a nice sunny day.",
+    "The implementation leverages advanced neural architecture search techniques to optimize model performance.",
+    "AI detection refers to the process of identifying whether a given piece of content has been generated by artificial intelligence.",
+]
+
+def _load_detector(model_path: str):
+    # Linear models are dispatched before models.py, so serving them never imports torch
+    from .linear import is_linear_model_dir
+    if is_linear_model_dir(model_path):
+        from .linear import LinearDetector
+        from .scores import attach_calibration
+        return attach_calibration(LinearDetector.load(model_path), model_path)
+    from .models import DetectorModel
+    if os.path.isdir(model_path):
+        return DetectorModel.load(model_path)
+    return DetectorModel(model_name=model_path)
+
+def _serving_detector(args):
+    """
+    Load `--model-path`, with length escalation if `--short-length` is given
+    and wrapped in a cascade if `--first-stage` is given (both may be combined:
+    the cascade's second stage is then the length-escalating model).
+    """
+    model = _load_detector(args.model_path)
+    low, high = getattr(args, "band", (0.1, 0.9))
+    if getattr(args, "short_length", None):
+        from .models import AdaptiveLengthDetector
+        if not hasattr(model, "logits_and_lengths"):
+            raise SystemExit(f"❌ --short-length needs a transformer model; {args.model_path} "
+                             f"is a {type(model).__name__}, which has no token lengths to escalate on.")
+        model = AdaptiveLengthDetector(model, short_length=args.short_length, low=low, high=high)
+    if getattr(args, "first_stage", None):
+        from .models import CascadeDetector
+        model = CascadeDetector(_load_detector(args.first_stage), model, low=low, high=high)
+    return model
+
+def _print_escalation_stats(model):
+    if hasattr(model, "stats"):
+        stats = model.stats()
+        print(f"🪜 Escalation: {stats['stage1_answered']:,} answered by first pass, "
+              f"{stats['escalated']:,} escalated ({stats['escalation_rate']:.1%}); "
+              f"stage1={stats['stage1_seconds']:.2f}s stage2={stats['stage2_seconds']:.2f}s")
+        if stats["tokens"]:
+            print(f"   Avg tokens processed per text: {stats['avg_tokens_per_text']:.1f}")
+
+def _add_escalation_arguments(parser):
+    parser.add_argument("--first-stage", help="Cheap first-stage model; uncertain texts escalate to --model-path.")
+    parser.add_argument("--short-length", type=int,
+                        help="Score this many tokens first; re-score at --max-length only if uncertain.")
+    parser.add_argument("--band", nargs=2, type=float, default=[0.1, 0.9], metavar=("LOW", "HIGH"),
+                        help="Probabilities in [LOW, HIGH] count as uncertain and escalate (default: 0.1 0.9).")
+
+def _add_pipeline_arguments(parser):
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Tokenize the next batch in parallel with the model running the current one.")
+    parser.add_argument("--tokenizer-threads", type=int, default=1, help="Tokenizer workers for --pipeline.")
+
+def _near_dedup(df, cfg):
+    from .dedup import find_near_duplicates
+    keep, pairs = find_near_duplicates(df["text"], threshold=cfg.near_dup_threshold)
+    print(f"🧹 Removed {len(pairs):,} near-duplicate texts (similarity >= {cfg.near_dup_threshold}); "
+          f"{int(keep.sum()):,} left")
+    return df[keep].reset_index(drop=True)
+
+def _split(df, cfg, data_path):
+    # Persisted, content-hash based split (see splits.py): same texts, same split every run
+    from .splits import train_val_split
+    train_df, val_df = train_val_split(df, data_path, val_fraction=cfg.val_fraction, seed=cfg.seed)
+    print(f"✂️  Split: {len(train_df):,} train / {len(val_df):,} validation")
+    if cfg.leakage_check:
+        from .dedup import report_leakage
+        report_leakage(train_df, val_df, threshold=cfg.near_dup_threshold)
+    return train_df, val_df
+
+def train_linear(df, cfg, data_path):
+    from .evaluate import evaluate_detector
+    from .linear import LinearDetector
+    train_df, val_df = _split(df, cfg, data_path)
+    start = time.perf_counter()
+    model = LinearDetector(n_features=cfg.linear_n_features, C=cfg.linear_c)
+    model.fit(train_df["text"].tolist(), train_df["label"].tolist())
+    print(f"⏱️  Fit in {time.perf_counter() - start:.1f}s on {len(train_df):,} texts")
+    evaluate_detector(model, val_df, batch_size=1024)
+    model.save(cfg.save_dir)
+    print(f"✅ Training complete. Model saved to: {cfg.save_dir}")
 
 def train_command(args):
+    from .datasets import DatasetLoader
     cfg = load_config(args.config)
+    if args.model_type:
+        cfg.model_type = args.model_type
     loader = DatasetLoader(model_name=cfg.base_model, max_length=cfg.max_length)
     df = loader.load(args.data)
-    train_df, val_df = train_test_split(df, test_size=0.2, random_state=cfg.seed, stratify=df["label"])
+    if args.near_dedup:
+        cfg.near_dedup = True
+    if args.no_leakage_check:
+        cfg.leakage_check = False
+    if cfg.near_dedup:
+        df = _near_dedup(df, cfg)
+    if cfg.model_type == "linear":
+        return train_linear(df, cfg, args.data)
+
+    from .models import DetectorModel
+    from .train import build_trainer
+    train_df, val_df = _split(df, cfg, args.data)
 
     model = DetectorModel(model_name=cfg.base_model)
-    trainer = build_trainer(model.model, model.tokenizer, train_df, val_df, cfg)
-    trainer.train()
+    profiler = build_profiler(args)
+    trainer = build_trainer(model.model, model.tokenizer, train_df, val_df, cfg,
+                            profiler=profiler if args.profile else None)
+    with profiler:
+        trainer.train()
     model.save(cfg.save_dir)
     print(f"✅ Training complete. Model saved to: {cfg.save_dir}")
 
 def eval_command(args):
+    from .datasets import DatasetLoader
+    from .evaluate import evaluate, evaluate_detector
+    from .scores import score_meta, model_fingerprint
     cfg = load_config(args.config)
-    model = DetectorModel.load(args.model_path)
-    loader = DatasetLoader(model_name=model.model_name, max_length=cfg.max_length)
-    df = loader.load(args.data)
-    evaluate(model.model, model.tokenizer, df, max_length=cfg.max_length)
+    model = _load_detector(args.model_path)
+    # Only the data is needed here; the loader's tokenizer is never built
+    df = DatasetLoader(max_length=cfg.max_length).load(args.data)
+    if args.split != "all":
+        from .splits import select_split
+        df = select_split(df, args.data, args.split, val_fraction=cfg.val_fraction, seed=cfg.seed)
+        print(f"✂️  Evaluating on the {args.split} split: {len(df):,} texts")
+    meta = None
+    if args.scores:
+        # Rows already scored by this exact model (same fingerprint) are reused, not re-run
+        meta = score_meta(model, max_length=cfg.max_length, data_path=args.data, split=args.split,
+                          fingerprint=model_fingerprint(args.model_path, cfg.max_length))
+    reuse = not args.rescore
+    if args.pipeline and hasattr(model, "model"):
+        from .pipeline import PipelinedScorer
+        from .evaluate import report, score_rows
+        scorer = PipelinedScorer(model, batch_size=cfg.batch_size, max_length=cfg.max_length,
+                                 tokenizer_threads=args.tokenizer_threads)
+        with build_profiler(args, expected_steps=-(-len(df) // cfg.batch_size)) as profiler:
+            probs = score_rows(df, lambda texts: [p for p, _ in scorer.predict_batch(texts, profiler=profiler)],
+                               args.scores, meta, reuse)
+        report(df["label"].to_numpy(), (probs >= 0.5).astype(int))
+        print(scorer.format_stats())
+        return
+    if not hasattr(model, "model"):
+        # Torch-free detectors (LinearDetector) go through their predict API
+        return evaluate_detector(model, df, max_length=cfg.max_length,
+                                 batch_size=cfg.batch_size,
+                                 profiler=build_profiler(args, expected_steps=-(-len(df) // cfg.batch_size)),
+                                 scores_path=args.scores, scores_meta=meta, reuse=reuse)
+    evaluate(model.model, model.tokenizer, df, max_length=cfg.max_length,
+             batch_size=cfg.batch_size, profiler=build_profiler(args, expected_steps=-(-len(df) // cfg.batch_size)),
+             calibration=model.calibration,
+             scores_path=args.scores, scores_meta=meta, reuse=reuse)
+
+def predict_command(args):
+    from .datasets import load_texts
+    texts = list(args.text or [])
+    if args.input:
+        texts.extend(load_texts(args.input))
+    if not texts:
+        raise SystemExit("Nothing to score: pass --text and/or --input.")
+
+    model = _serving_detector(args)
+    # Only plain transformer detectors can be pipelined (wrappers/linear models can't)
+    pipelined = args.pipeline and hasattr(model, "_ai_logits")
+    if pipelined:
+        from .pipeline import PipelinedScorer
+        model = PipelinedScorer(model, batch_size=args.batch_size, max_length=args.max_length,
+                                tokenizer_threads=args.tokenizer_threads)
+    results = []
+    with build_profiler(args, expected_steps=-(-len(texts) // args.batch_size)) as profiler:
+        if pipelined:
+            results = model.predict_batch(texts, threshold=args.threshold, profiler=profiler)
+            print(model.format_stats())
+        else:
+            for start in range(0, len(texts), args.batch_size):
+                batch = texts[start:start + args.batch_size]
+                results.extend(model.predict_batch(batch, max_length=args.max_length,
+                                                   threshold=args.threshold, batch_size=args.batch_size))
+                profiler.step()
+
+    if args.output:
+        import pandas as pd
+        pd.DataFrame({
+            "text": texts,
+            "ai_probability": [p for p, _ in results],
+            "label": [l for _, l in results],
+        }).to_csv(args.output, index=False)
+        print(f"✅ Wrote {len(results):,} predictions to: {args.output}")
+    elif not args.scores:
+        for text, (prob, label) in zip(texts, results):
+            name = "AI-generated" if label == 1 else "Human-written"
+            print(f"{prob:.4f}\t{name}\t{text[:80]}")
+    if args.scores:
+        from .scores import write_scores, score_meta
+        write_scores(args.scores, [p for p, _ in results], texts=texts,
+                     meta=score_meta(getattr(model, "detector", model), max_length=args.max_length,
+                                     data_path=args.input))
+    _print_escalation_stats(model)
+
+def report_command(args):
+    from .scores import summarize, print_report, write_curves, PlattCalibrator, calibration_bins, read_scores
+    summary = summarize(args.scores, threshold=args.threshold, n_bins=args.bins, optimize=args.optimize)
+    print_report(summary)
+    if args.curves:
+        if "sweep" not in summary:
+            raise SystemExit("❌ No labeled rows: nothing to sweep.")
+        write_curves(summary, args.curves)
+    if not args.fit_calibrator:
+        return
+
+    if "sweep" not in summary:
+        raise SystemExit("❌ No labeled rows: a calibrator needs labels (use `eval --scores`).")
+    model_dir = args.model_path or summary["meta"].get("model")
+    if not model_dir or not os.path.isdir(model_dir):
+        raise SystemExit("❌ Pass --model-path: the directory to save calibration.json in.")
+    cols, meta = read_scores(args.scores, columns=["probability", "label"])
+    labeled = cols["label"] >= 0
+    y, p = cols["label"][labeled], cols["probability"][labeled]
+    fitted = PlattCalibrator.fit(y, p)
+    fitted.meta["fitted_on"] = args.scores
+    # Scores written by a calibrated model: save the composition, which maps raw logits directly
+    previous = meta.get("calibration")
+    calibrator = PlattCalibrator.from_dict(previous).then(fitted) if previous else fitted
+    after = calibration_bins(y, fitted.apply(p), n_bins=args.bins)
+    print(f"🌡️  Platt calibrator a={calibrator.a:.4f} b={calibrator.b:.4f}: "
+          f"ECE {summary['calibration']['ece']:.4f} -> {after['ece']:.4f}, "
+          f"Brier {summary['calibration']['brier']:.4f} -> {after['brier']:.4f}")
+    if meta.get("split") != "val":
+        print("⚠️  Fitted on scores that aren't from the validation split; "
+              "use `eval --split val --scores ...` for an unbiased calibrator.")
+    print(f"💾 Saved to: {calibrator.save(model_dir)} (applied whenever this model is loaded)")
+
+def bench_command(args):
+    import numpy as np
+    from .datasets import load_texts
+    texts = load_texts(args.data) if args.data else BENCH_TEXTS
+    texts = (texts * (args.n // len(texts) + 1))[:args.n]
+    model = _serving_detector(args)
+    if args.packed and not (hasattr(model, "predict_packed") and model.use_desklib):
+        raise SystemExit("❌ --packed needs a plain Desklib model: no --first-stage/--short-length "
+                         "wrappers and not the linear baseline.")
+
+    # Warm-up so the first timed call doesn't pay for lazy allocations
+    model.predict_batch(texts[:args.batch_size], max_length=args.max_length, batch_size=args.batch_size)
+
+    latencies = []
+    start = time.perf_counter()
+    with build_profiler(args, expected_steps=-(-len(texts) // args.batch_size)) as profiler:
+        for i in range(0, len(texts), args.batch_size):
+            t0 = time.perf_counter()
+            model.predict_batch(texts[i:i + args.batch_size], max_length=args.max_length,
+                                batch_size=args.batch_size)
+            latencies.append(time.perf_counter() - t0)
+            profiler.step()
+    elapsed = time.perf_counter() - start
+
+    lat_ms = np.array(latencies) * 1000
+    print(f"📊 {len(texts):,} texts, batch_size={args.batch_size}, max_length={args.max_length}")
+    print(f"   Throughput: {len(texts) / elapsed:.1f} texts/s")
+    print(f"   Batch latency p50={np.percentile(lat_ms, 50):.1f}ms "
+          f"p95={np.percentile(lat_ms, 95):.1f}ms max={lat_ms.max():.1f}ms")
+    _print_escalation_stats(model)
+
+    if args.packed:
+        _bench_packed(model, texts, args)
+
+def _bench_packed(model, texts, args):
+    """Parity check of packed inference against `predict`, plus packed vs padded throughput."""
+    import numpy as np
+    # Reference: each text scored alone, exactly as `predict` serves it
+    reference = np.array([model.predict(t, max_length=args.max_length)[0] for t in texts])
+    start = time.perf_counter()
+    packed = np.array([p for p, _ in model.predict_packed(texts, max_length=args.max_length,
+                                                          pack_length=args.pack_length)])
+    packed_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    model.predict_batch(texts, max_length=args.max_length, batch_size=args.batch_size)
+    padded_seconds = time.perf_counter() - start
+
+    max_diff = float(np.abs(reference - packed).max())
+    print(f"📦 Packed (pack_length={args.pack_length}): {len(texts) / packed_seconds:.1f} texts/s "
+          f"vs padded {len(texts) / padded_seconds:.1f} texts/s")
+    print(f"   Parity with predict: max |Δprob| = {max_diff:.2e}, "
+          f"label agreement {np.mean((reference >= 0.5) == (packed >= 0.5)):.2%}")
+    if max_diff > args.parity_tolerance:
+        raise SystemExit(f"❌ Packed inference differs from predict by {max_diff:.2e} "
+                         f"(tolerance {args.parity_tolerance:.0e})")
+
+def distill_command(args):
+    from .datasets import DatasetLoader, load_texts
+    from .distill import cached_teacher_logits, build_student, train_student, compare
+    cfg = load_config(args.config)
+    if args.student:
+        cfg.distill_student = args.student
+    texts = load_texts(args.data)
+    if not texts:
+        raise SystemExit(f"❌ No texts in {args.data}.")
+
+    teacher = _load_detector(args.teacher)
+    logits = cached_teacher_logits(teacher, texts, cfg.distill_cache_dir,
+                                   max_length=cfg.max_length, batch_size=cfg.batch_size)
+    student = build_student(teacher, cfg.distill_student, cfg.distill_layers)
+    train_student(student, texts, logits, cfg)
+    student.save(args.output)
+    print(f"✅ Student saved to: {args.output}")
+
+    if args.eval_data:
+        # The shallow student's name isn't a Hub id; only the data is needed anyway
+        df = DatasetLoader(model_name=teacher.model_name, max_length=cfg.max_length).load(args.eval_data)
+        eval_texts, labels = df["text"].tolist(), df["label"].tolist()
+    else:
+        eval_texts, labels = texts[:256], None
+    if not eval_texts:
+        raise SystemExit(f"❌ No texts in {args.eval_data}.")
+    report = compare(teacher, student, eval_texts, labels,
+                     max_length=cfg.max_length, batch_size=cfg.batch_size)
+    print(f"⚡ Speedup: {report['speedup']:.1f}x "
+          f"({report['teacher_ms_per_text']:.1f}ms -> {report['student_ms_per_text']:.1f}ms per text)")
+    print(f"🤝 Agreement with teacher: {report['agreement_with_teacher']:.2%}")
+    if labels is not None:
+        print(f"🎯 Accuracy: teacher={report['teacher_accuracy']:.4f} student={report['student_accuracy']:.4f}")
+
+def embed_command(args):
+    from .datasets import DatasetLoader
+    from .embeddings import build_embeddings
+    cfg = load_config(args.config)
+    detector = _load_detector(args.model_path)
+    df = DatasetLoader(max_length=cfg.max_length).load(args.data)
+    build_embeddings(detector, df, args.output or cfg.embeddings_dir, data_path=args.data,
+                     max_length=args.max_length or cfg.max_length, batch_size=args.batch_size or cfg.batch_size,
+                     val_fraction=cfg.val_fraction, seed=cfg.seed)
+
+def train_head_command(args):
+    import numpy as np
+    from .embeddings import (load_embeddings, backbone_fingerprint, fit_head, write_head,
+                             head_logits, current_head, split_rows)
+    from .scores import metrics_at, threshold_sweep, roc_pr
+    cfg = load_config(args.config)
+    X, labels, splits, meta = load_embeddings(args.embeddings or cfg.embeddings_dir)
+    detector = _load_detector(args.model_path)
+    if not detector.use_desklib:
+        raise SystemExit("❌ Head-only training needs a Desklib (mean-pooling head) model.")
+    if backbone_fingerprint(detector, meta["max_length"]) != meta["fingerprint"]:
+        raise SystemExit(f"❌ {args.model_path} has a different backbone than the one that produced "
+                         f"the embeddings ({meta['model']}); rerun `ai-detector embed`.")
+    train_rows, val_rows = split_rows(labels, splits)
+    if not len(train_rows):
+        raise SystemExit("❌ No labeled training rows in the embedding cache.")
+    method, C = args.method or cfg.head_method, args.C or cfg.head_c
+
+    start = time.perf_counter()
+    w, b = fit_head(X, labels, train_rows, method=method, C=C)
+    print(f"⏱️  Fit {method} head on {len(train_rows):,} x {X.shape[1]} embeddings in "
+          f"{time.perf_counter() - start:.1f}s")
+    if len(val_rows):
+        y_val = labels[val_rows]
+        for name, (hw, hb) in (("old head", current_head(detector)), ("new head", (w, b))):
+            p = 1.0 / (1.0 + np.exp(-head_logits(X[val_rows], hw, hb).astype(np.float64)))
+            m = metrics_at(y_val, p)
+            auc = roc_pr(threshold_sweep(y_val, p))["roc_auc"]
+            print(f"   {name}: accuracy={m['accuracy']:.4f} F1 (macro)={m['f1_macro']:.4f} "
+                  f"ROC AUC={auc:.4f} on {len(val_rows):,} validation rows")
+    write_head(detector, w, b)
+    detector.save(args.output)
+    print(f"✅ Model with the new head saved to: {args.output} (uncalibrated; refit with "
+          "`eval --split val --scores` + `report --fit-calibrator`)")
+
+def bundle_command(args):
+    from .bundle import write_bundle, measure_cold_start
+    model = _load_detector(args.model_path)
+    write_bundle(model, args.output)
+    print(f"📦 Bundle written to: {args.output}")
+    if args.measure:
+        for name, path in (("original", args.model_path), ("bundle", args.output)):
+            m = measure_cold_start(path)
+            line = f"   {name:>8}: cold start {m['seconds']:.2f}s, RSS {m['VmRSS'] / 2**20:.0f}MB"
+            if "RssAnon" in m:
+                line += f" (private {m['RssAnon'] / 2**20:.0f}MB, file-backed {m['RssFile'] / 2**20:.0f}MB)"
+            print(line)
+
+def dedup_command(args):
+    from .datasets import read_table, _find_text_column
+    from .dedup import find_near_duplicates
+    df = read_table(args.data)
+    start = time.perf_counter()
+    keep, pairs = find_near_duplicates(df[_find_text_column(df)].astype(str), threshold=args.threshold,
+                                       num_perm=args.num_perm, bands=args.bands,
+                                       batch_size=args.batch_size, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"🧹 {len(pairs):,} of {len(df):,} texts are near-duplicates (similarity >= {args.threshold}); "
+          f"{len(df) / elapsed:,.0f} texts/s")
+    if args.output:
+        out = df[keep]
+        if args.output.endswith(".parquet"):
+            out.to_parquet(args.output, index=False)
+        else:
+            out.to_csv(args.output, index=False)
+        print(f"💾 Kept {len(out):,} texts in {args.output}")
+    if args.pairs:
+        import pandas as pd
+        pd.DataFrame(pairs, columns=["index", "duplicate_of", "similarity"]).to_csv(args.pairs, index=False)
+        print(f"💾 Pairs written to {args.pairs}")
+
+def build_corpus_command(args):
+    from .corpus import build_corpus
+    build_corpus(args.inputs, args.output, shard_size=args.shard_size, workers=args.workers,
+                 dedupe=not args.no_dedupe)
 
 def main():
     parser = argparse.ArgumentParser(
@@ -34,17 +431,135 @@ def main():
 
     # Train
     p_train = subparsers.add_parser("train", help="Train a new detector model.")
-    p_train.add_argument("--data", required=True, help="Path to dataset CSV/JSON/JSONL.")
+    p_train.add_argument("--data", required=True, help="Dataset CSV/JSON/JSONL/Parquet or corpus dir.")
     p_train.add_argument("--config", default="configs/default.yaml", help="YAML config path.")
+    p_train.add_argument("--model-type", choices=["transformer", "linear"],
+                         help="Override config model_type ('linear' = hashed n-gram baseline).")
+    p_train.add_argument("--near-dedup", action="store_true",
+                         help="Drop near-duplicate texts (MinHash/LSH) before splitting.")
+    p_train.add_argument("--no-leakage-check", action="store_true",
+                         help="Skip the train/validation near-duplicate report.")
+    add_profile_arguments(p_train, "profiles/train")
     p_train.set_defaults(func=train_command)
 
     # Evaluate
     p_eval = subparsers.add_parser("eval", help="Evaluate a trained model.")
     p_eval.add_argument("--model-path", required=True, help="Path to saved model dir.")
-    p_eval.add_argument("--data", required=True, help="Path to dataset CSV/JSON/JSONL.")
+    p_eval.add_argument("--data", required=True, help="Dataset CSV/JSON/JSONL/Parquet or corpus dir.")
     p_eval.add_argument("--config", default="configs/default.yaml", help="YAML config path.")
+    p_eval.add_argument("--split", choices=["all", "train", "val"], default="all",
+                        help="Evaluate only rows of this persisted split (same split as training).")
+    p_eval.add_argument("--scores", help="Write per-row probabilities, labels and ids to this Parquet file; "
+                                         "rows it already holds for the same model are reused.")
+    p_eval.add_argument("--rescore", action="store_true", help="Ignore cached rows in --scores and score everything.")
+    _add_pipeline_arguments(p_eval)
+    add_profile_arguments(p_eval, "profiles/eval")
     p_eval.set_defaults(func=eval_command)
 
+    # Predict
+    p_pred = subparsers.add_parser("predict", help="Score texts with a model.")
+    p_pred.add_argument("--model-path", default=DEFAULT_MODEL, help="Saved model dir or Hub model name.")
+    p_pred.add_argument("--text", action="append", help="Text to score (repeatable).")
+    p_pred.add_argument("--input", help="CSV/JSON/JSONL with a text column, or .txt with one text per line.")
+    p_pred.add_argument("--output", help="Write predictions to this CSV instead of stdout.")
+    p_pred.add_argument("--max-length", type=int, default=768, help="Maximum sequence length.")
+    p_pred.add_argument("--batch-size", type=int, default=16, help="Texts per forward pass.")
+    p_pred.add_argument("--threshold", type=float, default=0.5, help="AI probability threshold.")
+    p_pred.add_argument("--scores", help="Also write a Parquet score file (see `report`).")
+    _add_escalation_arguments(p_pred)
+    _add_pipeline_arguments(p_pred)
+    add_profile_arguments(p_pred, "profiles/predict")
+    p_pred.set_defaults(func=predict_command)
+
+    # Report
+    p_report = subparsers.add_parser("report", help="Metrics, threshold sweep and calibration from a score file.")
+    p_report.add_argument("--scores", required=True, help="Score file written by `eval --scores`.")
+    p_report.add_argument("--threshold", type=float, default=0.5, help="Threshold for the headline metrics.")
+    p_report.add_argument("--bins", type=int, default=10, help="Calibration bins.")
+    p_report.add_argument("--optimize", choices=["f1_macro", "f1_ai", "accuracy"], default="f1_macro",
+                          help="Metric the best threshold maximizes.")
+    p_report.add_argument("--curves", help="Write the full threshold sweep (ROC/PR points) to this CSV.")
+    p_report.add_argument("--fit-calibrator", action="store_true",
+                          help="Fit Platt scaling on the scores and save calibration.json to the model dir.")
+    p_report.add_argument("--model-path", help="Model dir for --fit-calibrator (default: the model in the file).")
+    p_report.set_defaults(func=report_command)
+
+    # Benchmark
+    p_bench = subparsers.add_parser("bench", help="Measure inference throughput and latency.")
+    p_bench.add_argument("--model-path", default=DEFAULT_MODEL, help="Saved model dir or Hub model name.")
+    p_bench.add_argument("--data", help="Optional dataset to draw texts from (default: built-in samples).")
+    p_bench.add_argument("-n", type=int, default=64, help="Number of texts to score.")
+    p_bench.add_argument("--max-length", type=int, default=768, help="Maximum sequence length.")
+    p_bench.add_argument("--batch-size", type=int, default=8, help="Texts per forward pass.")
+    _add_escalation_arguments(p_bench)
+    p_bench.add_argument("--packed", action="store_true",
+                         help="Also run packed (unpadded) inference: parity check + throughput comparison.")
+    p_bench.add_argument("--pack-length", type=int, default=256, help="Tokens per packed sequence.")
+    p_bench.add_argument("--parity-tolerance", type=float, default=1e-3,
+                         help="Max allowed probability difference between packed and padded inference.")
+    add_profile_arguments(p_bench, "profiles/bench")
+    p_bench.set_defaults(func=bench_command)
+
+    # Distill
+    p_dist = subparsers.add_parser("distill", help="Distill the Desklib detector into a smaller student.")
+    p_dist.add_argument("--data", required=True, help="Unlabeled corpus (CSV/JSON/JSONL text column or .txt).")
+    p_dist.add_argument("--output", required=True, help="Where to save the student model.")
+    p_dist.add_argument("--teacher", default=DEFAULT_MODEL, help="Teacher model dir or Hub name.")
+    p_dist.add_argument("--student", help="Override config distill_student ('shallow' or a model name).")
+    p_dist.add_argument("--eval-data", help="Optional labeled dataset for teacher/student accuracy.")
+    p_dist.add_argument("--config", default="configs/default.yaml", help="YAML config path.")
+    p_dist.set_defaults(func=distill_command)
+
+    # Embeddings cache
+    p_embed = subparsers.add_parser("embed", help="Cache pooled backbone embeddings (float16 memmap) for a dataset.")
+    p_embed.add_argument("--model-path", default=DEFAULT_MODEL, help="Desklib model dir or Hub name.")
+    p_embed.add_argument("--data", required=True, help="Dataset CSV/JSON/JSONL/Parquet or corpus dir.")
+    p_embed.add_argument("--output", help="Cache directory (default: config embeddings_dir).")
+    p_embed.add_argument("--max-length", type=int, help="Override config max_length.")
+    p_embed.add_argument("--batch-size", type=int, help="Override config batch_size.")
+    p_embed.add_argument("--config", default="configs/default.yaml", help="YAML config path.")
+    p_embed.set_defaults(func=embed_command)
+
+    # Head-only training
+    p_head = subparsers.add_parser("train-head", help="Retrain only the classifier head on cached embeddings.")
+    p_head.add_argument("--embeddings", help="Cache directory from `embed` (default: config embeddings_dir).")
+    p_head.add_argument("--model-path", default=DEFAULT_MODEL, help="Model the embeddings came from.")
+    p_head.add_argument("--output", required=True, help="Where to save the model with its new head.")
+    p_head.add_argument("--method", choices=["logistic", "linear"], help="Override config head_method.")
+    p_head.add_argument("--C", type=float, help="Override config head_c (inverse regularization).")
+    p_head.add_argument("--config", default="configs/default.yaml", help="YAML config path.")
+    p_head.set_defaults(func=train_head_command)
+
+    # Bundle
+    p_bundle = subparsers.add_parser("bundle", help="Write a fast-loading (mmap) model bundle.")
+    p_bundle.add_argument("--model-path", default=DEFAULT_MODEL, help="Saved model dir or Hub model name.")
+    p_bundle.add_argument("--output", required=True, help="Bundle directory to write.")
+    p_bundle.add_argument("--measure", action="store_true",
+                          help="Compare cold-start time and RSS of the original and the bundle.")
+    p_bundle.set_defaults(func=bundle_command)
+
+    # Near-duplicates
+    p_dedup = subparsers.add_parser("dedup", help="Find and remove near-duplicate texts (MinHash + LSH).")
+    p_dedup.add_argument("--data", required=True, help="Dataset CSV/JSON/JSONL/Parquet or corpus dir.")
+    p_dedup.add_argument("--output", help="Write the deduplicated rows here (.csv or .parquet).")
+    p_dedup.add_argument("--pairs", help="Write (index, duplicate_of, similarity) pairs to this CSV.")
+    p_dedup.add_argument("--threshold", type=float, default=0.8, help="Estimated Jaccard similarity cut-off.")
+    p_dedup.add_argument("--num-perm", type=int, default=128, help="MinHash permutations.")
+    p_dedup.add_argument("--bands", type=int, default=16, help="LSH bands (must divide --num-perm).")
+    p_dedup.add_argument("--batch-size", type=int, default=10_000, help="Texts per worker batch.")
+    p_dedup.add_argument("--workers", type=int, help="Signature processes (default: all cores).")
+    p_dedup.set_defaults(func=dedup_command)
+
+    # Build corpus
+    p_corpus = subparsers.add_parser("build-corpus",
+                                     help="Normalize and deduplicate raw datasets into one sharded Parquet corpus.")
+    p_corpus.add_argument("inputs", nargs="+", help="CSV/JSON/JSONL/Parquet files or directories of them.")
+    p_corpus.add_argument("--output", default="data/corpus", help="Corpus directory to write.")
+    p_corpus.add_argument("--shard-size", type=int, default=100_000, help="Rows per Parquet shard.")
+    p_corpus.add_argument("--workers", type=int, help="Parallel reader processes (default: all cores).")
+    p_corpus.add_argument("--no-dedupe", action="store_true", help="Keep exact duplicate texts.")
+    p_corpus.set_defaults(func=build_corpus_command)
+
     args = parser.parse_args()
     args.func(args)
 
@@ -6,6 +6,7 @@ import yaml
 @dataclass
 class Config:
     data_path: str = "data/dataset.csv"
+    model_type: str = "transformer"   # "transformer" or "linear" (hashed n-gram baseline)
     base_model: str = "roberta-base"
     save_dir: str = "models/ai_detector"
     max_length: int = 256
@@ -16,6 +17,7 @@ class Config:
     logging_steps: int = 25
     eval_strategy: str = "epoch"
     seed: int = 42
+    val_fraction: float = 0.2    # for new texts; existing split indexes keep their assignments
     gradient_accumulation_steps: int = 1
     fp16: Optional[bool] = None  # if None, auto based on cuda
     load_in_8bit: bool = False   # optional if you later add bitsandbytes
@@ -23,6 +25,23 @@ class Config:
     save_total_limit: int = 2
     save_steps: int = 0          # 0 -> follow eval/save strategy
     dataloader_num_workers: int = 2
+    # Hashed n-gram linear model (model_type: linear)
+    linear_n_features: int = 2**20
+    linear_c: float = 1.0
+    # Distillation (ai-detector distill)
+    distill_student: str = "shallow"  # "shallow" (truncated teacher) or a Hub/local model name
+    distill_layers: int = 4           # encoder layers kept by the shallow student
+    distill_temperature: float = 2.0
+    distill_epochs: int = 1
+    distill_cache_dir: str = "cache/teacher_logits"
+    # Cached embeddings + head-only training (ai-detector embed / train-head)
+    embeddings_dir: str = "cache/embeddings"
+    head_method: str = "logistic"     # "logistic" or "linear" (ridge, streamed over the memmap)
+    head_c: float = 1.0               # inverse regularization strength
+    # Near-duplicates (MinHash/LSH, see dedup.py)
+    near_dedup: bool = False          # drop near-duplicate texts before splitting
+    near_dup_threshold: float = 0.8   # estimated Jaccard similarity of word 3-shingles
+    leakage_check: bool = True        # report validation texts that near-duplicate training texts
 
 def load_config(path: Optional[str]) -> Config:
     if path is None:
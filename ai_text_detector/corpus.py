@@ -0,0 +1,158 @@
+"""
+Build one clean, sharded Parquet corpus from many raw dataset files.
+
+Every input file (CSV/JSON/JSONL/Parquet) is read and normalized in its own
+worker process with the shared label rules (`datasets.map_labels`; rows with
+unknown labels are dropped rather than guessed). Rows are then deduplicated
+on a content hash of the whitespace-normalized text, and written as::
+
+    <output>/part-00000.parquet ...   columns: text, label, content_hash, source
+    <output>/corpus.json              manifest: shards, row counts, label counts, per-source stats
+
+Later stages (train, eval, predict) read the directory like any other dataset
+path.
+"""
+import os
+import json
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from .download_data import file_sha256
+
+CORPUS_MANIFEST = "corpus.json"
+CORPUS_FORMAT = "ai-detector-corpus"
+CORPUS_VERSION = 1
+INPUT_EXTENSIONS = (".csv", ".jsonl", ".json", ".parquet")
+
+def is_corpus_dir(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, CORPUS_MANIFEST))
+
+def load_manifest(path: str) -> dict:
+    with open(os.path.join(path, CORPUS_MANIFEST), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def read_corpus(path: str, columns=None) -> pd.DataFrame:
+    """All shards of a corpus directory, in order."""
+    if not is_corpus_dir(path):
+        raise ValueError(f"{path} is not a corpus directory (no {CORPUS_MANIFEST})")
+    shards = [os.path.join(path, s["file"]) for s in load_manifest(path)["shards"]]
+    if not shards:
+        return pd.DataFrame(columns=columns or ["text", "label", "content_hash", "source"])
+    return pd.concat([pd.read_parquet(s, columns=columns) for s in shards], ignore_index=True)
+
+def expand_inputs(inputs, exclude=None):
+    """
+    (path, source) pairs: files as given, and the supported files of each
+    directory (sorted). `source` is the path relative to the directory it was
+    found in, so same-named files in different subdirectories stay apart.
+
+    Corpus directories (and `exclude`, the output directory) are skipped, so a
+    corpus built inside its own input tree isn't read back as input.
+    """
+    skip = os.path.realpath(exclude) if exclude else None
+    pairs = []
+    for item in inputs:
+        if not os.path.isdir(item):
+            pairs.append((item, os.path.normpath(item).replace(os.sep, "/")))
+            continue
+        found = []
+        for root, dirs, files in os.walk(item):
+            if os.path.realpath(root) == skip or is_corpus_dir(root):
+                print(f"⏭️  Skipping corpus directory {root}")
+                dirs.clear()
+                continue
+            dirs[:] = [d for d in dirs if not d.startswith(".")]  # hidden, like glob's "**"
+            found.extend(os.path.join(root, f) for f in files
+                         if f.endswith(INPUT_EXTENSIONS) and not f.startswith("."))
+        pairs.extend((p, os.path.relpath(p, item).replace(os.sep, "/")) for p in sorted(found))
+    return pairs
+
+def _load_source(item):
+    """Worker: read + normalize one (path, source) file; returns (path, source, rows_in, DataFrame)."""
+    path, source = item
+    from .datasets import read_table, _find_text_column, _find_label_column, map_labels
+    from .hashing import content_hashes
+    raw = read_table(path)
+    label_col = _find_label_column(raw)
+    if label_col is None:
+        raise ValueError(f"{path}: could not find a label column")
+    df = pd.DataFrame({
+        "text": raw[_find_text_column(raw)],
+        "label": map_labels(raw[label_col], unknown=None),
+    })
+    df = df.dropna()
+    df["text"] = df["text"].astype(str)
+    df = df[df["text"].str.strip() != ""]
+    df["label"] = df["label"].astype("int8")
+    df["content_hash"] = content_hashes(df["text"])
+    df["source"] = source
+    return path, source, len(raw), df.reset_index(drop=True)
+
+def build_corpus(inputs, output_dir: str, shard_size: int = 100_000, workers: int = None,
+                 dedupe: bool = True) -> dict:
+    """
+    Ingest `inputs` (files and/or directories) into a sharded Parquet corpus.
+
+    Files are read in parallel (`workers` processes); rows keep input order,
+    and when the same text appears more than once the first occurrence wins.
+
+    Returns:
+        The manifest written to `<output_dir>/corpus.json`
+    """
+    pairs = expand_inputs(inputs, exclude=output_dir)
+    if not pairs:
+        raise ValueError("No input files found")
+    start = time.perf_counter()
+    print(f"📚 Ingesting {len(pairs)} file(s) with {workers or os.cpu_count()} worker(s)...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        loaded = list(pool.map(_load_source, pairs))
+
+    frames, sources = [], []
+    for path, source, rows_in, df in loaded:
+        print(f"   {path}: {rows_in:,} rows, {len(df):,} usable")
+        frames.append(df)
+        sources.append({"path": path, "source": source, "sha256": file_sha256(path),
+                        "rows_in": rows_in, "rows_usable": len(df)})
+    corpus = pd.concat(frames, ignore_index=True)
+
+    duplicates = conflicts = 0
+    if dedupe:
+        dup = corpus.duplicated("content_hash", keep="first")
+        # Same text with different labels in different sources: keep the first, but count it
+        labels_per_text = corpus.groupby("content_hash")["label"].nunique()
+        conflicts = int((labels_per_text > 1).sum())
+        duplicates = int(dup.sum())
+        removed = corpus[dup].groupby("source").size()
+        for s in sources:
+            s["duplicates_removed"] = int(removed.get(s["source"], 0))
+        corpus = corpus[~dup].reset_index(drop=True)
+
+    os.makedirs(output_dir, exist_ok=True)
+    for old in glob.glob(os.path.join(output_dir, "part-*.parquet")):
+        os.remove(old)  # shards of a previous build
+    shards = []
+    for i, offset in enumerate(range(0, len(corpus), shard_size)):
+        name = f"part-{i:05d}.parquet"
+        corpus.iloc[offset:offset + shard_size].to_parquet(os.path.join(output_dir, name), index=False)
+        shards.append({"file": name, "rows": min(shard_size, len(corpus) - offset)})
+
+    manifest = {
+        "format": CORPUS_FORMAT,
+        "version": CORPUS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rows": len(corpus),
+        "label_counts": {str(k): int(v) for k, v in corpus["label"].value_counts().sort_index().items()},
+        "deduplicated": dedupe,
+        "duplicates_removed": duplicates,
+        "label_conflicts": conflicts,
+        "columns": list(corpus.columns),
+        "shards": shards,
+        "sources": sources,
+    }
+    with open(os.path.join(output_dir, CORPUS_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"✅ Corpus: {len(corpus):,} rows in {len(shards)} shard(s) at {output_dir} "
+          f"({duplicates:,} duplicates removed, {conflicts:,} label conflicts) "
+          f"in {time.perf_counter() - start:.1f}s")
+    return manifest
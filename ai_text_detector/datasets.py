@@ -1,6 +1,6 @@
+import os
 from typing import Tuple, List
 import pandas as pd
-from transformers import AutoTokenizer
 
 SUPPORTED_TEXT_COLUMNS = ["text", "content", "body", "essay", "prompt"]
 
@@ -12,69 +12,98 @@ LABEL_MAPPINGS = {
     "is_ai": None
 }
 
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    # Find text column
-    text_col = None
+AI_LABELS = ("ai", "ai-generated", "machine", "generated", "gpt", "llm", "chatgpt")
+HUMAN_LABELS = ("human", "human-written", "person", "authored", "real")
+
+def map_labels(values: pd.Series, unknown=1) -> pd.Series:
+    """
+    Vectorized label normalization: 1 = AI, 0 = human.
+
+    Accepts the names in AI_LABELS / HUMAN_LABELS (any case), 0/1 as numbers,
+    numeric strings or booleans. Anything else (including missing values)
+    becomes `unknown`: 1 (treat non-human as AI, what training has always
+    done) or None to get NaN for the caller to drop.
+    """
+    words = values.astype(str).str.strip().str.lower()
+    mapped = words.map({**{w: 1.0 for w in AI_LABELS}, **{w: 0.0 for w in HUMAN_LABELS},
+                        "true": 1.0, "false": 0.0})
+    numeric = pd.to_numeric(values, errors="coerce")
+    mapped = mapped.fillna(numeric.where(numeric.isin([0, 1])))
+    if unknown is not None:
+        return mapped.fillna(unknown).astype(int)
+    return mapped
+
+def _find_label_column(df: pd.DataFrame):
+    for c in LABEL_MAPPINGS.keys():
+        if c in df.columns:
+            return c
+    # attempt heuristic: columns named like 'human'/'ai'
+    for c in df.columns:
+        if str(c).lower() in ("ai", "human", "source"):
+            return c
+    return None
+
+def _find_text_column(df: pd.DataFrame) -> str:
     for c in SUPPORTED_TEXT_COLUMNS:
         if c in df.columns:
-            text_col = c
-            break
-    if text_col is None:
-        raise ValueError(f"Could not find a text column among: {SUPPORTED_TEXT_COLUMNS}")
+            return c
+    raise ValueError(f"Could not find a text column among: {SUPPORTED_TEXT_COLUMNS}")
 
+def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # Find text column
+    text_col = _find_text_column(df)
     df = df.rename(columns={text_col: "text"})
 
     # Find label column
-    label_col = None
-    for c in LABEL_MAPPINGS.keys():
-        if c in df.columns:
-            label_col = c
-            break
-    if label_col is None:
-        # attempt heuristic: columns named like 'human'/'ai'
-        for c in df.columns:
-            if str(c).lower() in ("ai", "human", "source"):
-                label_col = c
-                break
+    label_col = _find_label_column(df)
     if label_col is None:
         raise ValueError("Could not find a label column. Expected one of: "
                          f"{list(LABEL_MAPPINGS.keys())} or something like ['ai','human','source'].")
 
-    # Normalize labels (0=human, 1=ai)
-    def to01(v):
-        if isinstance(v, str):
-            v_low = v.strip().lower()
-            if v_low in ("ai", "machine", "generated", "gpt", "llm", "chatgpt"):
-                return 1
-            if v_low in ("human", "person", "authored", "real"):
-                return 0
-        try:
-            iv = int(v)
-            if iv in (0, 1):
-                return iv
-        except Exception:
-            pass
-        # fallback: treat non-human as AI
-        return 1
-
-    df["label"] = df[label_col].apply(to01)
+    # Normalize labels (0=human, 1=ai); fallback: treat non-human as AI
+    df["label"] = map_labels(df[label_col], unknown=1)
     df = df[["text", "label"]].dropna()
     df = df[df["text"].astype(str).str.strip() != ""]
     return df
 
+def read_table(path) -> pd.DataFrame:
+    """Read a CSV/JSON/JSONL/Parquet file or a corpus directory without normalizing it."""
+    if os.path.isdir(path):
+        from .corpus import read_corpus
+        return read_corpus(path)
+    if str(path).endswith(".parquet"):
+        return pd.read_parquet(path)
+    if str(path).endswith(".csv"):
+        return pd.read_csv(path)
+    elif str(path).endswith(".jsonl") or str(path).endswith(".json"):
+        return pd.read_json(path, lines=str(path).endswith(".jsonl"))
+    raise ValueError(f"Unsupported file format: {path}")
+
+def load_texts(path) -> List[str]:
+    """Load unlabeled texts: one per line for .txt, else the text column of a table."""
+    if str(path).endswith(".txt"):
+        with open(path, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    df = read_table(path)
+    texts = df[_find_text_column(df)].dropna().astype(str)
+    return texts[texts.str.strip() != ""].tolist()
+
 class DatasetLoader:
     def __init__(self, model_name="roberta-base", max_length: int = 256):
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+        self.model_name = model_name
         self.max_length = max_length
+        self._tokenizer = None
+
+    @property
+    def tokenizer(self):
+        # Built on first use: loading data alone shouldn't pay for transformers
+        if self._tokenizer is None:
+            from transformers import AutoTokenizer
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=True)
+        return self._tokenizer
 
     def load(self, path) -> pd.DataFrame:
-        if str(path).endswith(".csv"):
-            df = pd.read_csv(path)
-        elif str(path).endswith(".jsonl") or str(path).endswith(".json"):
-            df = pd.read_json(path, lines=str(path).endswith(".jsonl"))
-        else:
-            raise ValueError(f"Unsupported file format: {path}")
-        return _normalize_columns(df)
+        return _normalize_columns(read_table(path))
 
     def tokenize(self, texts: List[str]):
         return self.tokenizer(
@@ -0,0 +1,241 @@
+"""
+Near-duplicate detection with MinHash + LSH (NumPy only, no torch).
+
+Each text is lowercased and whitespace-normalized, then cut into shingles of
+`shingle` consecutive words. Shingle hashes come from polynomial prefix
+hashes over the UTF-8 bytes, so no Python loop runs per word. A MinHash
+signature is `num_perm` minima of multiply-shift hashes of those shingles.
+The fraction of equal signature entries estimates the Jaccard similarity of
+two texts' shingle sets.
+
+For LSH, the signature is cut into `bands` bands. Texts that agree on a whole
+band become candidates, and a candidate counts as a near-duplicate only if
+its estimated similarity is at least `threshold`. With 128 permutations in 16
+bands of 8, pairs above ~0.7 similarity are very likely to collide.
+
+Signatures are computed in batches on a process pool, with a bounded number
+of batches in flight, so the input can be a stream. The index keeps only
+signatures and band keys of the texts it retains.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, List, Tuple
+import numpy as np
+from .hashing import normalize_text
+
+_P = np.uint64(1099511628211)          # odd, so it is invertible mod 2**64
+_P_INV = np.uint64(pow(1099511628211, -1, 2**64))
+_BAND_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+_POWER_CACHE = {}
+
+def _powers(base, n):
+    """base**0 .. base**(n-1) mod 2**64, from a table that grows as needed."""
+    table = _POWER_CACHE.get(int(base))
+    if table is None or len(table) < n:
+        size = max(n, 4096, 2 * len(table) if table is not None else 0)
+        table = np.empty(size, dtype=np.uint64)
+        table[0] = 1
+        table[1:] = base
+        with np.errstate(over="ignore"):
+            np.cumprod(table[1:], out=table[1:])
+        _POWER_CACHE[int(base)] = table
+    return table[:n]
+
+def shingle_hashes(text: str, shingle: int = 3) -> np.ndarray:
+    """32-bit hashes of all `shingle`-word windows of the normalized text."""
+    data = normalize_text(text).lower().encode("utf-8")
+    if not data:
+        return np.zeros(1, dtype=np.uint64)
+    b = np.frombuffer(data, dtype=np.uint8).astype(np.uint64) + np.uint64(1)
+    n = len(b)
+    with np.errstate(over="ignore"):
+        # prefix[i] = sum_{j<i} b[j] * P^(i-1-j)  (mod 2**64), via P^(i-1) * cumsum(b[j] * P^-j)
+        scaled = np.cumsum(b * _powers(_P_INV, n))
+        prefix = np.zeros(n + 1, dtype=np.uint64)
+        pw = _powers(_P, n + 1)
+        prefix[1:] = scaled * pw[:n]
+        spaces = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 32)
+        starts = np.concatenate(([0], spaces + 1))
+        ends = np.concatenate((spaces, [n]))
+        k = min(shingle, len(starts))
+        s, e = starts[:len(starts) - k + 1], ends[k - 1:]
+        h = prefix[e] - prefix[s] * pw[e - s]
+    return h >> np.uint64(32)
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, shingle: int = 3, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle = shingle
+        self.seed = seed
+        self._a = (rng.integers(0, 2**63, num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        x = np.unique(shingle_hashes(text, self.shingle))
+        with np.errstate(over="ignore"):
+            hashed = (self._a[:, None] * x[None, :] + self._b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def signatures(self, texts: List[str], group_shingles: int = 2048) -> np.ndarray:
+        """Signatures for many texts; shingles of several texts are hashed in one matrix op."""
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        group, offsets, first, size = [], [], 0, 0
+        for i, text in enumerate(texts):
+            x = shingle_hashes(text, self.shingle)
+            offsets.append(size)
+            group.append(x)
+            size += len(x)
+            if size >= group_shingles or i == len(texts) - 1:
+                x = np.concatenate(group)
+                with np.errstate(over="ignore"):
+                    hashed = (self._a[:, None] * x[None, :] + self._b[:, None]) >> np.uint64(32)
+                out[first:i + 1] = np.minimum.reduceat(hashed, offsets, axis=1).T
+                group, offsets, first, size = [], [], i + 1, 0
+        return out
+
+def band_keys(signatures: np.ndarray, bands: int) -> np.ndarray:
+    """(n, bands) uint64 keys; two texts share a key when their band is identical."""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    sig = signatures[:, :rows * bands].reshape(n, bands, rows).astype(np.uint64)
+    keys = np.zeros((n, bands), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for r in range(rows):
+            keys = keys * _BAND_MIX + sig[:, :, r]
+    return keys
+
+def _signature_batch(args):
+    texts, num_perm, shingle, seed, bands = args
+    sigs = MinHasher(num_perm, shingle, seed).signatures(texts)
+    return sigs, band_keys(sigs, bands)
+
+def _batches(texts: Iterable[str], batch_size: int):
+    it = iter(texts)
+    while True:
+        batch = [str(t) for t in islice(it, batch_size)]
+        if not batch:
+            return
+        yield batch
+
+class NearDuplicateIndex:
+    """
+    LSH index over MinHash signatures.
+
+    Each band table maps a band key to the first retained text with that key.
+    That keeps memory at one entry per band per retained text. The cost is
+    that a candidate can be missed if two unrelated texts shared the bucket
+    first, which is rare for 8-row bands.
+    """
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.8,
+                 shingle: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle = shingle
+        self.seed = seed
+        self._tables = [dict() for _ in range(bands)]
+        self._sigs = np.empty((1024, num_perm), dtype=np.uint32)
+        self._ids = []
+
+    def __len__(self):
+        return len(self._ids)
+
+    def query(self, sig: np.ndarray, keys: np.ndarray):
+        """(doc_id, similarity) of the most similar retained text at/above threshold, else None."""
+        slots = {t.get(int(k)) for t, k in zip(self._tables, keys)}
+        slots.discard(None)
+        if not slots:
+            return None
+        slots = np.fromiter(slots, dtype=np.int64)
+        sims = (self._sigs[slots] == sig).mean(axis=1)
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        return self._ids[slots[best]], float(sims[best])
+
+    def add(self, doc_id, sig: np.ndarray, keys: np.ndarray):
+        slot = len(self._ids)
+        if slot == len(self._sigs):
+            self._sigs = np.concatenate([self._sigs, np.empty_like(self._sigs)])
+        self._sigs[slot] = sig
+        self._ids.append(doc_id)
+        for t, k in zip(self._tables, keys):
+            t.setdefault(int(k), slot)
+
+    def signature_stream(self, texts: Iterable[str], batch_size: int = 10_000, workers: int = None):
+        """Yield (signatures, band keys) per batch, in order, computed on `workers` processes."""
+        jobs = ((batch, self.num_perm, self.shingle, self.seed, self.bands)
+                for batch in _batches(texts, batch_size))
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            yield from map(_signature_batch, jobs)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            window = workers * 2  # batches in flight; bounds memory on long streams
+            pending = [pool.submit(_signature_batch, job) for job in islice(jobs, window)]
+            while pending:
+                result = pending.pop(0).result()
+                pending.extend(pool.submit(_signature_batch, job) for job in islice(jobs, 1))
+                yield result
+
+def find_near_duplicates(texts: Iterable[str], threshold: float = 0.8, num_perm: int = 128, bands: int = 16,
+                         shingle: int = 3, batch_size: int = 10_000, workers: int = None):
+    """
+    Single pass over `texts`: each text is checked against the texts kept so
+    far, then kept only if it isn't a near-duplicate.
+
+    Returns:
+        keep: bool array, True for texts to keep (first of each near-duplicate group)
+        pairs: list of (index, index_of_kept_text, estimated_similarity)
+    """
+    index = NearDuplicateIndex(num_perm, bands, threshold, shingle)
+    keep, pairs = [], []
+    i = 0
+    for sigs, keys in index.signature_stream(texts, batch_size, workers):
+        for sig, key in zip(sigs, keys):
+            match = index.query(sig, key)
+            if match is None:
+                index.add(i, sig, key)
+                keep.append(True)
+            else:
+                keep.append(False)
+                pairs.append((i, match[0], match[1]))
+            i += 1
+    return np.array(keep, dtype=bool), pairs
+
+def cross_split_duplicates(train_texts: Iterable[str], val_texts: Iterable[str], threshold: float = 0.8,
+                           num_perm: int = 128, bands: int = 16, shingle: int = 3,
+                           batch_size: int = 10_000, workers: int = None) -> List[Tuple[int, int, float]]:
+    """(val_index, train_index, similarity) for validation texts that near-duplicate a training text."""
+    index = NearDuplicateIndex(num_perm, bands, threshold, shingle)
+    i = 0
+    for sigs, keys in index.signature_stream(train_texts, batch_size, workers):
+        for sig, key in zip(sigs, keys):
+            index.add(i, sig, key)
+            i += 1
+    leaks = []
+    j = 0
+    for sigs, keys in index.signature_stream(val_texts, batch_size, workers):
+        for sig, key in zip(sigs, keys):
+            match = index.query(sig, key)
+            if match is not None:
+                leaks.append((j, match[0], match[1]))
+            j += 1
+    return leaks
+
+def report_leakage(train_df, val_df, threshold: float = 0.8, workers: int = None, show: int = 3):
+    """Print how many validation rows near-duplicate a training row; returns the pairs."""
+    leaks = cross_split_duplicates(train_df["text"], val_df["text"], threshold=threshold, workers=workers)
+    if not leaks:
+        print(f"🔒 No train/validation near-duplicates (similarity >= {threshold})")
+        return leaks
+    print(f"⚠️  {len(leaks):,} of {len(val_df):,} validation texts ({len(leaks) / len(val_df):.1%}) "
+          f"near-duplicate a training text (similarity >= {threshold}); validation scores are optimistic.")
+    for v, t, sim in leaks[:show]:
+        print(f"   val[{v}] ~ train[{t}] ({sim:.2f}): {str(val_df['text'].iloc[v])[:80]!r}")
+    return leaks
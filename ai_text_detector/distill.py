@@ -0,0 +1,146 @@
+"""
+Knowledge distillation from the Desklib detector into a smaller student.
+
+The teacher's AI logits over an unlabeled corpus are computed once and cached
+to disk; the student is then trained to match the teacher's softened
+probabilities, so no gold labels are needed.
+"""
+import os
+import copy
+import time
+import hashlib
+from typing import List, Optional
+import numpy as np
+import torch
+from torch.optim import AdamW
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from .models import DetectorModel, DesklibAIDetectionModel
+from .utils import set_seed
+
+SHALLOW_STUDENT = "shallow"
+
+def teacher_fingerprint(teacher: DetectorModel) -> str:
+    """Digest of the teacher's weights (backbone and head), tokenizer and calibration."""
+    from .embeddings import hash_weights
+    h = hash_weights(hashlib.blake2b(digest_size=16), teacher.model)
+    calibration = (teacher.calibration.a, teacher.calibration.b) if teacher.calibration is not None else None
+    h.update(f"{type(teacher.tokenizer).__name__}\0{len(teacher.tokenizer)}\0{calibration}".encode("utf-8"))
+    return h.hexdigest()
+
+def _corpus_key(fingerprint: str, max_length: int, texts: List[str]) -> str:
+    h = hashlib.sha256(f"{fingerprint}\0{max_length}\0".encode("utf-8"))
+    for t in texts:
+        h.update(t.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+def cached_teacher_logits(teacher: DetectorModel, texts: List[str], cache_dir: str,
+                          max_length: int = 768, batch_size: int = 16) -> np.ndarray:
+    """
+    Return teacher AI logits for `texts`, computing them only if no cache file
+    exists for this (teacher weights, max_length, corpus) combination. The key
+    is the teacher's weights, not its name, so retraining a model in place
+    never reuses its old logits.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    key = _corpus_key(teacher_fingerprint(teacher), max_length, texts)
+    path = os.path.join(cache_dir, f"teacher_{key}.npy")
+    if os.path.exists(path):
+        print(f"📦 Using cached teacher logits: {path}")
+        return np.load(path)
+
+    print(f"🧑‍🏫 Scoring {len(texts):,} texts with teacher {teacher.model_name}...")
+    logits = np.asarray(teacher.logits_batch(texts, max_length=max_length, batch_size=batch_size),
+                        dtype=np.float32)
+    np.save(path, logits)
+    print(f"💾 Cached teacher logits to: {path}")
+    return logits
+
+def build_student(teacher: DetectorModel, student: str, num_layers: int) -> DetectorModel:
+    """
+    Build the student model.
+
+    `student="shallow"` keeps the teacher's architecture and tokenizer but only
+    its first `num_layers` encoder layers (initialized from the teacher). Any
+    other value is loaded as a Hub/local sequence-classification model, e.g.
+    ``distilroberta-base``. The student is placed on the teacher's device.
+    """
+    device = next(teacher.model.parameters()).device
+    if student == SHALLOW_STUDENT:
+        if not teacher.use_desklib:
+            raise ValueError("A shallow student needs a Desklib teacher.")
+        config = copy.deepcopy(teacher.model.config)
+        config.num_hidden_layers = num_layers
+        model = DesklibAIDetectionModel(config)
+        # Copy every teacher weight that still exists in the truncated model
+        missing = model.load_state_dict(teacher.model.state_dict(), strict=False)
+        print(f"🎓 Shallow student: {num_layers} layers ({len(missing.missing_keys)} weights left at init)")
+        return DetectorModel.from_parts(model.to(device), teacher.tokenizer, use_desklib=True,
+                                        model_name=f"{teacher.model_name}-shallow{num_layers}")
+
+    model = AutoModelForSequenceClassification.from_pretrained(student, num_labels=2)
+    tokenizer = AutoTokenizer.from_pretrained(student, use_fast=True)
+    return DetectorModel.from_parts(model.to(device), tokenizer, use_desklib=False, model_name=student)
+
+def train_student(student: DetectorModel, texts: List[str], teacher_logits: np.ndarray, cfg):
+    """Fit the student to the teacher's temperature-softened probabilities."""
+    if not len(texts):
+        raise ValueError("No texts to distill on.")
+    set_seed(cfg.seed)
+    T = cfg.distill_temperature
+    model = student.model
+    device = next(model.parameters()).device
+    targets = torch.sigmoid(torch.from_numpy(teacher_logits) / T).to(device)
+    model.train()
+    optimizer = AdamW(model.parameters(), lr=cfg.lr, weight_decay=cfg.weight_decay)
+    loss_fn = torch.nn.BCEWithLogitsLoss()
+    generator = torch.Generator().manual_seed(cfg.seed)
+
+    for epoch in range(cfg.distill_epochs):
+        order = torch.randperm(len(texts), generator=generator).tolist()
+        total, step = 0.0, 0
+        for step, start in enumerate(range(0, len(order), cfg.batch_size), 1):
+            idx = order[start:start + cfg.batch_size]
+            enc = student.tokenizer(
+                [texts[i] for i in idx],
+                truncation=True, padding=True,
+                max_length=cfg.max_length, return_tensors="pt"
+            )
+            logits = student._ai_logits(enc["input_ids"].to(device), enc["attention_mask"].to(device))
+            # Scale by T^2 so gradient magnitudes don't shrink with temperature
+            loss = loss_fn(logits / T, targets[idx]) * T * T
+            loss.backward()
+            optimizer.step()
+            optimizer.zero_grad()
+            total += loss.item()
+            if step % cfg.logging_steps == 0:
+                print(f"   epoch {epoch + 1} step {step}: loss={total / step:.4f}")
+        print(f"✅ Epoch {epoch + 1}/{cfg.distill_epochs} done, mean loss={total / max(step, 1):.4f}")
+    model.eval()
+    return student
+
+def _seconds_per_text(detector: DetectorModel, texts: List[str], max_length: int, batch_size: int) -> float:
+    detector.logits_batch(texts[:batch_size], max_length=max_length, batch_size=batch_size)  # warm-up
+    start = time.perf_counter()
+    detector.logits_batch(texts, max_length=max_length, batch_size=batch_size)
+    return (time.perf_counter() - start) / len(texts)
+
+def compare(teacher: DetectorModel, student: DetectorModel, texts: List[str],
+            labels: Optional[List[int]], max_length: int, batch_size: int) -> dict:
+    """Report student speedup and agreement/accuracy relative to the teacher."""
+    t_teacher = _seconds_per_text(teacher, texts, max_length, batch_size)
+    t_student = _seconds_per_text(student, texts, max_length, batch_size)
+    t_pred = np.array([l for _, l in teacher.predict_batch(texts, max_length=max_length, batch_size=batch_size)])
+    s_pred = np.array([l for _, l in student.predict_batch(texts, max_length=max_length, batch_size=batch_size)])
+
+    report = {
+        "teacher_ms_per_text": t_teacher * 1000,
+        "student_ms_per_text": t_student * 1000,
+        "speedup": t_teacher / t_student,
+        "agreement_with_teacher": float((t_pred == s_pred).mean()),
+    }
+    if labels is not None:
+        y = np.asarray(labels)
+        report["teacher_accuracy"] = float((t_pred == y).mean())
+        report["student_accuracy"] = float((s_pred == y).mean())
+    return report
@@ -1,80 +1,239 @@
 """
 Simple function to download Kaggle datasets directly in your code.
 No API token needed - just use kagglehub!
+
+Files are streamed into the data directory (a plain copy, or chunked
+conversion to Parquet) instead of being parsed with pandas and written back
+out. A manifest (``data/.datasets_manifest.json``) records the sha256 of every
+source file, so a re-run skips any dataset that hasn't changed. Multi-file
+datasets are processed in parallel. Where files come from is pluggable: a
+`LocalDirectorySource` can stand in for kagglehub, for example offline or in
+tests.
 """
-import kagglehub
-import pandas as pd
-from pathlib import Path
 import os
+import json
+import shutil
+import hashlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+MANIFEST_NAME = ".datasets_manifest.json"
+FORMATS = ("csv", "parquet")
+_HASH_CHUNK = 1 << 20
+
+class DatasetSource(ABC):
+    """Where dataset files come from: `fetch(slug)` returns a local directory holding them."""
+    name = "source"
+
+    @abstractmethod
+    def fetch(self, dataset_slug: str) -> str:
+        ...
+
+class KaggleHubSource(DatasetSource):
+    """Kaggle via kagglehub (downloads once into kagglehub's own cache)."""
+    name = "kagglehub"
+
+    def fetch(self, dataset_slug: str) -> str:
+        import kagglehub
+        return kagglehub.dataset_download(dataset_slug)
+
+class LocalDirectorySource(DatasetSource):
+    """Datasets laid out as ``<root>/<owner>/<dataset>/*.csv``."""
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def fetch(self, dataset_slug: str) -> str:
+        path = os.path.join(self.root, dataset_slug)
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"No local copy of {dataset_slug} at {path}")
+        return path
+
+def file_sha256(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def load_manifest(data_dir: str) -> dict:
+    try:
+        with open(os.path.join(data_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def _save_manifest(data_dir: str, manifest: dict):
+    path = os.path.join(data_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def _source_digest(src: Path, previous: dict) -> str:
+    # Same size and mtime as last time: trust the recorded hash instead of re-reading
+    stat = src.stat()
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        return previous["source_sha256"]
+    return file_sha256(src)
+
+def _csv_to_parquet(src: Path, dest: str):
+    """Stream CSV record batches into a Parquet file (bounded memory)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+    reader = pacsv.open_csv(src, read_options=pacsv.ReadOptions(block_size=16 << 20))
+    writer = None
+    try:
+        for batch in reader:
+            table = pa.Table.from_batches([batch])
+            if writer is None:
+                writer = pq.ParquetWriter(dest, table.schema)
+            else:
+                # Types are inferred from the first block; later blocks follow it
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:  # header-only CSV
+        pq.write_table(reader.schema.empty_table(), dest)
+
+def _materialize(src: Path, dest: str, fmt: str):
+    tmp = f"{dest}.tmp"
+    if fmt == "parquet":
+        _csv_to_parquet(src, tmp)
+    else:
+        shutil.copyfile(src, tmp)  # kernel-side copy, no parsing
+    os.replace(tmp, dest)
+
+def _output_path(src: Path, data_dir: str, fmt: str, output_path: str = None) -> str:
+    if output_path is None:
+        return os.path.join(data_dir, src.stem + (".parquet" if fmt == "parquet" else src.suffix))
+    if not os.path.isabs(output_path):
+        return os.path.join(data_dir, output_path)
+    return output_path
+
+def sync_dataset(dataset_slug: str, data_dir: str = "data", source: DatasetSource = None,
+                 fmt: str = "csv", files=None, output_names=None, max_workers: int = 4, force: bool = False):
+    """
+    Fetch a dataset and bring its CSV files into `data_dir`.
+
+    Args:
+        dataset_slug: Dataset identifier for `source`
+        data_dir: Directory to save into (holds the manifest too)
+        source: `DatasetSource` (default: `KaggleHubSource()`)
+        fmt: "csv" (streaming copy) or "parquet" (streaming conversion)
+        files: CSV file names to take, or a function picking from the list
+            of CSV paths (default: all in the dataset)
+        output_names: Optional mapping source file name -> output path
+        max_workers: Files processed in parallel
+        force: Re-process even if the manifest says nothing changed
+
+    Returns:
+        Dict of source file name -> output path
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    source = source or KaggleHubSource()
+    print(f"📥 Fetching dataset: {dataset_slug} ({source.name})")
+    download_path = source.fetch(dataset_slug)
+    print(f"✅ Available at: {download_path}")
+
+    csv_files = sorted(Path(download_path).glob("*.csv"))
+    if callable(files):
+        csv_files = files(csv_files)
+    elif files is not None:
+        csv_files = [p for p in csv_files if p.name in set(files)]
+    if not csv_files:
+        raise ValueError(f"No CSV files found in {download_path}")
+
+    os.makedirs(data_dir, exist_ok=True)
+    manifest = load_manifest(data_dir)
+    output_names = {} if output_names is None else output_names
 
-def download_kaggle_dataset(dataset_slug: str, output_path: str = None, data_dir: str = "data"):
+    def process(src: Path):
+        dest = _output_path(src, data_dir, fmt, output_names.get(src.name))
+        key = os.path.relpath(dest, data_dir)
+        previous = manifest.get(key)
+        digest = _source_digest(src, previous)
+        unchanged = (previous and previous.get("source_sha256") == digest
+                     and previous.get("format") == fmt and os.path.exists(dest))
+        if unchanged and not force:
+            print(f"⏭️  {src.name}: unchanged, keeping {dest}")
+        else:
+            print(f"📝 {src.name} -> {dest}")
+            _materialize(src, dest, fmt)
+        stat = src.stat()
+        entry = {
+            "dataset": dataset_slug, "source": source.name, "source_file": src.name,
+            "source_sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "format": fmt,
+        }
+        return src.name, dest, key, entry
+
+    outputs = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(csv_files)))) as pool:
+        for name, dest, key, entry in pool.map(process, csv_files):
+            outputs[name] = dest
+            manifest[key] = entry
+    _save_manifest(data_dir, manifest)
+    return outputs
+
+def download_kaggle_dataset(dataset_slug: str, output_path: str = None, data_dir: str = "data",
+                            source: DatasetSource = None, fmt: str = None, force: bool = False):
     """
     Download a Kaggle dataset and save it to your data directory.
-    
+
     Args:
         dataset_slug: Kaggle dataset slug (e.g., "shamimhasan8/ai-vs-human-text-dataset")
         output_path: Optional output filename (default: uses dataset filename)
         data_dir: Directory to save the dataset (default: "data")
-    
+        source: Optional `DatasetSource` (default: kagglehub)
+        fmt: "csv" or "parquet" (default: from output_path's extension, else csv)
+        force: Re-process even if unchanged
+
     Returns:
-        Path to the saved CSV file
-    
+        Path to the saved file
+
     Example:
         >>> from ai_text_detector.download_data import download_kaggle_dataset
         >>> csv_path = download_kaggle_dataset("shamimhasan8/ai-vs-human-text-dataset")
         >>> print(f"Dataset saved to: {csv_path}")
     """
-    print(f"📥 Downloading dataset: {dataset_slug}")
-    
-    # Download dataset
-    download_path = kagglehub.dataset_download(dataset_slug)
-    print(f"✅ Downloaded to: {download_path}")
-    
-    # Find CSV files
-    csv_files = list(Path(download_path).glob("*.csv"))
-    
-    if not csv_files:
-        raise ValueError(f"No CSV files found in {download_path}")
-    
-    # Use the first CSV (or largest if multiple)
-    if len(csv_files) > 1:
+    fmt = fmt or ("parquet" if str(output_path or "").endswith(".parquet") else "csv")
+    output_names = {}  # filled in once the file is picked
+
+    def largest(csv_files):
+        # Use the first CSV (or largest if multiple)
         csv_file = max(csv_files, key=lambda p: p.stat().st_size)
-        print(f"📊 Multiple CSVs found, using: {csv_file.name}")
-    else:
-        csv_file = csv_files[0]
-    
-    # Create output directory
-    os.makedirs(data_dir, exist_ok=True)
-    
-    # Determine output path
-    if output_path is None:
-        output_path = os.path.join(data_dir, csv_file.name)
-    elif not os.path.isabs(output_path):
-        output_path = os.path.join(data_dir, output_path)
-    
-    # Load and save
-    print(f"📝 Loading {csv_file.name}...")
-    df = pd.read_csv(csv_file)
-    print(f"   Rows: {len(df):,}")
-    print(f"   Columns: {list(df.columns)}")
-    
-    df.to_csv(output_path, index=False)
+        if len(csv_files) > 1:
+            print(f"📊 Multiple CSVs found, using: {csv_file.name}")
+        output_names[csv_file.name] = output_path
+        return [csv_file]
+
+    outputs = sync_dataset(dataset_slug, data_dir=data_dir, source=source, fmt=fmt, files=largest,
+                           output_names=output_names, force=force)
+    output_path = next(iter(outputs.values()))
     print(f"✅ Saved to: {output_path}")
-    
     return output_path
 
 # Convenience function for the specific dataset
 def download_ai_vs_human_dataset(output_path: str = "data/ai_vs_human_text.csv"):
     """
     Download the AI vs Human Text dataset.
-    
+
     Args:
         output_path: Where to save the dataset (default: "data/ai_vs_human_text.csv")
-    
+
     Returns:
         Path to the saved CSV file
     """
     return download_kaggle_dataset(
         "shamimhasan8/ai-vs-human-text-dataset",
-        output_path=output_path
+        output_path=os.path.basename(output_path),
+        data_dir=os.path.dirname(output_path) or "data"
     )
@@ -0,0 +1,202 @@
+"""
+Cached backbone embeddings and head-only retraining (Desklib head only).
+
+`DesklibAIDetectionModel` mean-pools the backbone output (`embed`) and feeds
+that vector to a single `nn.Linear`. To adapt or re-fit only that head, the
+backbone runs once over the data and the pooled vectors are cached::
+
+    <cache>/embeddings.npy    (rows, hidden) float16, memory-mapped; row i = text i of the data
+    <cache>/labels.npy        int8 label per row (-1 if the data has none)
+    <cache>/splits.npy        int8 TRAIN/VAL per row, from the dataset's persisted split
+    <cache>/embeddings.json   model, backbone fingerprint, max_length, rows, rows_done
+
+Texts are embedded longest-first so each batch pads little, and progress is
+flushed every few batches. An interrupted `embed` resumes where it stopped.
+`fit_head` then trains a logistic (or ridge) head on the matrix in seconds,
+and `write_head` puts it into the model's classifier.
+"""
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import torch
+from .splits import TRAIN, VAL, dataset_splits
+
+EMBEDDINGS_NAME = "embeddings.npy"
+META_NAME = "embeddings.json"
+HEAD_METHODS = ("logistic", "linear")
+
+def hash_weights(h, module):
+    """Feed every tensor of `module`'s state dict (names and raw bytes) into hash `h`."""
+    for name, tensor in module.state_dict().items():
+        h.update(name.encode("utf-8"))
+        h.update(tensor.detach().cpu().contiguous().view(-1).view(torch.uint8).numpy())
+    return h
+
+def backbone_fingerprint(detector, max_length: int) -> str:
+    """Digest of the backbone weights, tokenizer and max_length: everything the embeddings depend on."""
+    h = hash_weights(hashlib.blake2b(digest_size=16), detector.model.model)
+    tokenizer = detector.tokenizer
+    h.update(f"{type(tokenizer).__name__}\0{len(tokenizer)}\0{max_length}".encode("utf-8"))
+    return h.hexdigest()
+
+def _data_key(texts) -> str:
+    from .hashing import content_hashes
+    return hashlib.blake2b("\n".join(content_hashes(texts)).encode("ascii"), digest_size=16).hexdigest()
+
+def _read_meta(cache_dir: str):
+    path = os.path.join(cache_dir, META_NAME)
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_meta(cache_dir: str, meta: dict):
+    path = os.path.join(cache_dir, META_NAME)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+def build_embeddings(detector, df, cache_dir: str, data_path: str = None, max_length: int = 256,
+                     batch_size: int = 32, val_fraction: float = 0.2, seed: int = 42,
+                     flush_every: int = 20) -> dict:
+    """
+    Embed every row of `df` into `cache_dir` and return its metadata.
+
+    Labels and the persisted train/validation split of `data_path` are stored
+    alongside, so `fit_head` can train on one and report on the other.
+    """
+    if not detector.use_desklib:
+        raise ValueError("Cached embeddings need the Desklib mean-pooling head (DesklibAIDetectionModel).")
+    texts = df["text"].astype(str).tolist()
+    n, hidden = len(texts), detector.model.config.hidden_size
+    fingerprint = backbone_fingerprint(detector, max_length)
+    data_key = _data_key(texts)
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, EMBEDDINGS_NAME)
+
+    meta = _read_meta(cache_dir)
+    resume = (meta is not None and os.path.isfile(path) and meta["fingerprint"] == fingerprint
+              and meta["data"] == data_key and meta["rows_done"] < meta["rows"])
+    if meta is not None and meta["fingerprint"] == fingerprint and meta["data"] == data_key \
+            and meta["rows_done"] == meta["rows"]:
+        print(f"📦 Embeddings already cached in {cache_dir} ({n:,} x {hidden})")
+        return meta
+    if meta is not None and not resume:
+        print(f"🔁 {cache_dir} holds embeddings of another model or dataset; rebuilding")
+    if resume:
+        X = np.load(path, mmap_mode="r+")
+        print(f"⏯️  Resuming embeddings at row {meta['rows_done']:,} of {n:,}")
+    else:
+        X = np.lib.format.open_memmap(path, mode="w+", dtype=np.float16, shape=(n, hidden))
+        labels = df["label"].to_numpy(dtype=np.int8) if "label" in df.columns else np.full(n, -1, dtype=np.int8)
+        splits = dataset_splits(df, data_path, val_fraction, seed) if data_path else np.full(n, TRAIN, dtype=np.int8)
+        np.save(os.path.join(cache_dir, "labels.npy"), labels)
+        np.save(os.path.join(cache_dir, "splits.npy"), splits)
+        meta = {
+            "model": detector.model_name,
+            "fingerprint": fingerprint,
+            "data": data_key,
+            "data_path": data_path,
+            "max_length": max_length,
+            "rows": n,
+            "hidden": hidden,
+            "dtype": "float16",
+            "rows_done": 0,
+        }
+        _write_meta(cache_dir, meta)
+
+    # Longest first: batches of similar length pad little, and an OOM shows up at once
+    order = np.argsort(-np.fromiter((len(t) for t in texts), dtype=np.int64, count=n), kind="stable")
+    model, tokenizer = detector.model, detector.tokenizer
+    device = next(model.parameters()).device
+    model.eval()
+    start_row, start = meta["rows_done"], time.perf_counter()
+    with torch.no_grad():
+        for b, offset in enumerate(range(start_row, n, batch_size), 1):
+            idx = order[offset:offset + batch_size]
+            enc = tokenizer([texts[i] for i in idx], truncation=True, padding=True,
+                            max_length=max_length, return_tensors="pt")
+            pooled = model.embed(enc["input_ids"].to(device), enc["attention_mask"].to(device))
+            X[idx] = pooled.float().cpu().numpy()
+            if b % flush_every == 0 or offset + batch_size >= n:
+                X.flush()
+                meta["rows_done"] = min(offset + batch_size, n)
+                _write_meta(cache_dir, meta)
+                elapsed = time.perf_counter() - start
+                print(f"   {meta['rows_done']:,}/{n:,} rows ({(meta['rows_done'] - start_row) / elapsed:.1f} texts/s)")
+    print(f"✅ Embeddings cached in {cache_dir}: {n:,} x {hidden} float16 ({X.nbytes / 2**20:.0f}MB)")
+    return meta
+
+def load_embeddings(cache_dir: str):
+    """(memory-mapped embeddings, labels, splits, meta) of a complete cache."""
+    meta = _read_meta(cache_dir)
+    if meta is None:
+        raise ValueError(f"{cache_dir} has no {META_NAME}; run `ai-detector embed` first")
+    if meta["rows_done"] < meta["rows"]:
+        raise ValueError(f"{cache_dir} is incomplete ({meta['rows_done']:,}/{meta['rows']:,} rows); "
+                         f"rerun `ai-detector embed` to resume")
+    X = np.load(os.path.join(cache_dir, EMBEDDINGS_NAME), mmap_mode="r")
+    labels = np.load(os.path.join(cache_dir, "labels.npy"))
+    splits = np.load(os.path.join(cache_dir, "splits.npy"))
+    return X, labels, splits, meta
+
+def head_logits(X, w, b, chunk_rows: int = 65536) -> np.ndarray:
+    """X @ w + b over a (memory-mapped) matrix, a chunk at a time."""
+    w = np.asarray(w, dtype=np.float32)
+    return np.concatenate([np.asarray(X[i:i + chunk_rows], dtype=np.float32) @ w + b
+                           for i in range(0, len(X), chunk_rows)] or [np.zeros(0, dtype=np.float32)])
+
+def current_head(detector):
+    """(weights, bias) of the model's classifier as NumPy."""
+    clf = detector.model.classifier
+    return clf.weight.detach().float().cpu().numpy().ravel(), float(clf.bias.detach().float().cpu())
+
+def fit_head(X, y, rows, method: str = "logistic", C: float = 1.0, chunk_rows: int = 65536):
+    """
+    Fit (weights, bias) of a new head on `X[rows]` / `y[rows]`.
+
+    "logistic" is scikit-learn's LogisticRegression on the rows, loaded as
+    float32. "linear" is ridge regression onto -1/+1 targets: its normal
+    equations are summed chunk by chunk over the memmap, so memory stays at
+    hidden x hidden. The ridge scores are then mapped onto logits with a
+    Platt fit, so sigmoid(logit) is still a probability.
+    """
+    rows = np.sort(np.asarray(rows))
+    if method == "logistic":
+        from sklearn.linear_model import LogisticRegression
+        clf = LogisticRegression(C=C, max_iter=1000)
+        clf.fit(np.asarray(X[rows], dtype=np.float32), y[rows])
+        return clf.coef_.ravel(), float(clf.intercept_[0])
+    if method != "linear":
+        raise ValueError(f"Unknown head method: {method} (expected one of {HEAD_METHODS})")
+    d = X.shape[1]
+    gram = np.zeros((d + 1, d + 1))
+    rhs = np.zeros(d + 1)
+    for i in range(0, len(rows), chunk_rows):
+        part = rows[i:i + chunk_rows]
+        Xc = np.hstack([np.asarray(X[part], dtype=np.float64), np.ones((len(part), 1))])
+        gram += Xc.T @ Xc
+        rhs += Xc.T @ (2.0 * y[part] - 1.0)
+    reg = np.eye(d + 1) / C
+    reg[-1, -1] = 0.0  # don't shrink the bias
+    w = np.linalg.solve(gram + reg, rhs)
+    from .scores import PlattCalibrator
+    scores = head_logits(X[rows], w[:-1], w[-1], chunk_rows)
+    platt = PlattCalibrator.fit(y[rows], 1.0 / (1.0 + np.exp(-scores.astype(np.float64))))
+    return w[:-1] * platt.a, float(w[-1] * platt.a + platt.b)
+
+def write_head(detector, w, b):
+    """Copy (weights, bias) into the model's classifier. A saved calibration no longer applies."""
+    clf = detector.model.classifier
+    with torch.no_grad():
+        clf.weight.copy_(torch.as_tensor(np.asarray(w), dtype=clf.weight.dtype).view_as(clf.weight))
+        clf.bias.fill_(float(b))
+    detector.calibration = None
+    return detector
+
+def split_rows(labels, splits):
+    """Row indices of labeled training and validation rows."""
+    labeled = labels >= 0
+    return np.flatnonzero(labeled & (splits == TRAIN)), np.flatnonzero(labeled & (splits == VAL))
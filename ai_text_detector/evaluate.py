@@ -1,17 +1,95 @@
 import numpy as np
-import torch
 from sklearn.metrics import classification_report, accuracy_score, f1_score, confusion_matrix
+from .profiling import NullProfiler
 
-def evaluate(model, tokenizer, df, max_length=256):
-    enc = tokenizer(
-        df["text"].tolist(),
-        truncation=True, padding="max_length",
-        max_length=max_length, return_tensors="pt"
-    )
-    with torch.no_grad():
-        outputs = model(**enc)
-    preds = outputs.logits.argmax(dim=1).cpu().numpy()
-    y = df["label"].to_numpy()
+def _ai_logits(outputs):
+    logits = outputs["logits"] if isinstance(outputs, dict) else outputs.logits
+    if logits.shape[-1] == 1:
+        # Desklib head: single AI logit
+        return logits.view(-1)
+    # softmax(...)[1] == sigmoid(logit[1] - logit[0])
+    return logits[:, 1] - logits[:, 0]
+
+def score_rows(df, score_fn, scores_path=None, scores_meta=None, reuse=True):
+    """
+    AI probability for every row of `df`, via `score_fn(texts) -> probabilities`.
+
+    With `scores_path`, rows whose content hash is already in that score file
+    are reused if the file was written under the same model fingerprint (see
+    `scores.model_fingerprint`). Only new or changed texts go through
+    `score_fn`. The file is then rewritten to cover exactly `df`.
+    """
+    if not scores_path:
+        return np.asarray(score_fn(df["text"].tolist()), dtype=np.float64)
+    from .hashing import content_hashes
+    from .scores import lookup_scores, write_scores
+    meta = dict(scores_meta or {})
+    hashes = df["content_hash"].to_numpy(dtype=str) if "content_hash" in df.columns \
+        else np.array(content_hashes(df["text"]), dtype=str)
+    probs, found = np.full(len(df), np.nan), np.zeros(len(df), dtype=bool)
+    if reuse:
+        probs, found = lookup_scores(scores_path, hashes, meta.get("fingerprint"))
+    todo = np.flatnonzero(~found)
+    if len(todo):
+        texts = df["text"].to_numpy()[todo].tolist()
+        probs[todo] = np.asarray(score_fn(texts), dtype=np.float64)
+    meta.update(reused=int(found.sum()), scored=len(todo))
+    print(f"♻️  Reused {meta['reused']:,} cached scores, scored {meta['scored']:,} new or changed rows")
+    write_scores(scores_path, probs, labels=df["label"].to_numpy(), content_hashes=hashes, meta=meta)
+    return probs
+
+def _model_probabilities(model, tokenizer, texts, max_length, batch_size, profiler, calibration):
+    import torch  # only transformer models need it; evaluate_detector stays torch-free
+    model.eval()
+    batches = []
+    with profiler:
+        for start in range(0, len(texts), batch_size):
+            enc = tokenizer(
+                texts[start:start + batch_size],
+                truncation=True, padding="max_length",
+                max_length=max_length, return_tensors="pt"
+            )
+            with torch.no_grad():
+                outputs = model(input_ids=enc["input_ids"], attention_mask=enc["attention_mask"])
+            logits = _ai_logits(outputs)
+            if calibration is not None:
+                logits = calibration.apply_logits(logits)
+            batches.append(torch.sigmoid(logits).cpu().numpy())
+            profiler.step()
+    return np.concatenate(batches) if batches else np.array([], dtype=np.float32)
+
+def evaluate(model, tokenizer, df, max_length=256, batch_size=32, profiler=None,
+             calibration=None, scores_path=None, scores_meta=None, reuse=True):
+    """
+    Evaluate a raw model/tokenizer pair. With `scores_path`, per-row AI
+    probabilities are also written there, and cached ones reused (see
+    `score_rows`); `calibration` is applied to the logits first, as
+    `DetectorModel` does when serving.
+    """
+    profiler = profiler or NullProfiler()
+    probs = score_rows(df, lambda texts: _model_probabilities(model, tokenizer, texts, max_length, batch_size,
+                                                              profiler, calibration),
+                       scores_path, scores_meta, reuse)
+    report(df["label"].to_numpy(), (probs >= 0.5).astype(int))
+
+def _detector_probabilities(detector, texts, max_length, batch_size, profiler):
+    probs = []
+    with profiler:
+        for start in range(0, len(texts), batch_size):
+            probs.extend(p for p, _ in detector.predict_batch(texts[start:start + batch_size],
+                                                              max_length=max_length, batch_size=batch_size))
+            profiler.step()
+    return probs
+
+def evaluate_detector(detector, df, max_length=256, batch_size=32, profiler=None,
+                      scores_path=None, scores_meta=None, reuse=True):
+    """Evaluate anything with a `predict_batch` API (e.g. `LinearDetector`)."""
+    profiler = profiler or NullProfiler()
+    probs = score_rows(df, lambda texts: _detector_probabilities(detector, texts, max_length, batch_size, profiler),
+                       scores_path, scores_meta, reuse)
+    report(df["label"].to_numpy(), (probs >= 0.5).astype(int))
+
+def report(y, preds):
     print("Accuracy:", round(accuracy_score(y, preds), 4))
     print("F1 (macro):", round(f1_score(y, preds, average="macro"), 4))
     print("\nReport:\n", classification_report(y, preds, digits=4))
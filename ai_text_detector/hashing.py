@@ -0,0 +1,22 @@
+"""
+Content hashes for texts (no torch/transformers import).
+
+A text's key is the blake2b-128 hex digest of its whitespace-normalized form.
+So two texts that differ only in leading/trailing whitespace or in runs of
+spaces/newlines count as the same document. Keys are stable across runs and
+machines, so they can be stored and compared later.
+"""
+import re
+import hashlib
+from typing import Iterable, List
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", str(text)).strip()
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).hexdigest()
+
+def content_hashes(texts: Iterable[str]) -> List[str]:
+    return [content_hash(t) for t in texts]
@@ -0,0 +1,217 @@
+"""
+Asynchronous scoring jobs with an on-disk store.
+
+A job is a batch of texts or one long document (split into chunks). Each job
+lives in its own directory::
+
+    <root>/<job_id>/job.json        status, progress, summary
+    <root>/<job_id>/input.json      texts to score
+    <root>/<job_id>/results.ndjson  one JSON line per scored text, in order
+
+Results are appended as they are produced, so clients can read them
+incrementally, and a restarted process resumes unfinished jobs from the
+last complete result line. A per-job file lock keeps several server
+processes from working on the same job.
+"""
+import os
+import re
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process only
+    fcntl = None
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+def split_document(document: str, target_chars: int = 2000):
+    """Split on blank lines, merging paragraphs into chunks of about `target_chars`."""
+    chunks, current = [], ""
+    for para in re.split(r"\n\s*\n", document):
+        para = para.strip()
+        if not para:
+            continue
+        if current and len(current) + len(para) + 2 > target_chars:
+            chunks.append(current)
+            current = para
+        else:
+            current = f"{current}\n\n{para}" if current else para
+    if current:
+        chunks.append(current)
+    return chunks
+
+class JobStore:
+    """Directory-per-job persistence; safe to share between processes."""
+    def __init__(self, root="jobs"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, job_id):
+        if not _JOB_ID.match(job_id):
+            raise KeyError(job_id)
+        return os.path.join(self.root, job_id)
+
+    def create(self, texts, kind="batch"):
+        job_id = uuid.uuid4().hex
+        path = self._dir(job_id)
+        os.makedirs(path)
+        with open(os.path.join(path, "input.json"), "w", encoding="utf-8") as f:
+            json.dump(texts, f)
+        open(os.path.join(path, "results.ndjson"), "w").close()
+        now = time.time()
+        self.write_status(job_id, {
+            "id": job_id, "kind": kind, "status": "queued",
+            "total": len(texts), "completed": 0,
+            "created": now, "updated": now, "error": None, "summary": None,
+        })
+        return job_id
+
+    def write_status(self, job_id, status):
+        path = os.path.join(self._dir(job_id), "job.json")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(status, f)
+        os.replace(tmp, path)  # atomic, readers never see a half-written file
+
+    def status(self, job_id):
+        try:
+            with open(os.path.join(self._dir(job_id), "job.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, KeyError):
+            return None
+
+    def texts(self, job_id):
+        with open(os.path.join(self._dir(job_id), "input.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def results_path(self, job_id):
+        return os.path.join(self._dir(job_id), "results.ndjson")
+
+    def iter_results(self, job_id, offset=0, limit=None):
+        """Parsed result lines from `offset` on (complete lines only)."""
+        with open(self.results_path(job_id), "r", encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                if i < offset or not line.endswith("\n"):
+                    continue
+                if limit is not None and i >= offset + limit:
+                    break
+                yield json.loads(line)
+
+    def recover_results(self, job_id):
+        """Drop a partially written last line; return the number of complete results."""
+        path = self.results_path(job_id)
+        with open(path, "rb") as f:
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) != len(data):
+            with open(path, "wb") as f:
+                f.write(complete)
+        return complete.count(b"\n")
+
+    def job_ids(self):
+        return sorted(name for name in os.listdir(self.root) if _JOB_ID.match(name))
+
+    def try_lock(self, job_id):
+        """Exclusive per-job lock (file handle) or None if another process holds it."""
+        handle = open(os.path.join(self._dir(job_id), "lock"), "w")
+        if fcntl is None:
+            return handle
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return handle
+        except OSError:
+            handle.close()
+            return None
+
+class JobManager:
+    """
+    Runs jobs on a bounded thread pool, scoring through `scheduler` at bulk
+    priority in chunks of `chunk_size` texts.
+    """
+    def __init__(self, store: JobStore, scheduler, max_workers=2, chunk_size=64, max_length=768):
+        self.store = store
+        self.scheduler = scheduler
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.max_length = max_length
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # Created on first use so a manager built before fork works in the workers
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+            return self._executor
+
+    def submit_texts(self, texts):
+        job_id = self.store.create([str(t) for t in texts], kind="batch")
+        self._pool().submit(self._run, job_id)
+        return job_id
+
+    def submit_document(self, document):
+        job_id = self.store.create(split_document(document), kind="document")
+        self._pool().submit(self._run, job_id)
+        return job_id
+
+    def resume(self):
+        """Re-queue jobs left queued/running by a previous process; returns their ids."""
+        resumed = []
+        for job_id in self.store.job_ids():
+            status = self.store.status(job_id)
+            if status and status["status"] in ("queued", "running"):
+                self._pool().submit(self._run, job_id)
+                resumed.append(job_id)
+        return resumed
+
+    def _run(self, job_id):
+        lock = self.store.try_lock(job_id)
+        if lock is None:
+            return  # another process owns this job
+        try:
+            status = self.store.status(job_id)
+            if status is None or status["status"] in ("done", "failed"):
+                return
+            texts = self.store.texts(job_id)
+            done = self.store.recover_results(job_id)
+            status.update(status="running", completed=done, updated=time.time())
+            self.store.write_status(job_id, status)
+            try:
+                with open(self.store.results_path(job_id), "a", encoding="utf-8") as out:
+                    for start in range(done, len(texts), self.chunk_size):
+                        chunk = texts[start:start + self.chunk_size]
+                        results = self.scheduler.predict_batch(chunk, max_length=self.max_length,
+                                                               priority="bulk")
+                        for i, (prob, label) in enumerate(results, start):
+                            line = {"index": i, "ai_probability": prob, "label": label}
+                            if status["kind"] == "document":
+                                line["chars"] = len(texts[i])
+                            out.write(json.dumps(line) + "\n")
+                        out.flush()
+                        status.update(completed=start + len(chunk), updated=time.time())
+                        self.store.write_status(job_id, status)
+                status.update(status="done", updated=time.time(), summary=self._summary(job_id, status))
+            except Exception as e:
+                status.update(status="failed", error=str(e), updated=time.time())
+            self.store.write_status(job_id, status)
+        finally:
+            lock.close()
+
+    def _summary(self, job_id, status):
+        results = list(self.store.iter_results(job_id))
+        if not results:
+            return None
+        if status["kind"] == "document":
+            # Length-weighted so short chunks (headings etc.) don't dominate
+            total = sum(r["chars"] for r in results)
+            prob = sum(r["ai_probability"] * r["chars"] for r in results) / max(total, 1)
+        else:
+            prob = sum(r["ai_probability"] for r in results) / len(results)
+        return {
+            "mean_ai_probability": prob,
+            "ai_fraction": sum(r["label"] for r in results) / len(results),
+        }
@@ -0,0 +1,88 @@
+"""
+Hashed n-gram linear detector - a torch-free baseline.
+
+Character (3-5, word-bounded) and word (1-2) n-grams are hashed into a fixed
+feature space and scored by a logistic-regression model. Training takes
+seconds and prediction needs only NumPy/scikit-learn, which makes it useful as
+a fast sanity baseline, a cascade first stage and a fallback under overload.
+"""
+import os
+import json
+from typing import List
+import numpy as np
+from scipy import sparse
+from scipy.special import expit
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import LogisticRegression
+
+MANIFEST_NAME = "linear_detector.json"
+WEIGHTS_NAME = "linear_weights.npy"
+
+def is_linear_model_dir(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+class LinearDetector:
+    """Hashed char+word n-gram logistic regression with the `DetectorModel` predict API."""
+    use_desklib = False
+
+    def __init__(self, n_features: int = 2**20, C: float = 1.0, model_name: str = "linear"):
+        self.n_features = n_features
+        self.C = C
+        self.model_name = model_name
+        self.coef = np.zeros(2 * n_features, dtype=np.float32)
+        self.intercept = 0.0
+        self.calibration = None  # scores.PlattCalibrator, set by DetectorModel.load
+        # HashingVectorizer is stateless, so nothing but the weights needs saving
+        self._char = HashingVectorizer(analyzer="char_wb", ngram_range=(3, 5), n_features=n_features,
+                                       alternate_sign=False, norm="l2", lowercase=True)
+        self._word = HashingVectorizer(analyzer="word", ngram_range=(1, 2), n_features=n_features,
+                                       alternate_sign=False, norm="l2", lowercase=True)
+
+    def features(self, texts: List[str]):
+        return sparse.hstack([self._char.transform(texts), self._word.transform(texts)], format="csr")
+
+    def fit(self, texts: List[str], labels: List[int]):
+        clf = LogisticRegression(C=self.C, solver="liblinear", max_iter=1000)
+        clf.fit(self.features(texts), np.asarray(labels))
+        self.coef = clf.coef_.ravel().astype(np.float32)
+        self.intercept = float(clf.intercept_[0])
+        return self
+
+    def logits_batch(self, texts, max_length=None, batch_size=None):
+        # max_length/batch_size are accepted for API parity with DetectorModel
+        logits = self.features(list(texts)) @ self.coef + self.intercept
+        if self.calibration is not None:
+            logits = self.calibration.apply_logits(logits)
+        return logits.tolist()
+
+    def predict(self, text, max_length=None, threshold=0.5):
+        """Return (AI probability, label) for one text."""
+        logit = self.logits_batch([text])[0]
+        probability = float(expit(logit))  # no overflow for large |logit|
+        return probability, 1 if probability >= threshold else 0
+
+    def predict_batch(self, texts, max_length=None, threshold=0.5, batch_size=None):
+        probs = expit(np.asarray(self.logits_batch(texts), dtype=np.float64)).tolist()
+        return [(p, 1 if p >= threshold else 0) for p in probs]
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, WEIGHTS_NAME), self.coef)
+        with open(os.path.join(path, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump({
+                "model_type": "linear",
+                "n_features": self.n_features,
+                "C": self.C,
+                "intercept": self.intercept,
+            }, f, indent=2)
+        from .scores import save_calibration
+        save_calibration(self.calibration, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(os.path.join(path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        obj = cls(n_features=manifest["n_features"], C=manifest["C"], model_name=path)
+        obj.coef = np.load(os.path.join(path, WEIGHTS_NAME))
+        obj.intercept = manifest["intercept"]
+        return obj
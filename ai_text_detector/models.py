@@ -1,5 +1,7 @@
 import os
 import sys
+import time
+import threading
 
 # Disable tokenizer parallelism and MPS on macOS
 if os.getenv("TOKENIZERS_PARALLELISM") is None:
@@ -20,9 +22,12 @@ class DesklibAIDetectionModel(PreTrainedModel):
         # Define a classifier head
         self.classifier = nn.Linear(config.hidden_size, 1)
         # Initialize weights
-        self.init_weights()
+        self.post_init()
     
-    def forward(self, input_ids, attention_mask=None, labels=None):
+    def embed(self, input_ids, attention_mask=None):
+        """Mean-pooled backbone output, i.e. the classifier's input (see embeddings.py)."""
+        if attention_mask is None:
+            attention_mask = torch.ones_like(input_ids)
         # Forward pass through the transformer
         outputs = self.model(input_ids=input_ids, attention_mask=attention_mask)
         last_hidden_state = outputs[0]
@@ -31,7 +36,10 @@ class DesklibAIDetectionModel(PreTrainedModel):
         input_mask_expanded = attention_mask.unsqueeze(-1).expand(last_hidden_state.size()).float()
         sum_embeddings = torch.sum(last_hidden_state * input_mask_expanded, dim=1)
         sum_mask = torch.clamp(input_mask_expanded.sum(dim=1), min=1e-9)
-        pooled_output = sum_embeddings / sum_mask
+        return sum_embeddings / sum_mask
+
+    def forward(self, input_ids, attention_mask=None, labels=None):
+        pooled_output = self.embed(input_ids, attention_mask)
         
         # Classifier
         logits = self.classifier(pooled_output)
@@ -56,6 +64,7 @@ class DetectorModel:
             use_desklib: If True, use Desklib model architecture. If False, use standard classification.
         """
         self.model_name = model_name
+        self.calibration = None  # scores.PlattCalibrator, applied to logits before the sigmoid
         self.use_desklib = use_desklib
         
         if use_desklib and "desklib" in model_name:
@@ -173,6 +182,22 @@ class DetectorModel:
             self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
             self.use_desklib = False
 
+    def _ai_logits(self, input_ids, attention_mask):
+        """
+        Return one AI-vs-human logit per row, so sigmoid(logit) is the AI probability
+        for both the Desklib head and standard 2-class heads.
+        """
+        outputs = self.model(input_ids=input_ids, attention_mask=attention_mask)
+        if self.use_desklib:
+            return outputs["logits"].view(-1)
+        # For standard models: logit[0] = human, logit[1] = AI;
+        # softmax(...)[1] == sigmoid(logit[1] - logit[0])
+        return outputs.logits[:, 1] - outputs.logits[:, 0]
+
+    def _calibrated(self, logits):
+        """Apply the saved calibration (if any) to a tensor of AI logits."""
+        return logits if self.calibration is None else self.calibration.apply_logits(logits)
+
     def predict(self, text, max_length=768, threshold=0.5):
         """
         Predict if text is AI-generated.
@@ -205,26 +230,101 @@ class DetectorModel:
         # Predict
         self.model.eval()
         with torch.no_grad():
-            if self.use_desklib:
-                outputs = self.model(input_ids=input_ids, attention_mask=attention_mask)
-                logits = outputs["logits"]
-                probability = torch.sigmoid(logits).item()
-            else:
-                outputs = self.model(input_ids=input_ids, attention_mask=attention_mask)
-                probs = torch.softmax(outputs.logits, dim=1)
-                # For standard models: prob[0] = human, prob[1] = AI
-                probability = probs[0][1].item()
-            
+            probability = torch.sigmoid(self._calibrated(self._ai_logits(input_ids, attention_mask))).item()
             label = 1 if probability >= threshold else 0
         
         return probability, label
 
+    def logits_batch(self, texts, max_length=768, batch_size=16):
+        """
+        AI logits for many texts (sigmoid gives the AI probability).
+        
+        Batches are padded to their longest member rather than to `max_length`;
+        padding is masked out, so results match `predict`.
+        """
+        return self.logits_and_lengths(texts, max_length=max_length, batch_size=batch_size)[0]
+
+    def logits_and_lengths(self, texts, max_length=768, batch_size=16):
+        """Like `logits_batch`, but also return the number of tokens scored per text."""
+        device = next(self.model.parameters()).device
+        self.model.eval()
+        logits, lengths = [], []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                list(texts[start:start + batch_size]),
+                padding=True,
+                truncation=True,
+                max_length=max_length,
+                return_tensors='pt'
+            )
+            with torch.no_grad():
+                logits.extend(self._ai_logits(
+                    encoded['input_ids'].to(device),
+                    encoded['attention_mask'].to(device),
+                ).tolist())
+            lengths.extend(encoded['attention_mask'].sum(dim=1).tolist())
+        if self.calibration is not None:
+            logits = self._calibrated(torch.tensor(logits)).tolist()
+        return logits, lengths
+
+    def predict_batch(self, texts, max_length=768, threshold=0.5, batch_size=16):
+        """
+        Batched version of `predict`.
+        
+        Returns:
+            list of (probability, label) tuples, in input order
+        """
+        logits = torch.tensor(self.logits_batch(texts, max_length=max_length, batch_size=batch_size))
+        probs = torch.sigmoid(logits).tolist()
+        return [(p, 1 if p >= threshold else 0) for p in probs]
+
+    def predict_packed(self, texts, max_length=768, threshold=0.5, pack_length=256, packs_per_batch=8):
+        """
+        Like `predict_batch`, but packs several short texts into each sequence
+        (block-diagonal attention, per-text pooling) instead of padding them.
+        Desklib models only.
+        """
+        from .packing import packed_logits
+        logits = packed_logits(self, texts, max_length=max_length,
+                               pack_length=pack_length, packs_per_batch=packs_per_batch)
+        probs = torch.sigmoid(self._calibrated(torch.tensor(logits))).tolist()
+        return [(p, 1 if p >= threshold else 0) for p in probs]
+
     def save(self, path: str):
         self.model.save_pretrained(path)
         self.tokenizer.save_pretrained(path)
+        from .scores import save_calibration
+        save_calibration(self.calibration, path)
+
+    @classmethod
+    def from_parts(cls, model, tokenizer, use_desklib: bool, model_name: str):
+        """Wrap an already-built model and tokenizer without loading anything."""
+        obj = cls.__new__(cls)
+        obj.model_name = model_name
+        obj.model = model
+        obj.tokenizer = tokenizer
+        obj.use_desklib = use_desklib
+        obj.calibration = None
+        return obj
 
     @classmethod
     def load(cls, path: str):
+        """Load any saved detector directory, with its calibration.json if there is one."""
+        from .scores import attach_calibration
+        return attach_calibration(cls._load_weights(path), path)
+
+    @classmethod
+    def _load_weights(cls, path: str):
+        # Hashed n-gram linear models share the predict API but not torch
+        from .linear import is_linear_model_dir, LinearDetector
+        if is_linear_model_dir(path):
+            return LinearDetector.load(path)
+
+        # Self-describing bundles (ai-detector bundle) load via mmap in one step
+        from .bundle import is_bundle_dir, load_bundle
+        if is_bundle_dir(path):
+            return load_bundle(path)
+
         # Try to detect if it's a Desklib model
         try:
             config = AutoConfig.from_pretrained(path)
@@ -232,21 +332,161 @@ class DetectorModel:
             if hasattr(config, 'model_type') and 'deberta' in config.model_type.lower():
                 model = DesklibAIDetectionModel.from_pretrained(path)
                 tokenizer = AutoTokenizer.from_pretrained(path)
-                obj = cls.__new__(cls)
-                obj.model_name = path
-                obj.model = model
-                obj.tokenizer = tokenizer
-                obj.use_desklib = True
-                return obj
+                return cls.from_parts(model, tokenizer, use_desklib=True, model_name=path)
         except:
             pass
         
         # Fallback to standard model
         model = AutoModelForSequenceClassification.from_pretrained(path)
         tokenizer = AutoTokenizer.from_pretrained(path, use_fast=True)
-        obj = cls.__new__(cls)
-        obj.model_name = path
-        obj.model = model
-        obj.tokenizer = tokenizer
-        obj.use_desklib = False
-        return obj
+        return cls.from_parts(model, tokenizer, use_desklib=False, model_name=path)
+
+class EscalationStats:
+    """Thread-safe counters shared by the two-stage serving wrappers."""
+    def __init__(self, low, high):
+        if not 0.0 <= low <= high <= 1.0:
+            raise ValueError(f"Invalid uncertainty band: [{low}, {high}]")
+        self.low = low
+        self.high = high
+        self._lock = threading.Lock()
+        self._counts = {"texts": 0, "escalated": 0, "tokens": 0,
+                        "stage1_seconds": 0.0, "stage2_seconds": 0.0}
+
+    def uncertain(self, probability):
+        return self.low <= probability <= self.high
+
+    def record(self, texts, escalated, stage1_seconds, stage2_seconds, tokens=0):
+        with self._lock:
+            self._counts["texts"] += texts
+            self._counts["escalated"] += escalated
+            self._counts["tokens"] += tokens
+            self._counts["stage1_seconds"] += stage1_seconds
+            self._counts["stage2_seconds"] += stage2_seconds
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        texts = counts["texts"]
+        counts["stage1_answered"] = texts - counts["escalated"]
+        counts["escalation_rate"] = counts["escalated"] / texts if texts else 0.0
+        counts["avg_tokens_per_text"] = counts["tokens"] / texts if texts else 0.0
+        counts["band"] = [self.low, self.high]
+        return counts
+
+class CascadeDetector:
+    """
+    Two-stage confidence cascade.
+    
+    A cheap first stage (a small fine-tuned transformer or any object with the
+    same `predict`/`predict_batch` interface) answers every text whose AI
+    probability is outside the uncertainty band [low, high]; the rest escalate
+    to the full second-stage model. Counters in `stats()` show how often that
+    happens and how much time each stage costs.
+    """
+    def __init__(self, first_stage, second_stage, low=0.1, high=0.9):
+        self.first_stage = first_stage
+        self.second_stage = second_stage
+        self._stats = EscalationStats(low, high)
+
+    # Expose the second stage so callers that inspect the model keep working
+    @property
+    def model(self):
+        return self.second_stage.model
+
+    @property
+    def tokenizer(self):
+        return self.second_stage.tokenizer
+
+    @property
+    def model_name(self):
+        return self.second_stage.model_name
+
+    def predict(self, text, max_length=768, threshold=0.5):
+        start = time.perf_counter()
+        probability, label = self.first_stage.predict(text, max_length=max_length, threshold=threshold)
+        t1 = time.perf_counter() - start
+        if not self._stats.uncertain(probability):
+            self._stats.record(1, 0, t1, 0.0)
+            return probability, label
+        start = time.perf_counter()
+        result = self.second_stage.predict(text, max_length=max_length, threshold=threshold)
+        self._stats.record(1, 1, t1, time.perf_counter() - start)
+        return result
+
+    def predict_batch(self, texts, max_length=768, threshold=0.5, batch_size=16):
+        start = time.perf_counter()
+        results = list(self.first_stage.predict_batch(texts, max_length=max_length,
+                                                      threshold=threshold, batch_size=batch_size))
+        t1 = time.perf_counter() - start
+        hard = [i for i, (p, _) in enumerate(results) if self._stats.uncertain(p)]
+        t2 = 0.0
+        if hard:
+            start = time.perf_counter()
+            escalated = self.second_stage.predict_batch([texts[i] for i in hard], max_length=max_length,
+                                                        threshold=threshold, batch_size=batch_size)
+            t2 = time.perf_counter() - start
+            for i, result in zip(hard, escalated):
+                results[i] = result
+        self._stats.record(len(texts), len(hard), t1, t2)
+        return results
+
+    def stats(self):
+        """Per-stage counters, including the escalation rate."""
+        return self._stats.snapshot()
+
+class AdaptiveLengthDetector:
+    """
+    Length escalation: short context first, full context only if uncertain.
+    
+    Every text is scored on its first `short_length` tokens. Texts whose
+    probability lands inside [low, high] *and* that were actually truncated
+    are re-scored at the caller's `max_length`; shorter texts already saw
+    all their tokens. `stats()` reports the escalation rate and the average
+    number of tokens processed per text.
+    """
+    def __init__(self, detector, short_length=256, low=0.2, high=0.8):
+        self.detector = detector
+        self.short_length = short_length
+        self._stats = EscalationStats(low, high)
+
+    @property
+    def model(self):
+        return self.detector.model
+
+    @property
+    def tokenizer(self):
+        return self.detector.tokenizer
+
+    @property
+    def model_name(self):
+        return self.detector.model_name
+
+    def predict(self, text, max_length=768, threshold=0.5):
+        return self.predict_batch([text], max_length=max_length, threshold=threshold)[0]
+
+    def predict_batch(self, texts, max_length=768, threshold=0.5, batch_size=16):
+        short_length = min(self.short_length, max_length)
+        start = time.perf_counter()
+        logits, lengths = self.detector.logits_and_lengths(texts, max_length=short_length,
+                                                           batch_size=batch_size)
+        probs = torch.sigmoid(torch.tensor(logits)).tolist()
+        t1 = time.perf_counter() - start
+        tokens = sum(lengths)
+
+        hard = [i for i, p in enumerate(probs)
+                if self._stats.uncertain(p) and lengths[i] >= short_length and max_length > short_length]
+        t2 = 0.0
+        if hard:
+            start = time.perf_counter()
+            long_logits, long_lengths = self.detector.logits_and_lengths(
+                [texts[i] for i in hard], max_length=max_length, batch_size=batch_size)
+            t2 = time.perf_counter() - start
+            tokens += sum(long_lengths)
+            for i, p in zip(hard, torch.sigmoid(torch.tensor(long_logits)).tolist()):
+                probs[i] = p
+        self._stats.record(len(texts), len(hard), t1, t2, tokens=tokens)
+        return [(p, 1 if p >= threshold else 0) for p in probs]
+
+    def stats(self):
+        """Escalation rate and average tokens processed per text."""
+        return self._stats.snapshot()
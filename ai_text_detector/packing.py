@@ -0,0 +1,100 @@
+"""
+Packed (unpadded) inference for short texts.
+
+Several tokenized texts are packed into one sequence. A block-diagonal
+attention mask keeps each text from attending to the others, position ids
+restart at 0 for every text, and the Desklib head mean-pools each segment
+separately, so every text gets the same logit as when it is scored alone
+(up to float rounding) while padding waste disappears.
+"""
+from typing import List
+import torch
+
+def pack_lengths(lengths: List[int], capacity: int) -> List[List[int]]:
+    """First-fit decreasing: group text indices so each pack's total length <= capacity."""
+    packs, room = [], []
+    for i in sorted(range(len(lengths)), key=lambda i: -lengths[i]):
+        for p, free in enumerate(room):
+            if lengths[i] <= free:
+                packs[p].append(i)
+                room[p] -= lengths[i]
+                break
+        else:
+            packs.append([i])
+            room.append(capacity - lengths[i])
+    return packs
+
+def build_packed_batch(token_ids: List[List[int]], packs: List[List[int]], pad_token_id: int):
+    """
+    Tensors for a batch of packs.
+
+    Returns input_ids (B, L), token_mask (B, L), block_mask (B, L, L),
+    position_ids (B, L) and segment ids (B, L) holding the original text
+    index of every token (-1 for padding).
+    """
+    L = max(sum(len(token_ids[i]) for i in pack) for pack in packs)
+    B = len(packs)
+    input_ids = torch.full((B, L), pad_token_id, dtype=torch.long)
+    position_ids = torch.zeros((B, L), dtype=torch.long)
+    segments = torch.full((B, L), -1, dtype=torch.long)
+    for b, pack in enumerate(packs):
+        pos = 0
+        for i in pack:
+            ids = token_ids[i]
+            input_ids[b, pos:pos + len(ids)] = torch.tensor(ids, dtype=torch.long)
+            position_ids[b, pos:pos + len(ids)] = torch.arange(len(ids))
+            segments[b, pos:pos + len(ids)] = i
+            pos += len(ids)
+    token_mask = (segments >= 0).long()
+    # Token i may attend to token j only inside the same text
+    block_mask = ((segments.unsqueeze(2) == segments.unsqueeze(1)) & (segments.unsqueeze(2) >= 0)).long()
+    return input_ids, token_mask, block_mask, position_ids, segments
+
+def _packed_forward(desklib_model, input_ids, token_mask, block_mask, position_ids, segments, n_texts):
+    backbone = desklib_model.model
+    # The top-level backbone forward can't take a 3D mask (it also multiplies the
+    # embeddings by the mask), so run embeddings and encoder separately
+    embeddings = backbone.embeddings(input_ids=input_ids, position_ids=position_ids, mask=token_mask)
+    encoded = backbone.encoder(embeddings, block_mask, output_hidden_states=False, return_dict=True)
+    hidden = encoded.last_hidden_state if hasattr(encoded, "last_hidden_state") else encoded[0]
+
+    # Per-segment mean pooling, same as DesklibAIDetectionModel.forward per text
+    flat = hidden.reshape(-1, hidden.size(-1))
+    seg = segments.reshape(-1)
+    valid = seg >= 0
+    sums = torch.zeros((n_texts, flat.size(-1)), dtype=flat.dtype, device=flat.device)
+    sums.index_add_(0, seg[valid], flat[valid])
+    counts = torch.bincount(seg[valid], minlength=n_texts).clamp(min=1).unsqueeze(-1).to(flat.dtype)
+    return desklib_model.classifier(sums / counts).view(-1)
+
+def packed_logits(detector, texts, max_length=768, pack_length=256, packs_per_batch=8):
+    """
+    AI logits for `texts` using packed sequences (Desklib head only).
+
+    Each text is truncated to `max_length` tokens; texts are packed into
+    sequences of up to `pack_length` tokens (a longer text gets a pack of its
+    own), and `packs_per_batch` packs go through the model at a time.
+    """
+    if not detector.use_desklib:
+        raise ValueError("Packed inference needs the Desklib mean-pooling head; use predict_batch instead.")
+    tokenizer = detector.tokenizer
+    token_ids = tokenizer(list(texts), truncation=True, max_length=max_length)["input_ids"]
+    lengths = [len(ids) for ids in token_ids]
+    packs = pack_lengths(lengths, max(pack_length, max(lengths, default=0)))
+
+    model = detector.model
+    model.eval()
+    device = next(model.parameters()).device
+    logits = torch.zeros(len(texts))
+    with torch.no_grad():
+        for start in range(0, len(packs), packs_per_batch):
+            batch = packs[start:start + packs_per_batch]
+            members = [i for pack in batch for i in pack]
+            # Re-index segments to 0..n-1 within this batch
+            local = {i: k for k, i in enumerate(members)}
+            local_ids = [token_ids[i] for i in members]
+            local_packs = [[local[i] for i in pack] for pack in batch]
+            tensors = build_packed_batch(local_ids, local_packs, tokenizer.pad_token_id)
+            out = _packed_forward(model, *(t.to(device) for t in tensors), n_texts=len(members))
+            logits[members] = out.cpu()
+    return logits.tolist()
@@ -0,0 +1,144 @@
+"""
+Pipelined bulk scoring: tokenize batch N+1 while the model runs batch N.
+
+Tokenizer threads encode batches and hand them to the model stage through a
+bounded queue; when the model falls behind, the queue fills and the
+tokenizers block (backpressure), so memory stays bounded. Fast tokenizers
+release the GIL while encoding, so the two stages genuinely overlap.
+"""
+import copy
+import time
+import queue
+import threading
+import torch
+
+_DONE = object()
+
+class PipelinedScorer:
+    """
+    `predict_batch`-compatible wrapper around a `DetectorModel` for bulk scoring.
+
+    Args:
+        detector: A `DetectorModel`.
+        batch_size: Texts per forward pass.
+        max_length: Token limit per text.
+        queue_size: Encoded batches allowed to wait for the model stage.
+        tokenizer_threads: Parallel tokenizer workers (each gets its own tokenizer copy).
+    """
+    def __init__(self, detector, batch_size=16, max_length=768, queue_size=4, tokenizer_threads=1):
+        self.detector = detector
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.queue_size = queue_size
+        self.tokenizer_threads = max(1, tokenizer_threads)
+        self.last_stats = None
+
+    @property
+    def model_name(self):
+        return self.detector.model_name
+
+    def _tokenize_stage(self, tokenizer, texts, batches, out, stats, lock, errors):
+        try:
+            while True:
+                with lock:
+                    if not batches:
+                        break
+                    start = batches.pop()
+                t0 = time.perf_counter()
+                enc = tokenizer(
+                    texts[start:start + self.batch_size],
+                    padding=True, truncation=True,
+                    max_length=self.max_length, return_tensors="pt"
+                )
+                t1 = time.perf_counter()
+                out.put((start, enc))
+                with lock:
+                    stats["tokenize_busy"] += t1 - t0
+                    stats["tokenize_blocked"] += time.perf_counter() - t1
+        except Exception as e:
+            errors.append(e)
+        finally:
+            out.put(_DONE)
+
+    def logits(self, texts, profiler=None):
+        """AI logits for `texts` in input order; stage timings go to `last_stats`."""
+        texts = list(texts)
+        logits = [None] * len(texts)
+        batches = list(range(0, len(texts), self.batch_size))[::-1]  # popped from the end
+        out = queue.Queue(maxsize=self.queue_size)
+        lock = threading.Lock()
+        errors = []
+        stats = {"tokenize_busy": 0.0, "tokenize_blocked": 0.0, "model_busy": 0.0, "model_waiting": 0.0}
+
+        base = self.detector.tokenizer
+        threads = [
+            threading.Thread(
+                target=self._tokenize_stage,
+                # HF tokenizers aren't safe to share across threads; give each its own
+                args=(base if i == 0 else copy.deepcopy(base), texts, batches, out, stats, lock, errors),
+                daemon=True,
+            )
+            for i in range(self.tokenizer_threads)
+        ]
+        wall_start = time.perf_counter()
+        for t in threads:
+            t.start()
+
+        model = self.detector.model
+        device = next(model.parameters()).device
+        model.eval()
+        finished = 0
+        while finished < len(threads):
+            t0 = time.perf_counter()
+            item = out.get()
+            t1 = time.perf_counter()
+            stats["model_waiting"] += t1 - t0
+            if item is _DONE:
+                finished += 1
+                continue
+            if errors:
+                continue  # drain so blocked tokenizer threads can exit
+            start, enc = item
+            try:
+                with torch.no_grad():
+                    batch_logits = self.detector._ai_logits(enc["input_ids"].to(device),
+                                                            enc["attention_mask"].to(device)).tolist()
+            except Exception as e:
+                errors.append(e)
+                with lock:
+                    batches.clear()
+                continue
+            logits[start:start + len(batch_logits)] = batch_logits
+            stats["model_busy"] += time.perf_counter() - t1
+            if profiler is not None:
+                profiler.step()
+        for t in threads:
+            t.join()
+        if errors:
+            raise errors[0]
+
+        wall = time.perf_counter() - wall_start
+        stats["wall"] = wall
+        # Tokenizer utilization is averaged over its threads
+        stats["tokenize_utilization"] = stats["tokenize_busy"] / (wall * len(threads)) if wall else 0.0
+        stats["model_utilization"] = stats["model_busy"] / wall if wall else 0.0
+        self.last_stats = stats
+        if self.detector.calibration is not None:
+            logits = self.detector._calibrated(torch.tensor(logits)).tolist()
+        return logits
+
+    def predict_batch(self, texts, max_length=None, threshold=0.5, batch_size=None, profiler=None):
+        # max_length/batch_size are fixed at construction; accepted for API parity
+        probs = torch.sigmoid(torch.tensor(self.logits(texts, profiler=profiler))).tolist()
+        return [(p, 1 if p >= threshold else 0) for p in probs]
+
+    def predict(self, text, max_length=None, threshold=0.5):
+        return self.predict_batch([text], threshold=threshold)[0]
+
+    def format_stats(self) -> str:
+        s = self.last_stats
+        if not s:
+            return "No pipelined run yet."
+        return (f"🔀 Pipeline: wall={s['wall']:.2f}s | "
+                f"tokenizer busy {s['tokenize_utilization']:.0%} (blocked {s['tokenize_blocked']:.2f}s) | "
+                f"model busy {s['model_utilization']:.0%} (waiting {s['model_waiting']:.2f}s)")
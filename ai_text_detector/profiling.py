@@ -0,0 +1,159 @@
+"""
+Bounded-window profiling for the CLI (`--profile`).
+
+Wraps a run in the torch profiler and writes, to an output directory:
+
+* ``trace.json``       - Chrome trace (open in chrome://tracing or Perfetto)
+* ``ops_by_cpu.txt``   - top operators by self CPU time
+* ``ops_by_memory.txt``- top operators by self CPU memory
+* ``rss_timeline.csv`` - process RSS sampled in the background
+"""
+import os
+import csv
+import time
+import threading
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process in bytes (0 if unavailable)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        import sys
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes on Linux
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    except Exception:
+        return 0
+
+class _RSSSampler(threading.Thread):
+    def __init__(self, interval: float = 0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        while not self._stop_event.is_set():
+            self.samples.append((time.perf_counter() - start, current_rss_bytes()))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+class NullProfiler:
+    """Drop-in for `StepProfiler` when `--profile` is off."""
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def step(self):
+        pass
+
+class StepProfiler:
+    """
+    Profile a bounded window of steps.
+
+    Call `step()` once per batch/training step. The profiler skips `wait`
+    steps, warms up for `warmup` steps and records `active` steps; anything
+    after that window runs unprofiled. The RSS timeline covers the whole run.
+
+    With `expected_steps` (when the caller knows how many batches it will
+    run), a run too short to reach the active window skips `wait` and shrinks
+    `warmup` so at least one step is recorded.
+    """
+    def __init__(self, output_dir: str, wait: int = 1, warmup: int = 1, active: int = 5,
+                 rss_interval: float = 0.1, row_limit: int = 25, expected_steps: int = None):
+        if expected_steps is not None and expected_steps <= wait + warmup:
+            wait, warmup = 0, min(warmup, max(expected_steps - 1, 0))
+            print(f"🔬 Only {expected_steps} step(s) to run: profiling with wait=0, warmup={warmup}")
+        self.output_dir = output_dir
+        self.wait = wait
+        self.warmup = warmup
+        self.active = active
+        self.row_limit = row_limit
+        self._sampler = _RSSSampler(rss_interval)
+        self._prof = None
+        self._steps = 0
+        self._traced = False
+
+    def __enter__(self):
+        from torch.profiler import profile, schedule, ProfilerActivity
+        os.makedirs(self.output_dir, exist_ok=True)
+        activities = [ProfilerActivity.CPU]
+        import torch
+        if torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+        self._prof = profile(
+            activities=activities,
+            schedule=schedule(wait=self.wait, warmup=self.warmup, active=self.active, repeat=1),
+            on_trace_ready=self._on_trace_ready,
+            record_shapes=True,
+            profile_memory=True,
+        )
+        self._sampler.start()
+        self._prof.__enter__()
+        return self
+
+    def step(self):
+        self._steps += 1
+        self._prof.step()
+
+    def _on_trace_ready(self, prof):
+        self._traced = True
+        prof.export_chrome_trace(os.path.join(self.output_dir, "trace.json"))
+        averages = prof.key_averages()
+        with open(os.path.join(self.output_dir, "ops_by_cpu.txt"), "w", encoding="utf-8") as f:
+            f.write(averages.table(sort_by="self_cpu_time_total", row_limit=self.row_limit))
+        with open(os.path.join(self.output_dir, "ops_by_memory.txt"), "w", encoding="utf-8") as f:
+            f.write(averages.table(sort_by="self_cpu_memory_usage", row_limit=self.row_limit))
+
+    def __exit__(self, *exc):
+        self._prof.__exit__(*exc)
+        samples = self._sampler.stop()
+        with open(os.path.join(self.output_dir, "rss_timeline.csv"), "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["seconds", "rss_mb"])
+            for t, rss in samples:
+                writer.writerow([f"{t:.3f}", f"{rss / 2**20:.1f}"])
+        if self._traced:
+            print(f"📈 Profile written to: {self.output_dir}")
+        else:
+            print(f"⚠️  No trace recorded: {self._steps} step(s) ran, the profiler skips the first "
+                  f"{self.wait + self.warmup} (lower --profile-wait/--profile-warmup). "
+                  f"Only {self.output_dir}/rss_timeline.csv was written.")
+        return False
+
+def build_profiler(args, expected_steps: int = None):
+    """Return a `StepProfiler` if `--profile` was passed, else a `NullProfiler`."""
+    if not getattr(args, "profile", False):
+        return NullProfiler()
+    return StepProfiler(
+        args.profile_dir,
+        wait=args.profile_wait,
+        warmup=args.profile_warmup,
+        active=args.profile_steps,
+        expected_steps=expected_steps,
+    )
+
+def add_profile_arguments(parser, default_dir: str):
+    """Attach the shared `--profile*` options to a subcommand parser."""
+    parser.add_argument("--profile", action="store_true",
+                        help="Run a bounded window of steps under the torch profiler.")
+    parser.add_argument("--profile-dir", default=default_dir,
+                        help=f"Where to write traces and tables (default: {default_dir}).")
+    parser.add_argument("--profile-wait", type=int, default=1, help="Steps to skip before profiling.")
+    parser.add_argument("--profile-warmup", type=int, default=1, help="Warm-up steps (not recorded).")
+    parser.add_argument("--profile-steps", type=int, default=5, help="Number of recorded steps.")
@@ -0,0 +1,220 @@
+"""
+Priority scheduler in front of a detector.
+
+One model thread serves several priority classes (by default ``interactive``
+and ``bulk``). Work is split into batches; after every batch the scheduler
+picks again, so a long bulk job is preempted at the next batch boundary as
+soon as interactive work arrives. Interactive requests that arrive together
+are micro-batched. A class whose head request has waited longer than its
+latency target since it was last served gets the next batch, so bulk work is
+never starved outright; the wait restarts after every batch, so a long bulk
+job gets one batch per target interval instead of taking over the model.
+"""
+import os
+import time
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import Future
+
+DEFAULT_CLASSES = OrderedDict([
+    ("interactive", 0.5),  # latency target in seconds
+    ("bulk", 60.0),
+])
+
+class _Job:
+    __slots__ = ("texts", "max_length", "threshold", "future", "results", "next", "enqueued", "started",
+                 "waiting_since")
+
+    def __init__(self, texts, max_length, threshold):
+        self.texts = texts
+        self.max_length = max_length
+        self.threshold = threshold
+        self.future = Future()
+        self.results = []
+        self.next = 0
+        self.enqueued = time.perf_counter()
+        self.waiting_since = self.enqueued  # reset whenever a batch of this job is scored
+        self.started = None
+
+class _ClassStats:
+    def __init__(self, target, window=1000):
+        self.target = target
+        self.submitted = 0
+        self.completed = 0
+        self.over_target = 0
+        self.waits = deque(maxlen=window)      # enqueue -> first batch starts
+        self.latencies = deque(maxlen=window)  # enqueue -> result ready
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class PriorityScheduler:
+    """
+    Args:
+        detector: Anything with `predict_batch(texts, max_length, threshold, batch_size)`.
+        classes: Ordered mapping of class name -> latency target (seconds),
+            highest priority first.
+        max_batch_size: Texts per model call.
+        max_length: Default token limit.
+    """
+    def __init__(self, detector, classes=None, max_batch_size=16, max_length=768):
+        self.detector = detector
+        self.classes = OrderedDict(classes or DEFAULT_CLASSES)
+        self.max_batch_size = max_batch_size
+        self.max_length = max_length
+        self._queues = {name: deque() for name in self.classes}
+        self._stats = {name: _ClassStats(target) for name, target in self.classes.items()}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._batch_seconds = 0.0  # EWMA of model time per batch
+
+    def _ensure_thread(self):
+        # Started lazily and per process, so a scheduler created before a
+        # gunicorn fork still gets a model thread in every worker
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+            self._thread.start()
+
+    def submit(self, texts, priority="interactive", max_length=None, threshold=0.5) -> Future:
+        """Queue `texts`; the returned future resolves to a list of (probability, label)."""
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority class {priority!r}; expected one of {list(self.classes)}")
+        job = _Job(list(texts), max_length or self.max_length, threshold)
+        if not job.texts:
+            job.future.set_result([])
+            return job.future
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler is closed")
+            self._ensure_thread()
+            self._queues[priority].append(job)
+            self._stats[priority].submitted += 1
+            self._cond.notify()
+        return job.future
+
+    def predict(self, text, max_length=None, threshold=0.5, priority="interactive"):
+        return self.submit([text], priority, max_length, threshold).result()[0]
+
+    def predict_batch(self, texts, max_length=None, threshold=0.5, batch_size=None, priority="bulk"):
+        return self.submit(texts, priority, max_length, threshold).result()
+
+    def _pick_class(self, now):
+        # Overdue classes first (in priority order), then plain priority order
+        for name, target in self.classes.items():
+            q = self._queues[name]
+            if q and now - q[0].waiting_since > target:
+                return name
+        for name in self.classes:
+            if self._queues[name]:
+                return name
+        return None
+
+    def _next_batch(self, name, now):
+        """Take up to max_batch_size texts from the head of class `name`'s queue."""
+        q = self._queues[name]
+        head = q[0]
+        batch = []  # (job, start, end)
+        room = self.max_batch_size
+        for job in q:
+            if room == 0 or job.max_length != head.max_length:
+                break
+            start = job.next
+            end = min(len(job.texts), start + room)
+            batch.append((job, start, end))
+            room -= end - start
+            if job.started is None:
+                job.started = now
+                self._stats[name].waits.append(now - job.enqueued)
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and not any(self._queues.values()):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                now = time.perf_counter()
+                name = self._pick_class(now)
+                batch = self._next_batch(name, now)
+                for job, _, end in batch:
+                    job.next = end
+
+            texts = [t for job, start, end in batch for t in job.texts[start:end]]
+            t0 = time.perf_counter()
+            try:
+                results = self.detector.predict_batch(texts, max_length=batch[0][0].max_length,
+                                                      batch_size=self.max_batch_size)
+                error = None
+            except Exception as e:
+                results, error = None, e
+            elapsed = time.perf_counter() - t0
+
+            with self._cond:
+                self._batch_seconds = elapsed if not self._batch_seconds else 0.8 * self._batch_seconds + 0.2 * elapsed
+                now = time.perf_counter()
+                offset = 0
+                done = []
+                for job, start, end in batch:
+                    job.waiting_since = now
+                    if error is None:
+                        job.results.extend((p, 1 if p >= job.threshold else 0)
+                                           for p, _ in results[offset:offset + end - start])
+                    offset += end - start
+                    if error is not None or job.next >= len(job.texts):
+                        done.append(job)
+                q = self._queues[name]
+                stats = self._stats[name]
+                for job in done:
+                    q.remove(job)
+                    latency = now - job.enqueued
+                    stats.completed += 1
+                    stats.latencies.append(latency)
+                    if latency > stats.target:
+                        stats.over_target += 1
+            for job in done:
+                if error is not None:
+                    job.future.set_exception(error)
+                else:
+                    job.future.set_result(job.results)
+
+    def queue_depth(self, name=None) -> int:
+        """Texts waiting (not yet scored) in one class, or in all classes."""
+        with self._cond:
+            names = [name] if name else list(self._queues)
+            return sum(len(j.texts) - j.next for n in names for j in self._queues[n])
+
+    def batch_seconds(self) -> float:
+        """Recent average model time per batch (0 until the first batch)."""
+        return self._batch_seconds
+
+    def stats(self):
+        """Per-class queue depth, wait-time and latency percentiles (ms) vs target."""
+        out = {}
+        with self._cond:
+            for name, s in self._stats.items():
+                q = self._queues[name]
+                out[name] = {
+                    "latency_target_ms": s.target * 1000,
+                    "queued_requests": len(q),
+                    "queued_texts": sum(len(j.texts) - j.next for j in q),
+                    "submitted": s.submitted,
+                    "completed": s.completed,
+                    "over_target": s.over_target,
+                    "wait_ms_p50": _percentile(s.waits, 0.5) * 1000,
+                    "wait_ms_p95": _percentile(s.waits, 0.95) * 1000,
+                    "latency_ms_p50": _percentile(s.latencies, 0.5) * 1000,
+                    "latency_ms_p95": _percentile(s.latencies, 0.95) * 1000,
+                }
+        return out
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -0,0 +1,387 @@
+"""
+Persistent per-row scores, threshold sweeps and probability calibration.
+
+`eval --scores` and `predict --scores` write one Parquet row per scored text::
+
+    row            int64    position in the scored input
+    content_hash   string   `hashing.content_hash` of the text (a stable id)
+    probability    float64  AI probability as served (after any calibration)
+    label          int8     true label, or -1 when unknown (bulk predict)
+
+The file's schema metadata records the model, its fingerprint, max_length,
+data path and the calibration that was applied while scoring. Rerunning
+`eval` with the same file reuses every row whose content hash is already in
+it, as long as the fingerprint still matches. So only new or changed texts
+are scored again. `report` then recomputes
+everything from this file in NumPy without touching the model: metrics at a
+threshold, ROC/PR curves and AUCs, the best threshold and calibration bins.
+One sort of the probabilities serves every threshold at once.
+
+Calibration is Platt scaling on the logit: ``p' = sigmoid(a * logit(p) + b)``.
+Because that is affine in logit space, a detector applies it as
+``a * logit + b`` before the sigmoid. It is saved as ``calibration.json`` in
+the model directory, and `DetectorModel.load` picks it up.
+"""
+import os
+import json
+import time
+import hashlib
+import numpy as np
+
+CALIBRATION_NAME = "calibration.json"
+SCORES_META_KEY = b"ai_detector"
+UNKNOWN_LABEL = -1
+_EPS = 1e-12
+
+# --- Score files ---
+
+def write_scores(path: str, probabilities, labels=None, content_hashes=None, texts=None, meta=None) -> str:
+    """Write a score file; pass `content_hashes` or `texts` to hash."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    if content_hashes is None:
+        from .hashing import content_hashes as hash_texts
+        content_hashes = hash_texts(texts)
+    labels = np.full(len(probabilities), UNKNOWN_LABEL, dtype=np.int8) if labels is None \
+        else np.asarray(labels, dtype=np.int8)
+    table = pa.table({
+        "row": np.arange(len(probabilities), dtype=np.int64),
+        "content_hash": pa.array(list(content_hashes), type=pa.string()),
+        "probability": probabilities,
+        "label": labels,
+    })
+    meta = dict(meta or {}, created=time.strftime("%Y-%m-%dT%H:%M:%S"), rows=len(probabilities))
+    table = table.replace_schema_metadata({SCORES_META_KEY: json.dumps(meta)})
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+    print(f"💾 Wrote {len(probabilities):,} scores to: {path}")
+    return path
+
+def read_scores(path: str, columns=None):
+    """(columns dict of NumPy arrays, metadata dict) of a score file."""
+    import pyarrow.parquet as pq
+    table = pq.read_table(path, columns=columns)
+    meta = json.loads((table.schema.metadata or {}).get(SCORES_META_KEY, b"{}"))
+    return {name: table.column(name).to_numpy() for name in table.column_names}, meta
+
+def model_fingerprint(model_path: str, max_length=None) -> str:
+    """
+    Digest of everything that decides a model's scores: the contents of every
+    file in its directory (weights, config, tokenizer, calibration.json), or
+    the name of a Hub model, plus `max_length`.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if os.path.isdir(model_path):
+        for root, dirs, files in os.walk(model_path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith((".parquet", ".tmp")):
+                    continue  # score files kept next to the model aren't part of it
+                path = os.path.join(root, name)
+                h.update(os.path.relpath(path, model_path).encode("utf-8") + b"\0")
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        h.update(block)
+    else:
+        h.update(f"hub:{model_path}".encode("utf-8"))
+    h.update(f"\0max_length={max_length}".encode("utf-8"))
+    return h.hexdigest()
+
+def lookup_scores(path: str, content_hashes, fingerprint):
+    """
+    (probabilities, found) for `content_hashes` from an existing score file.
+    Nothing is found if the file is missing or was written under another
+    fingerprint. Probabilities are NaN where not found.
+    """
+    content_hashes = np.asarray(content_hashes, dtype=str)
+    probs = np.full(len(content_hashes), np.nan)
+    found = np.zeros(len(content_hashes), dtype=bool)
+    if not fingerprint or not os.path.isfile(path):
+        return probs, found
+    cols, meta = read_scores(path, columns=["content_hash", "probability"])
+    if meta.get("fingerprint") != fingerprint:
+        print(f"🔁 {path} was scored by a different model or max_length; rescoring everything")
+        return probs, found
+    stored = cols["content_hash"].astype(str)
+    if not len(stored):
+        return probs, found
+    order = np.argsort(stored, kind="stable")
+    stored, stored_probs = stored[order], cols["probability"][order]
+    pos = np.minimum(np.searchsorted(stored, content_hashes), len(stored) - 1)
+    found = stored[pos] == content_hashes
+    probs[found] = stored_probs[pos[found]]
+    return probs, found
+
+def score_meta(detector, max_length=None, data_path=None, split=None, fingerprint=None) -> dict:
+    """Metadata describing how a score file was produced."""
+    calibration = getattr(detector, "calibration", None)
+    return {
+        "model": getattr(detector, "model_name", None),
+        "fingerprint": fingerprint,
+        "max_length": max_length,
+        "data": data_path,
+        "split": split,
+        "calibration": calibration.to_dict() if calibration is not None else None,
+    }
+
+# --- Metrics ---
+
+def metrics_at(y, p, threshold: float = 0.5) -> dict:
+    """Accuracy, per-class/macro F1 and the confusion matrix at one threshold."""
+    y = np.asarray(y, dtype=bool)
+    pred = np.asarray(p) >= threshold
+    tp = int(np.count_nonzero(pred & y))
+    fp = int(np.count_nonzero(pred & ~y))
+    fn = int(np.count_nonzero(~pred & y))
+    tn = len(y) - tp - fp - fn
+    f1_ai = 2 * tp / max(2 * tp + fp + fn, 1)
+    f1_human = 2 * tn / max(2 * tn + fn + fp, 1)
+    return {
+        "threshold": float(threshold),
+        "accuracy": (tp + tn) / max(len(y), 1),
+        "f1_ai": f1_ai,
+        "f1_human": f1_human,
+        "f1_macro": (f1_ai + f1_human) / 2,
+        "precision_ai": tp / max(tp + fp, 1),
+        "recall_ai": tp / max(tp + fn, 1),
+        "confusion": [[tn, fp], [fn, tp]],
+    }
+
+def threshold_sweep(y, p) -> dict:
+    """
+    Counts and metrics at every distinct threshold, from one descending sort.
+
+    Entry i predicts AI for ``p >= thresholds[i]``; thresholds are descending.
+    """
+    y = np.asarray(y, dtype=bool)
+    p = np.asarray(p, dtype=np.float64)
+    order = np.argsort(-p, kind="mergesort")
+    p_sorted, y_sorted = p[order], y[order]
+    last = np.r_[np.flatnonzero(np.diff(p_sorted)), len(p_sorted) - 1]
+    tp = np.cumsum(y_sorted)[last].astype(np.float64)
+    fp = (last + 1) - tp
+    pos, neg = float(y.sum()), float(len(y) - y.sum())
+    fn, tn = pos - tp, neg - fp
+    f1_ai = 2 * tp / np.maximum(2 * tp + fp + fn, 1)
+    f1_human = 2 * tn / np.maximum(2 * tn + fn + fp, 1)
+    return {
+        "thresholds": p_sorted[last],
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "accuracy": (tp + tn) / max(len(y), 1),
+        "f1_ai": f1_ai,
+        "f1_macro": (f1_ai + f1_human) / 2,
+        "tpr": tp / max(pos, 1),
+        "fpr": fp / max(neg, 1),
+        "precision": tp / np.maximum(tp + fp, 1),
+    }
+
+def roc_pr(sweep: dict) -> dict:
+    """ROC and precision/recall curves plus ROC AUC and average precision."""
+    fpr = np.r_[0.0, sweep["fpr"]]
+    tpr = np.r_[0.0, sweep["tpr"]]
+    recall = sweep["tpr"]
+    precision = sweep["precision"]
+    # Average precision as in scikit-learn: sum of precision weighted by recall steps
+    ap = float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+    return {
+        "fpr": fpr, "tpr": tpr, "recall": recall, "precision": precision,
+        "roc_auc": float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)),
+        "average_precision": ap,
+    }
+
+OPTIMIZE = ("f1_macro", "f1_ai", "accuracy")
+
+def best_threshold(sweep: dict, optimize: str = "f1_macro") -> dict:
+    i = int(np.argmax(sweep[optimize]))
+    return {"threshold": float(sweep["thresholds"][i]), optimize: float(sweep[optimize][i])}
+
+def calibration_bins(y, p, n_bins: int = 10) -> dict:
+    """Equal-width probability bins: count, mean probability, observed AI rate; plus ECE and Brier."""
+    p = np.asarray(p, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    idx = np.minimum((p * n_bins).astype(np.int64), n_bins - 1)
+    counts = np.bincount(idx, minlength=n_bins)
+    nonzero = np.maximum(counts, 1)
+    mean_p = np.bincount(idx, weights=p, minlength=n_bins) / nonzero
+    observed = np.bincount(idx, weights=y, minlength=n_bins) / nonzero
+    return {
+        "edges": np.linspace(0.0, 1.0, n_bins + 1),
+        "count": counts,
+        "mean_probability": mean_p,
+        "observed_rate": observed,
+        "ece": float(np.sum(counts * np.abs(mean_p - observed)) / max(len(p), 1)),
+        "brier": float(np.mean((p - y) ** 2)) if len(p) else 0.0,
+    }
+
+# --- Calibration ---
+
+def _logit(p):
+    p = np.clip(np.asarray(p, dtype=np.float64), _EPS, 1 - _EPS)
+    return np.log(p) - np.log1p(-p)
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+class PlattCalibrator:
+    """``calibrated_logit = a * logit + b``."""
+    def __init__(self, a: float = 1.0, b: float = 0.0, meta=None):
+        self.a = float(a)
+        self.b = float(b)
+        self.meta = meta or {}
+
+    def apply_logits(self, logits):
+        # Works on NumPy arrays and torch tensors alike
+        return logits * self.a + self.b
+
+    def apply(self, probabilities):
+        return _sigmoid(self.apply_logits(_logit(probabilities)))
+
+    def then(self, other: "PlattCalibrator") -> "PlattCalibrator":
+        """This calibration followed by `other`, as one affine map."""
+        return PlattCalibrator(other.a * self.a, other.a * self.b + other.b, meta=other.meta)
+
+    def to_dict(self) -> dict:
+        return {"method": "platt", "a": self.a, "b": self.b, **self.meta}
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        if d.get("method") != "platt":
+            raise ValueError(f"Unsupported calibration method: {d.get('method')}")
+        meta = {k: v for k, v in d.items() if k not in ("method", "a", "b")}
+        return cls(d["a"], d["b"], meta)
+
+    def save(self, model_dir: str) -> str:
+        path = os.path.join(model_dir, CALIBRATION_NAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    @classmethod
+    def fit(cls, y, p, iterations: int = 50):
+        """
+        Platt scaling by Newton's method on the log loss, with Platt's smoothed
+        targets so that perfectly separated data doesn't push `a` to infinity.
+        """
+        y = np.asarray(y, dtype=np.float64)
+        x = _logit(p)
+        pos = y.sum()
+        neg = len(y) - pos
+        t = np.where(y > 0, (pos + 1) / (pos + 2), 1 / (neg + 2))
+        X = np.column_stack([x, np.ones_like(x)])
+        w = np.array([1.0, 0.0])
+
+        def loss(w):
+            z = X @ w
+            return float(np.sum(np.logaddexp(0, z) - t * z))
+
+        current = loss(w)
+        for _ in range(iterations):
+            q = _sigmoid(X @ w)
+            grad = X.T @ (q - t)
+            hess = (X * (q * (1 - q))[:, None]).T @ X + 1e-9 * np.eye(2)
+            step = np.linalg.solve(hess, grad)
+            scale = 1.0
+            while scale > 1e-6 and loss(w - scale * step) > current:
+                scale /= 2  # backtracking keeps every step a descent step
+            w = w - scale * step
+            new = loss(w)
+            if current - new < 1e-10 * max(abs(current), 1.0):
+                current = new
+                break
+            current = new
+        return cls(w[0], w[1], meta={"fitted_on_rows": int(len(y)), "created": time.strftime("%Y-%m-%dT%H:%M:%S")})
+
+def save_calibration(calibration, model_dir: str):
+    """
+    Write `calibration` into a model directory. With None, remove any existing
+    calibration.json, so that an old fit is never applied to new weights.
+    """
+    path = os.path.join(model_dir, CALIBRATION_NAME)
+    if calibration is not None:
+        return calibration.save(model_dir)
+    if os.path.isfile(path):
+        os.remove(path)
+        print(f"🗑️  Removed stale {path}")
+    return None
+
+def load_calibration(model_dir: str):
+    """The model directory's `PlattCalibrator`, or None."""
+    path = os.path.join(model_dir, CALIBRATION_NAME)
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return PlattCalibrator.from_dict(json.load(f))
+
+def attach_calibration(detector, model_dir: str):
+    """Set `detector.calibration` from the model directory (None if it has none) and return it."""
+    detector.calibration = load_calibration(model_dir)
+    if detector.calibration is not None:
+        print(f"🌡️  Applying calibration from {model_dir} (a={detector.calibration.a:.3f}, "
+              f"b={detector.calibration.b:.3f})")
+    return detector
+
+# --- Report ---
+
+def summarize(path: str, threshold: float = 0.5, n_bins: int = 10, optimize: str = "f1_macro") -> dict:
+    """Everything `report` prints, computed from a score file."""
+    start = time.perf_counter()
+    cols, meta = read_scores(path, columns=["probability", "label"])
+    p, labels = cols["probability"], cols["label"]
+    labeled = labels != UNKNOWN_LABEL
+    summary = {"path": path, "meta": meta, "rows": len(p), "labeled": int(labeled.sum()),
+               "mean_probability": float(p.mean()) if len(p) else 0.0,
+               "ai_rate": float(np.mean(p >= threshold)) if len(p) else 0.0}
+    if labeled.any():
+        y, p = labels[labeled].astype(bool), p[labeled]
+        sweep = threshold_sweep(y, p)
+        summary.update(
+            at_threshold=metrics_at(y, p, threshold),
+            curves=roc_pr(sweep),
+            best=best_threshold(sweep, optimize),
+            calibration=calibration_bins(y, p, n_bins),
+            sweep=sweep,
+        )
+    else:
+        summary["histogram"] = np.bincount(np.minimum((p * n_bins).astype(np.int64), n_bins - 1),
+                                           minlength=n_bins)
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+def print_report(s: dict):
+    meta = s["meta"]
+    print(f"📄 {s['path']}: {s['rows']:,} rows ({s['labeled']:,} labeled), model={meta.get('model')}, "
+          f"max_length={meta.get('max_length')}, calibrated={meta.get('calibration') is not None}")
+    if "reused" in meta:
+        print(f"   ♻️  {meta['reused']:,} rows reused from the previous run, {meta['scored']:,} scored")
+    if "at_threshold" not in s:
+        print(f"   Mean AI probability {s['mean_probability']:.4f}; {s['ai_rate']:.1%} above the threshold")
+        print("   Probability histogram:", " ".join(str(int(c)) for c in s["histogram"]))
+        print(f"⏱️  {s['seconds'] * 1000:.1f}ms")
+        return
+    m, c, b = s["at_threshold"], s["curves"], s["best"]
+    print(f"🎯 At threshold {m['threshold']:.2f}: accuracy={m['accuracy']:.4f} F1 (macro)={m['f1_macro']:.4f} "
+          f"F1 (AI)={m['f1_ai']:.4f} precision={m['precision_ai']:.4f} recall={m['recall_ai']:.4f}")
+    print(f"   Confusion matrix [[TN, FP], [FN, TP]]: {m['confusion']}")
+    print(f"📈 ROC AUC={c['roc_auc']:.4f}  average precision={c['average_precision']:.4f}")
+    metric = next(k for k in b if k != "threshold")
+    print(f"🔧 Best threshold by {metric}: {b['threshold']:.4f} ({metric}={b[metric]:.4f})")
+    cal = s["calibration"]
+    print(f"🌡️  Calibration: ECE={cal['ece']:.4f} Brier={cal['brier']:.4f}")
+    print("   bin            count   mean p   observed")
+    for lo, hi, n, mp, obs in zip(cal["edges"][:-1], cal["edges"][1:], cal["count"],
+                                  cal["mean_probability"], cal["observed_rate"]):
+        if n:
+            print(f"   [{lo:.1f}, {hi:.1f})  {int(n):>9,}   {mp:.4f}   {obs:.4f}")
+    print(f"⏱️  {s['seconds'] * 1000:.1f}ms")
+
+def write_curves(s: dict, path: str):
+    """Per-threshold sweep (counts, accuracy, F1, TPR/FPR, precision) as CSV."""
+    sweep = s["sweep"]
+    names = ["thresholds", "tp", "fp", "fn", "tn", "accuracy", "f1_ai", "f1_macro", "tpr", "fpr", "precision"]
+    np.savetxt(path, np.column_stack([sweep[n] for n in names]), delimiter=",",
+               header=",".join(n.rstrip("s") if n == "thresholds" else n for n in names), comments="", fmt="%.6g")
+    print(f"💾 Threshold sweep written to: {path}")
@@ -0,0 +1,101 @@
+"""
+Helpers for multi-worker serving (gunicorn with a preloaded app).
+
+The model is loaded once in the master before it forks, so workers share the
+weight pages copy-on-write (or via the page cache for mmap'd bundles), and
+each worker gets an equal slice of the CPU for torch's thread pool.
+"""
+import os
+import gc
+import time
+import threading
+
+def available_cores() -> int:
+    """CPUs this process may run on (respects taskset/cpuset limits)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS/Windows
+        return os.cpu_count() or 1
+
+def thread_budget(workers: int, cores: int = None) -> int:
+    """Torch threads per worker so that `workers` processes don't oversubscribe the CPU."""
+    override = os.environ.get("AI_DETECTOR_THREADS_PER_WORKER")
+    if override:
+        return max(1, int(override))
+    cores = cores or available_cores()
+    return max(1, cores // max(1, workers))
+
+def configure_worker_threads(workers: int) -> int:
+    """Apply the per-worker thread budget in a freshly forked worker; returns it."""
+    import torch
+    n = thread_budget(workers)
+    torch.set_num_threads(n)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # can only be set before the inter-op pool starts
+    return n
+
+def prepare_for_fork():
+    """
+    Call in the master after loading the model and before forking.
+
+    Moves every live object into the GC's permanent generation, so collections
+    in the workers don't write to (and thereby un-share) the master's pages.
+    """
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+
+WARMUP_SENTENCE = ("The quick brown fox jumps over the lazy dog while the committee "
+                   "reviews the quarterly report on renewable energy adoption. ")
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+def warm_up(detector, lengths=None, batch_sizes=None):
+    """
+    Run representative batches so lazy allocations and kernel selection happen
+    before the first real request. Lengths/batch sizes default to the
+    AI_DETECTOR_WARMUP_LENGTHS / AI_DETECTOR_WARMUP_BATCH_SIZES env vars.
+    Returns the seconds spent.
+    """
+    lengths = lengths or _int_list(os.environ.get("AI_DETECTOR_WARMUP_LENGTHS", "64,256,768"))
+    batch_sizes = batch_sizes or _int_list(os.environ.get("AI_DETECTOR_WARMUP_BATCH_SIZES", "1,8"))
+    start = time.perf_counter()
+    for length in lengths:
+        # Longer than `length` tokens; truncation trims it to exactly `length`
+        text = WARMUP_SENTENCE * (length // 15 + 1)
+        for batch_size in batch_sizes:
+            detector.predict_batch([text] * batch_size, max_length=length, batch_size=batch_size)
+    return time.perf_counter() - start
+
+class Readiness:
+    """
+    Startup state for readiness probes, separate from liveness.
+
+    States: starting -> loading -> warming_up -> ready (or failed).
+    """
+    def __init__(self):
+        self._ready = threading.Event()
+        self.state = "starting"
+        self.error = None
+
+    def set(self, state: str):
+        self.state = state
+        if state == "ready":
+            self._ready.set()
+
+    def fail(self, error):
+        self.state = "failed"
+        self.error = str(error)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait(self, timeout=None) -> bool:
+        return self._ready.wait(timeout)
+
+    def as_dict(self):
+        return {"ready": self.ready, "state": self.state, "error": self.error}
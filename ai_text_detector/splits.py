@@ -0,0 +1,112 @@
+"""
+Persisted, content-addressed train/validation splits.
+
+A row's split is decided by the content hash of its text (`hashing.content_hash`),
+not by its position. The same text always lands in the same split, so exact
+duplicates can't leak across it. Assignments are stored in a compact index next
+to the dataset (``<file>.splits.npz``, or ``splits.npz`` inside a corpus
+directory) holding one uint64 key and one int8 split per text. Later runs
+look rows up in that index, and only texts missing from it get new
+assignments, so appending rows never moves existing ones.
+
+The split is not stratified by label. Each text independently lands in
+validation with probability `val_fraction`, so class ratios match only in
+expectation.
+"""
+import os
+import numpy as np
+from .hashing import content_hashes
+
+TRAIN, VAL = 0, 1
+SPLIT_NAMES = {"train": TRAIN, "val": VAL}
+_SEED_MIX = 0x9E3779B97F4A7C15
+
+def split_index_path(data_path: str) -> str:
+    if os.path.isdir(data_path):
+        return os.path.join(data_path, "splits.npz")
+    return f"{data_path}.splits.npz"
+
+def text_keys(texts) -> np.ndarray:
+    """uint64 key per text: the first 8 bytes of its content hash."""
+    return np.array([int(h[:16], 16) for h in content_hashes(texts)], dtype=np.uint64)
+
+def _fresh_assignments(keys: np.ndarray, val_fraction: float, seed: int) -> np.ndarray:
+    # Scramble with the seed, then treat the key as a uniform number in [0, 1)
+    with np.errstate(over="ignore"):
+        mixed = keys * np.uint64(_SEED_MIX | 1) + np.uint64((seed * _SEED_MIX) % 2**64)
+    return ((mixed >> np.uint64(11)) / float(2**53) < val_fraction).astype(np.int8)
+
+class SplitIndex:
+    """Sorted key -> split table, stored as .npz."""
+    def __init__(self, keys=None, splits=None, val_fraction: float = 0.2, seed: int = 42):
+        keys = np.asarray(keys if keys is not None else [], dtype=np.uint64)
+        splits = np.asarray(splits if splits is not None else [], dtype=np.int8)
+        order = np.argsort(keys, kind="stable")
+        self.keys, self.splits = keys[order], splits[order]
+        self.val_fraction = val_fraction
+        self.seed = seed
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            return cls(data["keys"], data["splits"], float(data["val_fraction"]), int(data["seed"]))
+
+    def save(self, path: str):
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, keys=self.keys, splits=self.splits,
+                 val_fraction=self.val_fraction, seed=self.seed)
+        os.replace(tmp, path)
+
+    def lookup(self, keys: np.ndarray):
+        """(splits, found) for `keys`; splits is -1 where not found."""
+        splits = np.full(len(keys), -1, dtype=np.int8)
+        if not len(self.keys):
+            return splits, np.zeros(len(keys), dtype=bool)
+        pos = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = self.keys[pos] == keys
+        splits[found] = self.splits[pos[found]]
+        return splits, found
+
+    def assign(self, keys: np.ndarray) -> np.ndarray:
+        """Splits for `keys`; unseen keys are assigned and added to the index."""
+        splits, found = self.lookup(keys)
+        if not found.all():
+            new_keys = np.unique(keys[~found])
+            new_splits = _fresh_assignments(new_keys, self.val_fraction, self.seed)
+            merged = SplitIndex(np.concatenate([self.keys, new_keys]), np.concatenate([self.splits, new_splits]))
+            self.keys, self.splits = merged.keys, merged.splits
+            splits, _ = self.lookup(keys)
+        return splits
+
+def dataset_splits(df, data_path: str, val_fraction: float = 0.2, seed: int = 42, save: bool = True):
+    """
+    int8 split per row of `df` (TRAIN/VAL), using and extending the index next
+    to `data_path`. An existing index keeps its own val_fraction/seed, so
+    assignments never change under a different config.
+    """
+    path = split_index_path(data_path)
+    if os.path.exists(path):
+        index = SplitIndex.load(path)
+    else:
+        index = SplitIndex(val_fraction=val_fraction, seed=seed)
+    before = len(index)
+    splits = index.assign(text_keys(df["text"]))
+    if save and len(index) != before:
+        index.save(path)
+        print(f"🗂️  Split index {path}: {len(index) - before:,} new texts assigned, {len(index):,} total")
+    return splits
+
+def train_val_split(df, data_path: str, val_fraction: float = 0.2, seed: int = 42):
+    """(train_df, val_df) using the persisted index for `data_path`."""
+    splits = dataset_splits(df, data_path, val_fraction, seed)
+    return df[splits == TRAIN], df[splits == VAL]
+
+def select_split(df, data_path: str, split: str, val_fraction: float = 0.2, seed: int = 42):
+    """Rows of `df` in `split` ("train", "val" or "all")."""
+    if split == "all":
+        return df
+    splits = dataset_splits(df, data_path, val_fraction, seed)
+    return df[splits == SPLIT_NAMES[split]]
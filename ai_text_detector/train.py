@@ -1,6 +1,6 @@
 import torch
 from torch.utils.data import Dataset
-from transformers import Trainer, TrainingArguments
+from transformers import Trainer, TrainingArguments, TrainerCallback
 from typing import List
 from .utils import set_seed, device_info, auto_fp16
 
@@ -15,7 +15,14 @@ class TextDataset(Dataset):
         item["labels"] = torch.tensor(self.labels[idx], dtype=torch.long)
         return item
 
-def build_trainer(model, tokenizer, train_df, val_df, cfg):
+class ProfilerCallback(TrainerCallback):
+    """Advance a `StepProfiler` once per optimizer step."""
+    def __init__(self, profiler):
+        self.profiler = profiler
+    def on_step_end(self, args, state, control, **kwargs):
+        self.profiler.step()
+
+def build_trainer(model, tokenizer, train_df, val_df, cfg, profiler=None):
     set_seed(cfg.seed)
     print("💻 Device:", device_info())
 
@@ -59,5 +66,6 @@ def build_trainer(model, tokenizer, train_df, val_df, cfg):
         train_dataset=train_ds,
         eval_dataset=val_ds,
         tokenizer=tokenizer,
+        callbacks=[ProfilerCallback(profiler)] if profiler is not None else None,
     )
     return trainer
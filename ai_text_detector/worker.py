@@ -0,0 +1,205 @@
+"""
+Persistent, isolated inference worker.
+
+The model is loaded once in a long-lived child interpreter (started with
+``spawn``, so it never inherits the parent's torch/MPS state). Batches of
+texts go in and probabilities come out through two shared-memory buffers;
+the pipe only carries small control messages. If the child dies, the next
+call restarts it and retries once.
+
+The child, pipe and buffers belong to the process that started them. A
+forked copy of an `InferenceWorker` (e.g. a gunicorn worker forked from a
+preloading master) drops what it inherited and starts its own child on first
+use. Two processes never share one child.
+"""
+import os
+import sys
+import atexit
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+_FLOAT_SIZE = 8  # probabilities are returned as float64
+
+def _serve(conn, model_path, in_name, out_name):
+    # Same isolation settings the old pickling loader used
+    os.environ["PYTORCH_ENABLE_MPS"] = "0"
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    if sys.platform == "darwin":
+        os.environ["OMP_NUM_THREADS"] = "1"
+    import torch
+    if hasattr(torch.backends, "mps"):
+        try:
+            torch.backends.mps.enabled = False
+        except Exception:
+            pass
+    from .models import DetectorModel
+
+    try:
+        model = DetectorModel.load(model_path) if os.path.isdir(model_path) else DetectorModel(model_path)
+    except Exception as e:
+        conn.send(("error", f"Failed to load model: {e}"))
+        return
+    in_shm = shared_memory.SharedMemory(name=in_name)
+    out_shm = shared_memory.SharedMemory(name=out_name)
+    out = out_shm.buf.cast("d")
+    conn.send(("ready", None))
+
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except EOFError:
+                break
+            if msg[0] == "stop":
+                break
+            _, lengths, max_length, batch_size = msg
+            try:
+                texts, pos = [], 0
+                for n in lengths:
+                    texts.append(bytes(in_shm.buf[pos:pos + n]).decode("utf-8", errors="ignore"))
+                    pos += n
+                results = model.predict_batch(texts, max_length=max_length, batch_size=batch_size)
+                for i, (p, _) in enumerate(results):
+                    out[i] = p
+                conn.send(("ok", len(results)))
+            except Exception as e:
+                conn.send(("error", repr(e)))
+    finally:
+        out.release()
+        in_shm.close()
+        out_shm.close()
+
+class InferenceWorker:
+    """
+    `DetectorModel`-compatible `predict`/`predict_batch` served by a
+    persistent child process.
+
+    Args:
+        model_path: Saved model dir, bundle or Hub model name.
+        buffer_bytes: Size of the shared input buffer (UTF-8 text per call).
+        max_batch: Most texts sent to the child per round trip.
+        start_timeout: Seconds to wait for the child to load the model.
+        lazy: Start the child on the first call instead of now (use this in a
+            process that will fork, so the parent never starts one).
+    """
+    def __init__(self, model_path="desklib/ai-text-detector-v1.01", buffer_bytes=8 * 2**20,
+                 max_batch=256, start_timeout=600, lazy=False):
+        self.model_name = model_path
+        self.buffer_bytes = buffer_bytes
+        self.max_batch = max_batch
+        self.start_timeout = start_timeout
+        self.restarts = 0
+        self._ctx = mp.get_context("spawn")
+        self._forget_inherited()
+        os.register_at_fork(after_in_child=self._forget_inherited)
+        atexit.register(self.close)
+        if not lazy:
+            with self._lock:
+                self._ensure_started()
+
+    def _forget_inherited(self):
+        # After fork the child process, pipe and shared buffers are the parent's:
+        # never use or close them here, start fresh ones on first use instead
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._in = self._out = None
+        self._proc = None
+        self._conn = None
+
+    def _ensure_started(self):
+        """Start this process's buffers and child if it has none yet (call with the lock held)."""
+        if self._proc is not None:
+            return
+        if self._in is None:
+            self._in = shared_memory.SharedMemory(create=True, size=self.buffer_bytes)
+            self._out = shared_memory.SharedMemory(create=True, size=self.max_batch * _FLOAT_SIZE)
+        self._start()
+
+    def _start(self):
+        parent, child = self._ctx.Pipe()
+        self._proc = self._ctx.Process(
+            target=_serve, args=(child, self.model_name, self._in.name, self._out.name), daemon=True
+        )
+        self._proc.start()
+        child.close()
+        self._conn = parent
+        if not parent.poll(self.start_timeout):
+            self._proc.kill()
+            self._proc = None
+            raise RuntimeError(f"Inference worker did not become ready within {self.start_timeout}s")
+        status, detail = parent.recv()
+        if status != "ready":
+            self._proc.join()
+            self._proc = None
+            raise RuntimeError(detail)
+
+    def _restart(self):
+        self.restarts += 1
+        if self._proc is not None and self._proc.is_alive():
+            self._proc.kill()
+            self._proc.join()
+        self._start()
+
+    def _chunks(self, encoded):
+        start, size = 0, 0
+        for i, data in enumerate(encoded):
+            if i > start and (size + len(data) > self.buffer_bytes or i - start >= self.max_batch):
+                yield start, i
+                start, size = i, 0
+            size += len(data)
+        if start < len(encoded):
+            yield start, len(encoded)
+
+    def _round_trip(self, chunk, max_length, batch_size):
+        pos = 0
+        for data in chunk:
+            self._in.buf[pos:pos + len(data)] = data
+            pos += len(data)
+        self._conn.send(("predict", [len(d) for d in chunk], max_length, batch_size))
+        status, detail = self._conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"Inference worker error: {detail}")
+        out = self._out.buf.cast("d")
+        try:
+            return list(out[:detail])
+        finally:
+            out.release()
+
+    def predict_batch(self, texts, max_length=768, threshold=0.5, batch_size=16):
+        # Texts longer than the buffer are clipped; the model truncates far earlier anyway
+        encoded = [t.encode("utf-8")[:self.buffer_bytes] for t in texts]
+        probs = []
+        with self._lock:
+            self._ensure_started()
+            for start, end in self._chunks(encoded):
+                chunk = encoded[start:end]
+                try:
+                    probs.extend(self._round_trip(chunk, max_length, batch_size))
+                except (EOFError, BrokenPipeError, ConnectionResetError, OSError):
+                    # Child crashed: bring up a fresh one and retry this chunk once
+                    self._restart()
+                    probs.extend(self._round_trip(chunk, max_length, batch_size))
+        return [(p, 1 if p >= threshold else 0) for p in probs]
+
+    def predict(self, text, max_length=768, threshold=0.5):
+        return self.predict_batch([text], max_length=max_length, threshold=threshold)[0]
+
+    def close(self):
+        """Stop this process's child and free its shared buffers."""
+        if self._pid != os.getpid():
+            return  # inherited through fork; the owner cleans up
+        if self._proc is not None:
+            try:
+                self._conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            self._proc.join(timeout=5)
+            if self._proc.is_alive():
+                self._proc.kill()
+            self._proc = None
+        if self._in is not None:
+            for shm in (self._in, self._out):
+                shm.close()
+                shm.unlink()
+            self._in = self._out = None
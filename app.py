@@ -1,8 +1,11 @@
 import os
 import sys
+import time
 import random
 import logging
-from flask import Flask, request, jsonify, render_template
+import threading
+import json
+from flask import Flask, request, jsonify, render_template, Response
 from flask_cors import CORS
 
 # Fix macOS MPS issues - MUST be before ANY torch/transformers imports
@@ -30,7 +33,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Import the detector model and quiz loader
-from ai_text_detector.models import DetectorModel
+from ai_text_detector.models import DetectorModel, CascadeDetector
+from ai_text_detector.serving import Readiness, warm_up
+from ai_text_detector.scheduler import PriorityScheduler
+from ai_text_detector.jobs import JobStore, JobManager
+from ai_text_detector.admission import AdmissionController
+from ai_text_detector.linear import is_linear_model_dir
+from ai_text_detector.bundle import is_bundle_dir
 from src.quiz_dataset_loader import QuizDatasetLoader
 
 app = Flask(__name__)
@@ -39,12 +48,31 @@ CORS(app)
 # Global detector instance and quiz dataset
 detector = None
 quiz_loader = None
+readiness = Readiness()
+# All inference goes through the scheduler so bulk jobs can't starve quiz/detect requests
+scheduler = None
+# Sheds requests whose estimated queue wait is over budget (fast 429/503 instead of a timeout)
+admission = None
+# Asynchronous jobs (POST /jobs); state lives on disk so it survives restarts
+job_store = JobStore(os.environ.get('AI_DETECTOR_JOBS_DIR', 'jobs'))
+job_manager = None
 
 @app.route('/')
 def index():
     """Serve the main page"""
     return render_template('index.html')
 
+@app.route('/health/live')
+def health_live():
+    """Liveness probe: the process is up and serving HTTP"""
+    return jsonify({'status': 'alive'})
+
+@app.route('/health/ready')
+def health_ready():
+    """Readiness probe: 503 until the model is loaded and warmed up"""
+    # pid tells multi-worker probes (scripts/measure_serving_rss.py) which worker answered
+    return jsonify({**readiness.as_dict(), 'pid': os.getpid()}), (200 if readiness.ready else 503)
+
 @app.route('/health')
 def health():
     """Health check endpoint"""
@@ -52,10 +80,14 @@ def health():
     
     return jsonify({
         'status': 'healthy',
+        'ready': readiness.ready,
+        'readiness': readiness.state,
         'model_loaded': detector is not None,
-        'device': str(next(detector.model.parameters()).device) if detector else 'unknown',
+        'device': (str(next(detector.model.parameters()).device) if hasattr(detector, 'model')
+                   else 'cpu' if detector else 'unknown'),
         'quiz_loader_status': quiz_status,
-        'quiz_loader_count': len(quiz_loader) if quiz_loader else 0
+        'quiz_loader_count': len(quiz_loader) if quiz_loader else 0,
+        'cascade': detector.stats() if hasattr(detector, 'stats') else None
     })
 
 @app.route('/quiz/text', methods=['GET'])
@@ -133,8 +165,16 @@ def check_quiz_answer():
         text = sample['text']
         true_label = sample['label_name']
         
+        if not readiness.ready:
+            return jsonify({'error': f'Model not ready ({readiness.state})'}), 503
+        
+        decision = admission.admit('interactive', 1, max_length=768)
+        if not decision.admitted:
+            return _shed(decision)
+        
         # Get model prediction
-        ai_prob, predicted_label = detector.predict(text, max_length=768, threshold=0.5)
+        ai_prob, predicted_label = scheduler.predict(text, max_length=decision.max_length, threshold=0.5,
+                                                     priority='interactive')
         
         # Map predicted label to label name
         predicted_label_name = 'AI-generated' if predicted_label == 1 else 'Human-written'
@@ -162,11 +202,123 @@ def check_quiz_answer():
         logger.error(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
+def _label_name(label):
+    return 'AI-generated' if label == 1 else 'Human-written'
+
+def _shed(decision):
+    """Fast rejection with a Retry-After hint"""
+    response = jsonify({
+        'error': f'Server overloaded ({decision.reason}), retry later',
+        'estimated_wait_seconds': decision.estimated_wait,
+        'retry_after_seconds': decision.retry_after,
+    })
+    response.status_code = decision.status
+    response.headers['Retry-After'] = str(decision.retry_after)
+    return response
+
+@app.route('/detect', methods=['POST'])
+def detect():
+    """Score {"text": ...} (interactive) or {"texts": [...]} (bulk by default)"""
+    try:
+        data = request.json or {}
+        if not readiness.ready:
+            return jsonify({'error': f'Model not ready ({readiness.state})'}), 503
+        threshold = float(data.get('threshold', 0.5))
+        
+        if 'text' in data:
+            priority = data.get('priority', 'interactive')
+            decision = admission.admit(priority, 1, max_length=768)
+            if not decision.admitted:
+                return _shed(decision)
+            ai_prob, label = scheduler.predict(str(data['text']), max_length=decision.max_length,
+                                               threshold=threshold, priority=priority)
+            return jsonify({'ai_probability': ai_prob, 'label': label, 'prediction': _label_name(label),
+                            'max_length': decision.max_length})
+        
+        texts = data.get('texts')
+        if not isinstance(texts, list):
+            return jsonify({'error': 'Expected "text" (string) or "texts" (list of strings)'}), 400
+        priority = data.get('priority', 'bulk')
+        decision = admission.admit(priority, len(texts), max_length=768)
+        if not decision.admitted:
+            return _shed(decision)
+        results = scheduler.predict_batch([str(t) for t in texts], max_length=decision.max_length,
+                                          threshold=threshold, priority=priority)
+        return jsonify({'max_length': decision.max_length, 'results': [
+            {'ai_probability': p, 'label': l, 'prediction': _label_name(l)} for p, l in results
+        ]})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in /detect: {e}")
+        import traceback
+        logger.error(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue {"texts": [...]} or {"document": "..."}; returns a job id immediately"""
+    data = request.json or {}
+    if job_manager is None or not readiness.ready:
+        return jsonify({'error': f'Model not ready ({readiness.state})'}), 503
+    if isinstance(data.get('document'), str):
+        job_id = job_manager.submit_document(data['document'])
+    elif isinstance(data.get('texts'), list):
+        job_id = job_manager.submit_texts(data['texts'])
+    else:
+        return jsonify({'error': 'Expected "texts" (list of strings) or "document" (string)'}), 400
+    return jsonify({
+        'job_id': job_id,
+        'status_url': f'/jobs/{job_id}',
+        'results_url': f'/jobs/{job_id}/results',
+    }), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Job status plus results from ?offset= (default 0), at most ?limit= (default 1000)"""
+    status = job_store.status(job_id)
+    if status is None:
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', 1000, type=int)
+    status['results'] = list(job_store.iter_results(job_id, offset=offset, limit=limit))
+    status['next_offset'] = offset + len(status['results'])
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/results', methods=['GET'])
+def stream_job_results(job_id):
+    """Results as NDJSON from ?offset=; with ?follow=1, keep streaming until the job ends"""
+    if job_store.status(job_id) is None:
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    offset = request.args.get('offset', 0, type=int)
+    follow = request.args.get('follow', '0') == '1'
+    
+    def generate():
+        sent = offset
+        while True:
+            finished = job_store.status(job_id)['status'] in ('done', 'failed')
+            for result in job_store.iter_results(job_id, offset=sent):
+                sent += 1
+                yield json.dumps(result) + '\n'
+            if not follow or finished:
+                return
+            time.sleep(0.5)
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/metrics')
+def metrics():
+    """Scheduler queue depth, wait/latency percentiles and shed counts per priority class"""
+    return jsonify({
+        'scheduler': scheduler.stats() if scheduler else None,
+        'admission': admission.stats() if admission else None,
+    })
+
 def load_detector():
     """Load the AI Text Detector"""
-    global detector
+    global detector, scheduler, admission, job_manager
     
-    model_path = "models/ai_detector"
+    model_path = os.environ.get("AI_DETECTOR_MODEL_PATH", "models/ai_detector")
     
     # Check if model directory exists AND has model files
     has_model = False
@@ -174,8 +326,19 @@ def load_detector():
         # Check for required model files
         required_files = ["config.json", "pytorch_model.bin"]
         has_model = all(os.path.exists(os.path.join(model_path, f)) for f in required_files)
+        # Hashed n-gram linear baseline / mmap bundle (ai-detector bundle)
+        has_model = has_model or is_linear_model_dir(model_path) or is_bundle_dir(model_path)
     
-    if has_model:
+    if os.environ.get("AI_DETECTOR_ISOLATED") == "1":
+        # Serve from a persistent child process (keeps torch/MPS state out of this one)
+        from ai_text_detector.load_model_safe import load_model_in_subprocess
+        isolated_path = model_path if has_model else "desklib/ai-text-detector-v1.01"
+        # Under gunicorn preload this runs in the master: start nothing here, each
+        # forked worker then starts its own child (and buffers) on first use
+        preload = os.environ.get("AI_DETECTOR_PRELOAD") == "1"
+        logger.info(f"{'Preparing' if preload else 'Starting'} isolated inference worker for {isolated_path}")
+        detector = load_model_in_subprocess(isolated_path, lazy=preload)
+    elif has_model:
         try:
             logger.info(f"Loading trained model from {model_path}")
             detector = DetectorModel.load(model_path)
@@ -195,6 +358,37 @@ def load_detector():
             traceback.print_exc()
             detector = DetectorModel("roberta-base", use_desklib=False)
     
+    # Optional confidence cascade: a cheap first stage answers easy texts
+    first_stage_path = os.environ.get("AI_DETECTOR_FIRST_STAGE")
+    if first_stage_path:
+        low = float(os.environ.get("AI_DETECTOR_CASCADE_LOW", "0.1"))
+        high = float(os.environ.get("AI_DETECTOR_CASCADE_HIGH", "0.9"))
+        try:
+            logger.info(f"Loading cascade first stage from {first_stage_path} (band [{low}, {high}])")
+            detector = CascadeDetector(DetectorModel.load(first_stage_path), detector, low=low, high=high)
+        except Exception as e:
+            logger.error(f"Failed to load cascade first stage, serving without it: {e}")
+    
+    scheduler = PriorityScheduler(
+        detector,
+        classes={
+            'interactive': float(os.environ.get('AI_DETECTOR_INTERACTIVE_TARGET_MS', '500')) / 1000,
+            'bulk': float(os.environ.get('AI_DETECTOR_BULK_TARGET_MS', '60000')) / 1000,
+        },
+        max_batch_size=int(os.environ.get('AI_DETECTOR_MAX_BATCH', '16')),
+    )
+    degraded_length = int(os.environ.get('AI_DETECTOR_DEGRADED_MAX_LENGTH', '0'))
+    admission = AdmissionController(
+        scheduler,
+        max_wait={
+            'interactive': float(os.environ.get('AI_DETECTOR_INTERACTIVE_MAX_WAIT_MS', '2000')) / 1000,
+            'bulk': float(os.environ.get('AI_DETECTOR_BULK_MAX_WAIT_MS', '120000')) / 1000,
+        },
+        max_queue=int(os.environ.get('AI_DETECTOR_MAX_QUEUE', '2000')),
+        degraded_max_length=degraded_length or None,
+    )
+    job_manager = JobManager(job_store, scheduler,
+                             max_workers=int(os.environ.get('AI_DETECTOR_JOB_WORKERS', '2')))
     return detector
 
 def load_quiz_dataset(data_dir='data'):
@@ -225,33 +419,64 @@ def load_quiz_dataset(data_dir='data'):
     print("   Please ensure CSV files exist in the data/ directory")
     return None
 
+def warm_up_detector():
+    """Run warm-up batches, then mark this process ready for traffic"""
+    if detector is None:
+        readiness.fail("Detector failed to load")
+        return
+    if os.environ.get("AI_DETECTOR_WARMUP", "1") != "0":
+        readiness.set("warming_up")
+        try:
+            seconds = warm_up(detector)
+            logger.info(f"Warm-up finished in {seconds:.1f}s")
+        except Exception as e:
+            # A failed warm-up only costs first-request latency; still serve
+            logger.error(f"Warm-up failed: {e}")
+    readiness.set("ready")
+    # Pick up jobs a previous (crashed/restarted) process left unfinished
+    resumed = job_manager.resume()
+    if resumed:
+        logger.info(f"Resumed {len(resumed)} unfinished job(s)")
+
+def start_warm_up():
+    """Warm up in a background thread (used by gunicorn workers after fork)"""
+    threading.Thread(target=warm_up_detector, name="warm-up", daemon=True).start()
+
 # Initialize on import (for gunicorn) - must be after function definitions
 def init_app():
     """Initialize the app - called on startup"""
     global detector, quiz_loader
     
+    readiness.set("loading")
     # Load detector
     try:
         load_detector()
     except Exception as e:
         logger.error(f"Failed to load detector: {e}")
+        readiness.fail(e)
     
     # Load quiz dataset
     try:
-        load_quiz_dataset()
+        load_quiz_dataset(os.environ.get('AI_DETECTOR_DATA_DIR', 'data'))
     except Exception as e:
         logger.error(f"Failed to load quiz dataset: {e}")
 
-# Initialize when module is imported (works with gunicorn)
-init_app()
+def _startup():
+    init_app()
+    if readiness.state != "failed":
+        warm_up_detector()
+
+# Initialize when module is imported (works with gunicorn).
+# With gunicorn's preload_app the master loads synchronously and each worker
+# warms up after fork (see gunicorn.conf.py); inference must not run in the
+# master before fork. Otherwise load + warm-up run in a background thread so
+# the process can answer liveness probes immediately.
+if os.environ.get("AI_DETECTOR_PRELOAD") == "1":
+    init_app()
+else:
+    threading.Thread(target=_startup, name="startup", daemon=True).start()
 
 if __name__ == '__main__':
-    # Load detector on startup (already done by init_app, but keep for direct execution)
-    if detector is None:
-        load_detector()
-    if quiz_loader is None:
-        load_quiz_dataset()
     # Get port from environment variable (for deployment) or use default
     port = int(os.environ.get('PORT', 5000))
     app.run(debug=False, host='0.0.0.0', port=port)
-
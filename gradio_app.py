@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 
 # Fix macOS MPS issues - MUST be before ANY torch/transformers imports
 if sys.platform == "darwin":  # macOS
@@ -20,7 +21,10 @@ if sys.platform == "darwin":
         pass
 
 from ai_text_detector.models import DetectorModel
+from ai_text_detector.linear import is_linear_model_dir
+from ai_text_detector.bundle import is_bundle_dir
 from ai_text_detector.datasets import DatasetLoader
+from ai_text_detector.serving import Readiness, warm_up, available_cores
 
 # Initialize model and tokenizer
 model = None
@@ -38,12 +42,14 @@ def load_model():
         # Check for required model files
         required_files = ["config.json", "pytorch_model.bin"]
         has_model = all(os.path.exists(os.path.join(model_path, f)) for f in required_files)
+        # Hashed n-gram linear baseline / mmap bundle (ai-detector bundle)
+        has_model = has_model or is_linear_model_dir(model_path) or is_bundle_dir(model_path)
     
     if has_model:
         try:
             print(f"Loading trained model from {model_path}")
             model = DetectorModel.load(model_path)
-            tokenizer = model.tokenizer
+            tokenizer = getattr(model, "tokenizer", None)  # linear models have none
         except Exception as e:
             print(f"Failed to load model: {e}")
             print("Using Desklib pre-trained model instead.")
@@ -65,45 +71,76 @@ def load_model():
             model = DetectorModel("roberta-base", use_desklib=False)
             tokenizer = model.tokenizer
 
-# Load model lazily (on first use) to avoid startup issues
-_model_loaded = False
+# Load the model in a background thread at process start (not on first click),
+# then warm it up; detect_text waits on `readiness` instead of loading itself.
+readiness = Readiness()
 
-def ensure_model_loaded():
-    """Load model if not already loaded"""
-    global model, tokenizer, _model_loaded
-    if not _model_loaded:
+def _startup():
+    readiness.set("loading")
+    try:
         load_model()
-        _model_loaded = True
+    except Exception as e:
+        print(f"⚠️  Model failed to load: {e}")
+        readiness.fail(e)
+        return
+    if os.environ.get("AI_DETECTOR_WARMUP", "1") != "0":
+        readiness.set("warming_up")
+        try:
+            print(f"🔥 Warm-up finished in {warm_up(model):.1f}s")
+        except Exception as e:
+            print(f"⚠️  Warm-up failed: {e}")
+    readiness.set("ready")
 
-def detect_text(text):
-    """Detect if text is AI-generated or human-written"""
-    global model, tokenizer
-    
-    # Load model on first use
-    ensure_model_loaded()
-    
-    if not text.strip():
-        return "Please enter some text to analyze."
+threading.Thread(target=_startup, name="startup", daemon=True).start()
+
+def ensure_model_loaded(timeout=None):
+    """Wait for the background load; returns False if it isn't ready in time"""
+    return readiness.wait(timeout)
+
+# Submissions per model call, and batches in flight at once. Each forward pass
+# already uses torch's whole thread pool, so by default only as many batches run
+# concurrently as there are thread pools' worth of cores (usually 1).
+MAX_BATCH_SIZE = int(os.environ.get("AI_DETECTOR_GRADIO_MAX_BATCH", "16"))
+CONCURRENCY_LIMIT = int(os.environ.get("AI_DETECTOR_GRADIO_CONCURRENCY", "0")) or \
+    max(1, available_cores() // torch.get_num_threads())
+
+def _format_prediction(ai_prob, predicted_label):
+    if predicted_label == 1:
+        label = "🤖 AI-generated"
+        confidence = ai_prob
+    else:
+        label = "🧑 Human-written"
+        confidence = 1 - ai_prob  # Human probability is 1 - AI probability
+    return f"{label} (confidence: {confidence:.1%})"
+
+def detect_texts(texts):
+    """
+    Batched handler: Gradio's queue collects up to MAX_BATCH_SIZE concurrent
+    submissions and passes them in as one list, so they share one forward pass.
+    """
+    if not ensure_model_loaded(timeout=float(os.environ.get("AI_DETECTOR_READY_TIMEOUT", "60"))):
+        message = f"Model is still starting up ({readiness.state}). Please try again in a moment."
+        return [[message] * len(texts)]
     
+    outputs = ["Please enter some text to analyze."] * len(texts)
+    to_score = [i for i, text in enumerate(texts) if text.strip()]
     try:
-        # Use the model's predict method
-        ai_prob, predicted_label = model.predict(text, max_length=768, threshold=0.5)
-        
-        # Determine prediction
-        if predicted_label == 1:
-            label = "🤖 AI-generated"
-            confidence = ai_prob
-        else:
-            label = "🧑 Human-written"
-            confidence = 1 - ai_prob  # Human probability is 1 - AI probability
-        
-        return f"{label} (confidence: {confidence:.1%})"
-        
+        results = model.predict_batch([texts[i] for i in to_score], max_length=768,
+                                      threshold=0.5, batch_size=MAX_BATCH_SIZE)
+        for i, (ai_prob, predicted_label) in zip(to_score, results):
+            outputs[i] = _format_prediction(ai_prob, predicted_label)
     except Exception as e:
-        return f"Error processing text: {str(e)}"
+        for i in to_score:
+            outputs[i] = f"Error processing text: {str(e)}"
+    # One list per output component
+    return [outputs]
 
-# Create Gradio interface (model will load on first detection)
-print("Starting Gradio app... Model will load on first use.")
+def detect_text(text):
+    """Detect if text is AI-generated or human-written"""
+    return detect_texts([text])[0][0]
+
+# Create Gradio interface (model loads in the background meanwhile)
+print("Starting Gradio app... Model is loading in the background.")
 with gr.Blocks(title="AI Text Detector", theme=gr.themes.Soft()) as app:
     gr.Markdown("# 🔍 AI Text Detector")
     gr.Markdown("Paste any text below to detect if it was written by AI or a human.")
@@ -125,18 +162,24 @@ with gr.Blocks(title="AI Text Detector", theme=gr.themes.Soft()) as app:
                 lines=3
             )
     
-    # Connect the button to the function
+    # Connect the button to the (batched) function
     detect_btn.click(
-        fn=detect_text,
+        fn=detect_texts,
         inputs=text_input,
-        outputs=result_output
+        outputs=result_output,
+        batch=True,
+        max_batch_size=MAX_BATCH_SIZE,
+        api_name="detect"
     )
     
     # Also detect on Enter key
     text_input.submit(
-        fn=detect_text,
+        fn=detect_texts,
         inputs=text_input,
-        outputs=result_output
+        outputs=result_output,
+        batch=True,
+        max_batch_size=MAX_BATCH_SIZE,
+        api_name=False
     )
     
     # Add some example texts
@@ -157,5 +200,8 @@ with gr.Blocks(title="AI Text Detector", theme=gr.themes.Soft()) as app:
         cache_examples=False
     )
 
+app.queue(default_concurrency_limit=CONCURRENCY_LIMIT)
+
 if __name__ == "__main__":
-    app.launch(share=True, server_name="0.0.0.0", server_port=7860)
+    app.launch(share=os.environ.get("AI_DETECTOR_GRADIO_SHARE", "1") != "0",
+               server_name="0.0.0.0", server_port=int(os.environ.get("GRADIO_SERVER_PORT", "7860")))
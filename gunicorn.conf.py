@@ -0,0 +1,36 @@
+"""
+Gunicorn settings for app.py.
+
+    gunicorn app:app -c gunicorn.conf.py
+
+The app (and the Desklib weights) is loaded once in the master and shared with
+the forked workers copy-on-write; each worker gets cores // workers torch
+threads so the workers don't oversubscribe the CPU.
+
+With AI_DETECTOR_ISOLATED=1 nothing is loaded in the master: every worker
+starts its own inference child process (and shared buffers) on first use, so
+workers never share a pipe or a child.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+
+# Load the model in the master, before fork (app.py loads synchronously when
+# AI_DETECTOR_PRELOAD=1 and leaves warm-up to the workers)
+preload_app = True
+os.environ["AI_DETECTOR_PRELOAD"] = "1"
+
+def pre_fork(server, worker):
+    from ai_text_detector.serving import prepare_for_fork
+    prepare_for_fork()
+
+def post_fork(server, worker):
+    from ai_text_detector.serving import configure_worker_threads
+    n = configure_worker_threads(workers)
+    server.log.info(f"Worker {worker.pid}: {n} torch thread(s)")
+    # Each worker warms up its own thread pools, then reports ready
+    import app
+    app.start_warm_up()
@@ -0,0 +1,79 @@
+"""
+Benchmark MinHash/LSH near-duplicate detection (ai_text_detector.dedup).
+
+Generates `-n` synthetic documents (default one million) from a random
+vocabulary and plants `--dup-rate` near-duplicates: copies of earlier
+documents with `--edits` words replaced. It then times `find_near_duplicates`
+and reports throughput, recall on the planted pairs, unexpected pairs, and
+peak RSS. Documents are generated on the fly, so the input is a real stream.
+
+Usage:
+    python scripts/bench_dedup.py                       # 1M docs, all cores
+    python scripts/bench_dedup.py -n 100000 --workers 4 --words 300
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import resource
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from ai_text_detector.dedup import find_near_duplicates
+
+def synthetic_stream(n, words, vocab, dup_rate, edits, seed, planted, keep_last=10_000):
+    """Yield documents; planted[i] = source index for each planted near-duplicate."""
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(vocab)]
+    recent = []  # sources are drawn from a recent window to keep memory flat
+    for i in range(n):
+        if recent and rng.random() < dup_rate:
+            src, text = rng.choice(recent)
+            tokens = text.split()
+            for _ in range(edits):
+                tokens[rng.randrange(len(tokens))] = rng.choice(vocabulary)
+            planted[i] = src
+            yield " ".join(tokens)
+            continue
+        text = " ".join(rng.choice(vocabulary) for _ in range(words))
+        recent.append((i, text))
+        if len(recent) > keep_last:
+            recent.pop(rng.randrange(len(recent)))
+        yield text
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MinHash/LSH near-duplicate detection")
+    parser.add_argument("-n", type=int, default=1_000_000, help="Documents")
+    parser.add_argument("--words", type=int, default=200, help="Words per document")
+    parser.add_argument("--vocab", type=int, default=50_000, help="Vocabulary size")
+    parser.add_argument("--dup-rate", type=float, default=0.05, help="Fraction of planted near-duplicates")
+    parser.add_argument("--edits", type=int, default=3, help="Words replaced in each planted copy")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--bands", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=None, help="Signature processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    planted = {}
+    stream = synthetic_stream(args.n, args.words, args.vocab, args.dup_rate, args.edits, args.seed, planted)
+    print(f"🧪 {args.n:,} docs x {args.words} words, ~{args.dup_rate:.0%} planted near-duplicates "
+          f"({args.edits} edits), workers={args.workers or os.cpu_count()}")
+    start = time.perf_counter()
+    keep, pairs = find_near_duplicates(stream, threshold=args.threshold, num_perm=args.num_perm,
+                                       bands=args.bands, batch_size=args.batch_size, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    found = {i for i, _, _ in pairs}
+    hits = sum(1 for i in planted if i in found)
+    unexpected = len(found - set(planted))
+    rss_self = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    rss_child = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(f"⏱️  {elapsed:.1f}s ({args.n / elapsed:,.0f} docs/s)")
+    print(f"🎯 Recall on planted near-duplicates: {hits:,}/{len(planted):,} ({hits / max(len(planted), 1):.1%})")
+    print(f"❓ Flagged but not planted: {unexpected:,}")
+    print(f"🧠 Peak RSS: main {rss_self:.0f}MB, largest worker {rss_child:.0f}MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Track startup time of the project's entry points against a budget.
+
+Each entry point is run in a fresh interpreter several times and its median
+wall time is compared with its budget; the script exits non-zero if any
+entry point is over budget, so it can gate CI.
+
+Entry points that must import torch/transformers or scikit-learn are timed
+against a baseline that imports just those libraries (runs alternate, so
+both see the same machine load), and their budget is a ratio to it: the
+libraries' own import time varies by machine, version and load far more
+than what the project adds.
+
+Usage:
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --repeat 5 --show-slowest 15
+
+Budgets have real headroom over measured medians; tighten them here as the
+project improves, or scale them for slow machines with IMPORT_BUDGET_SCALE=2.
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+import statistics
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# Third-party imports an entry point can't avoid (same statements as the module's own)
+TORCH_BASELINE = (
+    "import torch, torch.nn\n"
+    "from transformers import AutoModelForSequenceClassification, AutoTokenizer, AutoConfig, AutoModel, PreTrainedModel"
+)
+SKLEARN_BASELINE = (
+    "import numpy\n"
+    "from scipy import sparse\n"
+    "from scipy.special import expit\n"
+    "from sklearn.feature_extraction.text import HashingVectorizer\n"
+    "from sklearn.linear_model import LogisticRegression"
+)
+
+# name -> (python -c code, baseline code or None, budget)
+# The budget is seconds without a baseline, else allowed overhead as a fraction of the baseline.
+# Measured medians: --help 0.06-0.08s, cli 0.05-0.08s (0.18s under load); linear and models
+# within -8%..+15% of their baselines (run-to-run noise; the project adds ~nothing itself).
+ENTRY_POINTS = {
+    "ai-detector --help": (
+        "import sys; sys.argv = ['ai-detector', '--help']\n"
+        "from ai_text_detector.cli import main\n"
+        "try:\n    main()\nexcept SystemExit:\n    pass",
+        None,
+        0.5,
+    ),
+    "import ai_text_detector.cli": ("import ai_text_detector.cli", None, 0.4),
+    "import ai_text_detector.linear": ("import ai_text_detector.linear", SKLEARN_BASELINE, 0.3),
+    "import ai_text_detector.models": ("import ai_text_detector.models", TORCH_BASELINE, 0.3),
+}
+
+def _run(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def time_entry_point(code: str, repeat: int, baseline: str = None):
+    """Median wall time of `code` in a fresh interpreter, and of `baseline` in runs alternating with it."""
+    times, base_times = [], []
+    for _ in range(repeat):
+        times.append(_run(code))
+        if baseline:
+            base_times.append(_run(baseline))
+    return statistics.median(times), statistics.median(base_times) if baseline else None
+
+def slowest_imports(code: str, n: int):
+    """Top-n modules by cumulative import time, from `python -X importtime`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                            capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.split("|")]
+        rows.append((int(cumulative_us), name))
+    return sorted(rows, reverse=True)[:n]
+
+def main():
+    parser = argparse.ArgumentParser(description="Check entry-point import time against budgets")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per entry point (median is kept)")
+    parser.add_argument("--show-slowest", type=int, default=0,
+                        help="Also list the N slowest imports for entry points over budget")
+    args = parser.parse_args()
+    scale = float(os.environ.get("IMPORT_BUDGET_SCALE", "1"))
+
+    over = []
+    for name, (code, baseline, budget) in ENTRY_POINTS.items():
+        try:
+            seconds, base = time_entry_point(code, args.repeat, baseline)
+        except subprocess.CalledProcessError:
+            print(f"❌ {name:<34} failed to run (missing dependency?)")
+            over.append((name, code))
+            continue
+        budget = base * (1 + budget * scale) if baseline else budget * scale
+        status = "✅" if seconds <= budget else "❌"
+        detail = f", libraries alone {base:.2f}s, ours {seconds / base - 1:+.0%}" if baseline else ""
+        print(f"{status} {name:<34} {seconds:6.2f}s (budget {budget:.2f}s{detail})")
+        if seconds > budget:
+            over.append((name, code))
+
+    for name, code in over:
+        if args.show_slowest:
+            print(f"\nSlowest imports for {name}:")
+            for cumulative_us, module in slowest_imports(code, args.show_slowest):
+                print(f"   {cumulative_us / 1e6:6.3f}s  {module}")
+
+    sys.exit(1 if over else 0)
+
+if __name__ == "__main__":
+    main()
@@ -8,78 +8,77 @@ Usage:
     python scripts/download_kagglehub.py --dataset shamimhasan8/ai-vs-human-text-dataset
 """
 import os
-import kagglehub
-import pandas as pd
-import glob
 from pathlib import Path
 import argparse
+from ai_text_detector.download_data import sync_dataset, KaggleHubSource, LocalDirectorySource
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 
-def download_dataset(dataset_slug: str, output_name: str = None):
+def _pick_main_csv(csv_files):
+    """If multiple CSVs, try to find the main one, else use the largest"""
+    if len(csv_files) == 1:
+        return csv_files[0]
+    for csv_file in csv_files:
+        name_lower = csv_file.name.lower()
+        if any(keyword in name_lower for keyword in ['train', 'main', 'dataset', 'data']):
+            return csv_file
+    main_csv = max(csv_files, key=lambda p: p.stat().st_size)
+    print(f"   Using largest file: {main_csv.name}")
+    return main_csv
+
+def download_dataset(dataset_slug: str, output_name: str = None, fmt: str = "csv",
+                     all_files: bool = False, source=None, workers: int = 4, force: bool = False):
     """
     Download a Kaggle dataset using kagglehub.
     
+    Files are streamed into data/ (copied, or converted to Parquet) and
+    recorded in data/.datasets_manifest.json; unchanged files are skipped on
+    the next run.
+    
     Args:
         dataset_slug: Kaggle dataset slug (e.g., "shamimhasan8/ai-vs-human-text-dataset")
-        output_name: Optional name for the output CSV file
+        output_name: Optional name for the output file (main file only)
+        fmt: "csv" or "parquet"
+        all_files: Bring in every CSV of the dataset (in parallel), not just the main one
+        source: DatasetSource (default: kagglehub)
+        workers: Files processed in parallel
+        force: Re-process even if unchanged
     """
-    print(f"📥 Downloading dataset: {dataset_slug}")
-    print("   (No API token needed with kagglehub!)")
+    if isinstance(source or KaggleHubSource(), KaggleHubSource):
+        print("   (No API token needed with kagglehub!)")
     
-    # Download dataset - returns path to downloaded files
-    path = kagglehub.dataset_download(dataset_slug)
-    print(f"✅ Downloaded to: {path}")
-    
-    # Find all CSV files in the downloaded directory
-    csv_files = list(Path(path).glob("*.csv"))
-    
-    if not csv_files:
-        print(f"⚠️  No CSV files found in {path}")
-        print(f"   Files found: {list(Path(path).iterdir())}")
-        return None
+    picked = {}
+    output_names = {}
     
-    print(f"\n📊 Found {len(csv_files)} CSV file(s):")
-    for csv_file in csv_files:
-        print(f"   - {csv_file.name}")
-    
-    # If multiple CSVs, try to find the main one or merge them
-    if len(csv_files) == 1:
-        main_csv = csv_files[0]
-    else:
-        # Look for common names
-        main_csv = None
+    def select(csv_files):
+        print(f"\n📊 Found {len(csv_files)} CSV file(s):")
         for csv_file in csv_files:
-            name_lower = csv_file.name.lower()
-            if any(keyword in name_lower for keyword in ['train', 'main', 'dataset', 'data']):
-                main_csv = csv_file
-                break
-        
-        if not main_csv:
-            # Use the largest CSV
-            main_csv = max(csv_files, key=lambda p: p.stat().st_size)
-            print(f"   Using largest file: {main_csv.name}")
-    
-    # Copy to data directory
-    output_path = os.path.join(DATA_DIR, output_name or main_csv.name)
+            print(f"   - {csv_file.name}")
+        main_csv = _pick_main_csv(csv_files)
+        picked["main"] = main_csv
+        picked["others"] = [f for f in csv_files if f != main_csv]
+        if output_name:
+            output_names[main_csv.name] = output_name
+        return csv_files if all_files else [main_csv]
     
-    # Read and save (this also normalizes the file)
-    print(f"\n📝 Processing and saving to: {output_path}")
-    df = pd.read_csv(main_csv)
-    print(f"   Rows: {len(df):,}")
-    print(f"   Columns: {list(df.columns)}")
+    try:
+        outputs = sync_dataset(dataset_slug, data_dir=DATA_DIR, source=source, fmt=fmt,
+                               files=select, output_names=output_names,
+                               max_workers=workers, force=force)
+    except ValueError as e:
+        print(f"⚠️  {e}")
+        return None
     
-    df.to_csv(output_path, index=False)
+    output_path = outputs[picked["main"].name]
     print(f"✅ Saved to: {output_path}")
     
     # If there are other CSVs, mention them
-    other_csvs = [f for f in csv_files if f != main_csv]
-    if other_csvs:
-        print(f"\n💡 Other CSV files available in {path}:")
-        for csv_file in other_csvs:
+    if picked["others"] and not all_files:
+        print(f"\n💡 Other CSV files available in {picked['main'].parent}:")
+        for csv_file in picked["others"]:
             print(f"   - {csv_file.name}")
-        print(f"   You can manually copy them to {DATA_DIR} if needed")
+        print(f"   Re-run with --all-files to bring them into {DATA_DIR}")
     
     return output_path
 
@@ -94,10 +93,20 @@ def main():
         "--output",
         help="Output filename (default: uses dataset filename)"
     )
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Save as CSV (streaming copy) or Parquet (streaming conversion)")
+    parser.add_argument("--all-files", action="store_true",
+                        help="Bring in every CSV of the dataset, in parallel")
+    parser.add_argument("--workers", type=int, default=4, help="Files processed in parallel")
+    parser.add_argument("--source-dir", default=None,
+                        help="Read <dir>/<owner>/<dataset>/*.csv instead of downloading (offline/tests)")
+    parser.add_argument("--force", action="store_true", help="Re-process even if unchanged")
     
     args = parser.parse_args()
     
-    output_path = download_dataset(args.dataset, args.output)
+    source = LocalDirectorySource(args.source_dir) if args.source_dir else None
+    output_path = download_dataset(args.dataset, args.output, fmt=args.format, all_files=args.all_files,
+                                   source=source, workers=args.workers, force=args.force)
     
     if output_path:
         print(f"\n🎯 Next steps:")
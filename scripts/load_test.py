@@ -0,0 +1,342 @@
+"""
+HTTP load generator and soak test for app.py.
+
+By default it builds an offline fixture: a synthetic quiz corpus (CSV) and a
+tiny hashed n-gram linear model trained on it. It then starts app.py on that
+fixture (via AI_DETECTOR_MODEL_PATH / AI_DETECTOR_DATA_DIR) and drives
+/health, /quiz/text and /quiz/check with a weighted request mix. No network
+or downloaded model is needed.
+
+Arrivals are open-loop by default. Requests are scheduled as a Poisson
+process at `--rate` per second, whether or not earlier ones have returned.
+Latency is measured from each request's scheduled start, so a stalled server
+shows up as latency rather than silently lowering the offered load.
+`--concurrency` caps requests in flight. `--rate 0` switches to closed-loop:
+`--concurrency` clients each send back to back.
+
+Reports per-endpoint latency histograms and percentiles, error counts by
+status, and throughput. It also samples server RSS (master plus workers,
+from /proc) every `--rss-interval` seconds and reports growth and the MB/hour
+trend, which is how leaks show up in long soak runs.
+
+Usage:
+    python scripts/load_test.py --duration 60 --rate 50 --concurrency 32
+    python scripts/load_test.py --duration 3600 --rate 20 --rss-csv rss.csv      # soak
+    python scripts/load_test.py --server gunicorn --workers 2 --mix health=1,quiz_check=4
+    python scripts/load_test.py --url http://127.0.0.1:5000 --pid 12345          # existing server
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HUMAN_WORDS = ("honestly yesterday my friend grabbed coffee then we kinda wandered around town "
+               "lol the bus was late again so whatever we laughed about it anyway").split()
+AI_WORDS = ("furthermore additionally it is important to note that leveraging comprehensive "
+            "frameworks facilitates robust scalable outcomes across diverse domains").split()
+
+# Histogram bucket upper bounds in ms (log-spaced)
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+
+# ---------- fixture ----------
+
+def make_fixture(root, n_samples=2000, seed=0):
+    """Write data/ai_vs_human_text.csv and a trained linear model; returns (data_dir, model_dir)."""
+    import pandas as pd
+    from ai_text_detector.linear import LinearDetector
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_samples):
+        label = i % 2
+        words = AI_WORDS if label else HUMAN_WORDS
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(30, 200)))
+        rows.append({"text": text.capitalize() + ".", "label": label})
+    data_dir = os.path.join(root, "data")
+    model_dir = os.path.join(root, "model")
+    os.makedirs(data_dir, exist_ok=True)
+    pd.DataFrame(rows).to_csv(os.path.join(data_dir, "ai_vs_human_text.csv"), index=False)
+    LinearDetector(n_features=2**16).fit([r["text"] for r in rows], [r["label"] for r in rows]).save(model_dir)
+    return data_dir, model_dir
+
+# ---------- server ----------
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+def _rss(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+def server_rss(pid):
+    """RSS of the server process plus its direct children (gunicorn workers), in bytes."""
+    return sum(_rss(p) for p in [pid] + _children(pid))
+
+def start_server(kind, port, workers, env):
+    if kind == "gunicorn":
+        cmd = [sys.executable, "-m", "gunicorn", "app:app", "-c", "gunicorn.conf.py"]
+        env = {**env, "WEB_CONCURRENCY": str(workers)}
+    else:
+        cmd = [sys.executable, "app.py"]
+    return subprocess.Popen(cmd, cwd=ROOT, env={**env, "PORT": str(port)},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_ready(base, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base}/health/ready", timeout=2) as r:
+                if r.status == 200:
+                    return True
+        except Exception:
+            pass
+        time.sleep(0.5)
+    return False
+
+# ---------- requests ----------
+
+def _request(method, url, body=None, timeout=30):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method,
+                                 headers={"Content-Type": "application/json"} if data else {})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            r.read()
+            return r.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def make_requests(base, n_samples):
+    """Endpoint name -> zero-arg callable returning the HTTP status."""
+    def quiz_check():
+        answer = random.choice(["AI-generated", "Human-written"])
+        return _request("POST", f"{base}/quiz/check", {"text_id": random.randrange(n_samples), "answer": answer})
+    return {
+        "health": lambda: _request("GET", f"{base}/health"),
+        "quiz_text": lambda: _request("GET", f"{base}/quiz/text"),
+        "quiz_check": quiz_check,
+    }
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)   # endpoint -> seconds (successful only)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, name, status, latency):
+        with self.lock:
+            self.statuses[name][status] += 1
+            if isinstance(status, int) and status < 400:
+                self.latencies[name].append(latency)
+
+def _call(recorder, name, fn, scheduled):
+    try:
+        status = fn()
+    except Exception as e:
+        status = type(e).__name__
+    recorder.record(name, status, time.perf_counter() - scheduled)
+
+def run_open_loop(requests, mix, rate, duration, concurrency, recorder):
+    names, weights = list(mix), list(mix.values())
+    in_flight = threading.BoundedSemaphore(concurrency)
+    skipped = 0
+    end = time.perf_counter() + duration
+    next_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while next_at < end:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            name = random.choices(names, weights)[0]
+            if in_flight.acquire(blocking=False):
+                def task(name=name, scheduled=next_at):
+                    try:
+                        _call(recorder, name, requests[name], scheduled)
+                    finally:
+                        in_flight.release()
+                pool.submit(task)
+            else:
+                skipped += 1  # concurrency cap reached: the server is not keeping up
+            next_at += random.expovariate(rate)
+    return skipped
+
+def run_closed_loop(requests, mix, duration, concurrency, recorder):
+    names, weights = list(mix), list(mix.values())
+    end = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < end:
+            name = random.choices(names, weights)[0]
+            _call(recorder, name, requests[name], time.perf_counter())
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return 0
+
+def sample_rss(pid, interval, stop, samples):
+    start = time.perf_counter()
+    while not stop.is_set():
+        samples.append((time.perf_counter() - start, server_rss(pid)))
+        stop.wait(interval)
+
+# ---------- report ----------
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def histogram(latencies, width=40):
+    counts = [0] * len(BUCKETS_MS)
+    for t in latencies:
+        ms = t * 1000
+        counts[next(i for i, b in enumerate(BUCKETS_MS) if ms <= b)] += 1
+    peak = max(counts) or 1
+    lines = []
+    for bound, count in zip(BUCKETS_MS, counts):
+        label = "   inf" if bound == float("inf") else f"{bound:>6g}"
+        lines.append(f"  <= {label} ms | {'#' * round(width * count / peak):<{width}} {count}")
+    return "\n".join(lines)
+
+def _trend_mb_per_hour(samples):
+    """Least-squares slope of RSS over time."""
+    if len(samples) < 2:
+        return 0.0
+    n = len(samples)
+    mean_t = sum(t for t, _ in samples) / n
+    mean_r = sum(r for _, r in samples) / n
+    var = sum((t - mean_t) ** 2 for t, _ in samples)
+    if not var:
+        return 0.0
+    slope = sum((t - mean_t) * (r - mean_r) for t, r in samples) / var  # bytes per second
+    return slope * 3600 / 2**20
+
+def report(recorder, wall, skipped, rss_samples):
+    total = 0
+    print(f"\n⏱️  Ran {wall:.1f}s")
+    for name in sorted(recorder.statuses):
+        statuses = recorder.statuses[name]
+        count = sum(statuses.values())
+        ok = len(recorder.latencies[name])
+        total += count
+        lat = recorder.latencies[name]
+        print(f"\n📊 {name}: {count} requests, {count - ok} errors ({(count - ok) / count:.1%}), "
+              f"{ok / wall:.1f} ok/s")
+        print(f"   status: {dict(statuses)}")
+        if lat:
+            print(f"   latency ms: p50={_percentile(lat, 0.5) * 1000:.1f} p90={_percentile(lat, 0.9) * 1000:.1f} "
+                  f"p99={_percentile(lat, 0.99) * 1000:.1f} max={max(lat) * 1000:.1f}")
+            print(histogram(lat))
+    print(f"\n🚀 Total throughput: {total / wall:.1f} req/s")
+    if skipped:
+        print(f"⚠️  {skipped} arrivals skipped at the concurrency cap (server not keeping up)")
+    if rss_samples:
+        first, last = rss_samples[0][1], rss_samples[-1][1]
+        peak = max(r for _, r in rss_samples)
+        print(f"🧠 Server RSS: start={first / 2**20:.0f}MB end={last / 2**20:.0f}MB peak={peak / 2**20:.0f}MB "
+              f"growth={(last - first) / 2**20:+.1f}MB trend={_trend_mb_per_hour(rss_samples):+.1f}MB/h")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator / soak test for app.py")
+    parser.add_argument("--url", default=None, help="Test an already running server instead of starting one")
+    parser.add_argument("--pid", type=int, default=None, help="Server pid for RSS sampling with --url")
+    parser.add_argument("--server", choices=["flask", "gunicorn"], default="flask")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--port", type=int, default=5077)
+    parser.add_argument("--samples", type=int, default=2000, help="Synthetic quiz corpus size")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of load")
+    parser.add_argument("--rate", type=float, default=50, help="Open-loop arrivals per second (0 = closed loop)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Max requests in flight / closed-loop clients")
+    parser.add_argument("--mix", default="health=1,quiz_text=3,quiz_check=3",
+                        help="Weighted endpoint mix (health, quiz_text, quiz_check)")
+    parser.add_argument("--rss-interval", type=float, default=5.0)
+    parser.add_argument("--rss-csv", default=None, help="Write the RSS timeline here")
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    mix = parse_mix(args.mix)
+    proc = None
+    pid = args.pid
+    base = args.url
+    if base is None:
+        sys.path.insert(0, ROOT)
+        fixture = tempfile.mkdtemp(prefix="ai-detector-load-")
+        print(f"🧪 Building synthetic corpus and linear model in {fixture}")
+        data_dir, model_dir = make_fixture(fixture, args.samples, args.seed)
+        env = {**os.environ, "AI_DETECTOR_MODEL_PATH": model_dir, "AI_DETECTOR_DATA_DIR": data_dir,
+               "AI_DETECTOR_JOBS_DIR": os.path.join(fixture, "jobs")}
+        proc = start_server(args.server, args.port, args.workers, env)
+        pid = proc.pid
+        base = f"http://127.0.0.1:{args.port}"
+    try:
+        if not wait_ready(base, args.startup_timeout):
+            raise SystemExit(f"❌ Server at {base} did not become ready")
+        requests = make_requests(base, args.samples)
+        unknown = set(mix) - set(requests)
+        if unknown:
+            raise SystemExit(f"❌ Unknown endpoints in --mix: {sorted(unknown)}")
+
+        recorder = Recorder()
+        rss_samples, stop = [], threading.Event()
+        sampler = None
+        if pid:
+            sampler = threading.Thread(target=sample_rss, args=(pid, args.rss_interval, stop, rss_samples),
+                                       daemon=True)
+            sampler.start()
+        print(f"🔥 {'open' if args.rate else 'closed'}-loop load on {base} for {args.duration:.0f}s "
+              f"(rate={args.rate}/s, concurrency={args.concurrency}, mix={mix})")
+        start = time.perf_counter()
+        if args.rate > 0:
+            skipped = run_open_loop(requests, mix, args.rate, args.duration, args.concurrency, recorder)
+        else:
+            skipped = run_closed_loop(requests, mix, args.duration, args.concurrency, recorder)
+        wall = time.perf_counter() - start
+        stop.set()
+        if sampler:
+            sampler.join()
+            rss_samples.append((wall, server_rss(pid)))
+
+        report(recorder, wall, skipped, rss_samples)
+        if args.rss_csv and rss_samples:
+            with open(args.rss_csv, "w") as f:
+                f.write("seconds,rss_bytes\n")
+                f.writelines(f"{t:.1f},{r}\n" for t, r in rss_samples)
+            print(f"💾 RSS timeline written to {args.rss_csv}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Measure total memory of app.py under gunicorn for several worker counts.
+
+Starts `gunicorn app:app -c gunicorn.conf.py` with each WEB_CONCURRENCY value,
+waits until every worker answers /health/ready (model loaded and warmed up),
+then sums RSS and PSS over the master and its workers.
+PSS splits shared pages between the processes that map them, so it is the
+number that shows whether the weights are actually shared.
+
+Usage:
+    python scripts/measure_serving_rss.py --workers 1 2 4 8
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import subprocess
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+def _memory(pid):
+    """(rss, pss) in bytes for one process, from /proc (Linux only)."""
+    rss = pss = 0
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key == "Rss":
+                    rss = int(value.split()[0]) * 1024
+                elif key == "Pss":
+                    pss = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return rss, pss
+
+def _wait_ready(port, workers, timeout):
+    """Poll /health/ready until `workers` different worker pids have reported ready."""
+    deadline = time.time() + timeout
+    ready = set()
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health/ready", timeout=2) as r:
+                ready.add(json.load(r)["pid"])
+                if len(ready) >= workers:
+                    return True
+            time.sleep(0.05)  # ask again soon: the next connection may land on another worker
+        except Exception:
+            time.sleep(0.5)  # 503 while loading/warming up, or not listening yet
+    return False
+
+def measure(workers, port, timeout):
+    env = {**os.environ, "WEB_CONCURRENCY": str(workers), "PORT": str(port)}
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "app:app", "-c", "gunicorn.conf.py"],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not _wait_ready(port, workers, timeout):
+            raise RuntimeError(f"Server with {workers} worker(s) did not become ready")
+        pids = [proc.pid] + _children(proc.pid)
+        totals = [_memory(pid) for pid in pids]
+        return len(pids) - 1, sum(r for r, _ in totals), sum(p for _, p in totals)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Total server RSS/PSS per gunicorn worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--timeout", type=int, default=600, help="Seconds to wait for model load")
+    args = parser.parse_args()
+
+    print("| workers | total RSS (MB) | total PSS (MB) | PSS per worker (MB) |")
+    print("|---|---|---|---|")
+    for n in args.workers:
+        try:
+            started, rss, pss = measure(n, args.port, args.timeout)
+        except RuntimeError as e:
+            # Usually workers being OOM-killed and respawned while warming up
+            print(f"| {n} | not ready after {args.timeout}s | | |")
+            print(f"⚠️  {e}", file=sys.stderr)
+            continue
+        print(f"| {started} | {rss / 2**20:.0f} | {pss / 2**20:.0f} | {pss / 2**20 / max(started, 1):.0f} |")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
 """
 Helper script to intelligently sample a large dataset for training on M2 Mac.
 This creates balanced subsets for quick iteration.
+
+`--stream` samples in a single pass over one or more CSV/JSONL files without
+loading them, so multi-GB dumps work too: memory grows with the sample size,
+not the input size.
 """
+import heapq
 import pandas as pd
+import numpy as np
 import argparse
 from pathlib import Path
+from ai_text_detector.datasets import map_labels
+
+LABEL_COLUMNS = ["label", "target", "class", "is_ai"]
 
-def sample_dataset(input_path: str, output_path: str, n_samples: int, stratify: bool = True):
+def sample_dataset(input_path: str, output_path: str, n_samples: int, stratify: bool = True, seed: int = 42):
     """
     Sample a dataset while maintaining class balance.
     
@@ -15,6 +24,7 @@ def sample_dataset(input_path: str, output_path: str, n_samples: int, stratify:
         output_path: Path to save sampled dataset
         n_samples: Number of samples to keep
         stratify: If True, maintain class balance
+        seed: Random seed
     """
     print(f"📖 Loading dataset from {input_path}...")
     
@@ -29,11 +39,7 @@ def sample_dataset(input_path: str, output_path: str, n_samples: int, stratify:
     print(f"📊 Original dataset size: {len(df):,} samples")
     
     # Find label column
-    label_col = None
-    for col in ["label", "target", "class", "is_ai"]:
-        if col in df.columns:
-            label_col = col
-            break
+    label_col = _find_label_column(df.columns)
     
     if label_col:
         print(f"📈 Class distribution:")
@@ -43,24 +49,32 @@ def sample_dataset(input_path: str, output_path: str, n_samples: int, stratify:
     if stratify and label_col:
         # Stratified sampling to maintain balance
         sampled = df.groupby(label_col, group_keys=False).apply(
-            lambda x: x.sample(min(len(x), n_samples // 2), random_state=42)
+            lambda x: x.sample(min(len(x), n_samples // 2), random_state=seed)
         )
         # If we need more samples, take randomly
         if len(sampled) < n_samples:
             remaining = df[~df.index.isin(sampled.index)]
             needed = n_samples - len(sampled)
             if len(remaining) > 0:
-                additional = remaining.sample(min(len(remaining), needed), random_state=42)
+                additional = remaining.sample(min(len(remaining), needed), random_state=seed)
                 sampled = pd.concat([sampled, additional])
     else:
-        sampled = df.sample(min(len(df), n_samples), random_state=42)
+        sampled = df.sample(min(len(df), n_samples), random_state=seed)
     
     print(f"✅ Sampled dataset size: {len(sampled):,} samples")
     if label_col:
         print(f"📈 Sampled class distribution:")
         print(sampled[label_col].value_counts())
     
-    # Save
+    _save(sampled, output_path)
+
+def _find_label_column(columns):
+    for col in LABEL_COLUMNS:
+        if col in columns:
+            return col
+    return None
+
+def _save(sampled, output_path):
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
@@ -73,20 +87,174 @@ def sample_dataset(input_path: str, output_path: str, n_samples: int, stratify:
     
     print(f"💾 Saved to {output_path}")
 
+def _iter_chunks(input_path, chunksize):
+    path = str(input_path)
+    if path.endswith(".csv"):
+        yield from pd.read_csv(path, chunksize=chunksize)
+    elif path.endswith(".jsonl"):
+        yield from pd.read_json(path, lines=True, chunksize=chunksize)
+    elif path.endswith(".json"):
+        # A plain JSON array can't be read incrementally
+        print(f"⚠️  {path} is a JSON array; loading it whole (use JSONL to stream)")
+        yield pd.read_json(path)
+    else:
+        raise ValueError(f"Unsupported format: {input_path}")
+
+UNKNOWN_CLASS = "unknown"
+
+def label_keys(values) -> np.ndarray:
+    """
+    Class keys for stratifying: "1" (AI) / "0" (human) by the shared label
+    rules (`datasets.map_labels`), so 1, 1.0, "1" and "ai" are one class in
+    every chunk. Labels those rules don't know all share one "unknown" class,
+    so a free-text column can't open a reservoir per distinct value.
+    """
+    mapped = map_labels(pd.Series(values), unknown=None)
+    return np.where(mapped.notna(), mapped.fillna(0).astype(int).astype(str), UNKNOWN_CLASS).astype(str)
+
+def parse_class_ratio(spec: str):
+    """'0=0.7,1=0.3' or 'human=0.7,ai=0.3' -> {'0': 0.7, '1': 0.3} (keys as in `label_keys`)."""
+    ratio = {}
+    for part in spec.split(","):
+        label, _, weight = part.partition("=")
+        ratio[label_keys([label.strip()])[0]] = float(weight)
+    return ratio
+
+def _allocate(n_samples, available, ratio):
+    """
+    Per-class sample sizes in proportion to `ratio` (equal if None). A class
+    with too few rows gives its shortfall to the others.
+    """
+    weights = {c: (ratio.get(c, 0.0) if ratio else 1.0) for c in available}
+    targets = {c: 0 for c in available}
+    remaining = n_samples
+    open_classes = [c for c in available if weights[c] > 0]
+    while remaining > 0 and open_classes:
+        total = sum(weights[c] for c in open_classes)
+        shares = {c: int(remaining * weights[c] / total) for c in open_classes}
+        # Hand out rounding leftovers one by one, largest weight first
+        leftover = remaining - sum(shares.values())
+        for c in sorted(open_classes, key=lambda c: -weights[c])[:leftover]:
+            shares[c] += 1
+        for c in open_classes:
+            take = min(shares[c], available[c] - targets[c])
+            targets[c] += take
+            remaining -= take
+        open_classes = [c for c in open_classes if targets[c] < available[c]]
+    return targets
+
+def stream_sample_dataset(input_paths, output_path: str, n_samples: int, stratify: bool = True,
+                          seed: int = 42, class_ratio=None, chunksize: int = 100_000):
+    """
+    Single-pass sampling over one or more CSV/JSONL files.
+    
+    Every row gets a uniform random key (reproducible from `seed` for the
+    same inputs in the same order). Each class keeps the `n_samples` rows
+    with the smallest keys in a bounded heap, which is a uniform random
+    sample of that class. So memory is O(n_samples x classes) whatever the
+    input size. At the end, each class is cut down to its share of
+    `class_ratio` (equal shares by default).
+    
+    Args:
+        input_paths: CSV/JSONL paths, read in this order
+        output_path: Path to save sampled dataset
+        n_samples: Number of samples to keep
+        stratify: If True, sample per class using `class_ratio`
+        seed: Random seed
+        class_ratio: Mapping class key (see `label_keys`) -> weight, e.g. {"0": 0.7, "1": 0.3}
+        chunksize: Rows read per chunk
+    """
+    rng = np.random.default_rng(seed)
+    heaps = {}       # class -> max-heap of (-key, seq, row)
+    counts = {}      # class -> rows seen
+    seq = 0
+    total = 0
+    label_cols = {}  # input path -> its label column (files may have different schemas)
+    
+    for input_path in input_paths:
+        print(f"📖 Streaming {input_path}...")
+        col = None
+        for n_chunk, chunk in enumerate(_iter_chunks(input_path, chunksize)):
+            keys = rng.random(len(chunk))
+            total += len(chunk)
+            if stratify and n_chunk == 0:
+                col = label_cols[input_path] = _find_label_column(chunk.columns)
+                if col is None:
+                    print(f"⚠️  {input_path} has no label column; its rows count as {UNKNOWN_CLASS!r}")
+            if not stratify:
+                labels = np.full(len(chunk), "all")
+            else:
+                labels = label_keys(chunk[col]) if col else np.full(len(chunk), UNKNOWN_CLASS)
+            for label in np.unique(labels):
+                mask = labels == label
+                counts[label] = counts.get(label, 0) + int(mask.sum())
+                heap = heaps.setdefault(label, [])
+                # Only rows that can still enter a full reservoir are touched in Python
+                if len(heap) >= n_samples:
+                    mask &= keys < -heap[0][0]
+                for i in np.flatnonzero(mask):
+                    item = (-keys[i], seq, chunk.iloc[i].to_dict())
+                    seq += 1
+                    if len(heap) < n_samples:
+                        heapq.heappush(heap, item)
+                    elif keys[i] < -heap[0][0]:
+                        heapq.heapreplace(heap, item)
+    
+    print(f"📊 Rows read: {total:,}")
+    columns = sorted({c for c in label_cols.values() if c is not None})
+    if columns:
+        print(f"📈 Class distribution ({', '.join(columns)}): {dict(sorted(counts.items()))}")
+    
+    if class_ratio and columns and not set(class_ratio) & set(heaps):
+        print(f"⚠️  --class-ratio labels {sorted(class_ratio)} match none of {sorted(heaps)}")
+    targets = _allocate(n_samples, {c: len(h) for c, h in heaps.items()},
+                        class_ratio if columns else None)
+    rows = []
+    for label, heap in heaps.items():
+        # Smallest keys first, so any prefix is itself a uniform sample
+        keep = sorted(heap, key=lambda item: -item[0])[:targets[label]]
+        rows.extend((-neg_key, row) for neg_key, _, row in keep)
+    rows.sort(key=lambda item: item[0])  # deterministic shuffled order
+    sampled = pd.DataFrame([row for _, row in rows])
+    
+    print(f"✅ Sampled dataset size: {len(sampled):,} samples")
+    if columns:
+        print(f"📈 Sampled class distribution: {dict(sorted((c, n) for c, n in targets.items() if n))}")
+    _save(sampled, output_path)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Sample a dataset for training")
-    parser.add_argument("input", help="Input dataset path")
+    parser.add_argument("input", nargs="+", help="Input dataset path(s)")
     parser.add_argument("output", help="Output dataset path")
     parser.add_argument("-n", "--n-samples", type=int, default=10000,
                        help="Number of samples (default: 10000)")
     parser.add_argument("--no-stratify", action="store_true",
                        help="Don't maintain class balance")
+    parser.add_argument("--stream", action="store_true",
+                       help="Single pass with bounded memory (implied for multiple inputs)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--class-ratio", default=None,
+                       help="Target class ratio for --stream, e.g. '0=0.7,1=0.3' (default: equal)")
+    parser.add_argument("--chunksize", type=int, default=100_000,
+                       help="Rows per chunk for --stream (default: 100000)")
     
     args = parser.parse_args()
     
-    sample_dataset(
-        args.input,
-        args.output,
-        args.n_samples,
-        stratify=not args.no_stratify
-    )
+    if args.stream or len(args.input) > 1:
+        stream_sample_dataset(
+            args.input,
+            args.output,
+            args.n_samples,
+            stratify=not args.no_stratify,
+            seed=args.seed,
+            class_ratio=parse_class_ratio(args.class_ratio) if args.class_ratio else None,
+            chunksize=args.chunksize
+        )
+    else:
+        sample_dataset(
+            args.input[0],
+            args.output,
+            args.n_samples,
+            stratify=not args.no_stratify,
+            seed=args.seed
+        )
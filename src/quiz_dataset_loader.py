@@ -5,6 +5,7 @@ import os
 import random
 import pandas as pd
 import logging
+from ai_text_detector.datasets import map_labels
 
 logger = logging.getLogger(__name__)
 
@@ -52,29 +53,18 @@ class QuizDatasetLoader:
                     logger.warning(f"Could not find text or label column in {csv_file}")
                     continue
                 
-                # Normalize labels
-                def normalize_label(label):
-                    if pd.isna(label):
-                        return None
-                    label_str = str(label).strip().lower()
-                    if label_str in ['ai-generated', 'ai', 'machine', 'generated', 'gpt', 'llm', 'chatgpt', '1']:
-                        return 1  # AI-generated
-                    elif label_str in ['human-written', 'human', 'person', 'authored', 'real', '0']:
-                        return 0  # Human-written
-                    return None
+                # Normalize labels with the same rules as training; unknown labels are dropped
+                labels = map_labels(df[label_col], unknown=None)
+                texts = df[text_col].astype(str).str.strip()
+                keep = labels.notna() & (texts != "") & (texts != "nan")
                 
-                # Process rows
-                for idx, row in df.iterrows():
-                    text = str(row[text_col]).strip()
-                    label = normalize_label(row[label_col])
-                    
-                    if text and text != 'nan' and label is not None:
-                        all_samples.append({
-                            'id': len(all_samples),
-                            'text': text,
-                            'label': label,
-                            'label_name': self.class_names[label]
-                        })
+                for text, label in zip(texts[keep].tolist(), labels[keep].astype(int).tolist()):
+                    all_samples.append({
+                        'id': len(all_samples),
+                        'text': text,
+                        'label': label,
+                        'label_name': self.class_names[label]
+                    })
                 
                 logger.info(f"Loaded {len(df)} rows from {csv_file}")
                 
@@ -0,0 +1,43 @@
+"""
+Shared fixtures. Model-level tests build a tiny randomly initialized
+Desklib (DeBERTa-v2) detector with an in-memory word-level tokenizer, so
+nothing is downloaded; they are skipped when torch/transformers are missing.
+"""
+import os
+import sys
+import random
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+VOCAB_WORDS = [f"w{i}" for i in range(60)]
+
+def random_texts(n, min_words=1, max_words=40, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(VOCAB_WORDS) for _ in range(rng.randint(min_words, max_words)))
+            for _ in range(n)]
+
+@pytest.fixture(scope="session")
+def tiny_detector():
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import DebertaV2Config, PreTrainedTokenizerFast
+    from ai_text_detector.models import DesklibAIDetectionModel, DetectorModel
+
+    vocab = {"[PAD]": 0, "[UNK]": 1, **{w: i + 2 for i, w in enumerate(VOCAB_WORDS)}}
+    tok = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    tok.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=tok, pad_token="[PAD]", unk_token="[UNK]")
+    config = DebertaV2Config(
+        vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+        intermediate_size=64, max_position_embeddings=128, relative_attention=True,
+        position_buckets=16, pos_att_type=["p2c", "c2p"],
+    )
+    torch.manual_seed(0)
+    model = DesklibAIDetectionModel(config)
+    with torch.no_grad():
+        # Default init gives near-zero logits; spread them so differences show up
+        model.classifier.weight.normal_(0, 2.0)
+    model.eval()
+    return DetectorModel.from_parts(model, tokenizer, use_desklib=True, model_name="tiny-desklib")
@@ -0,0 +1,24 @@
+import os
+import json
+import pytest
+from conftest import random_texts
+
+def test_bundle_round_trip(tiny_detector, tmp_path):
+    from ai_text_detector.bundle import write_bundle, load_bundle
+    path = write_bundle(tiny_detector, str(tmp_path / "bundle"))
+    loaded = load_bundle(path)
+    texts = random_texts(6, 1, 20, seed=11)
+    assert loaded.predict_batch(texts, max_length=32) == pytest.approx(
+        tiny_detector.predict_batch(texts, max_length=32), abs=1e-6)
+
+def test_bundle_missing_weights_raise(tiny_detector, tmp_path):
+    from safetensors.torch import load_file, save_file
+    from ai_text_detector.bundle import write_bundle, load_bundle, WEIGHTS_NAME
+    path = write_bundle(tiny_detector, str(tmp_path / "bundle"))
+    weights = os.path.join(path, WEIGHTS_NAME)
+    state = load_file(weights)
+    dropped = next(k for k in state if k.startswith("classifier"))
+    del state[dropped]
+    save_file(state, weights)
+    with pytest.raises(ValueError, match="missing weights"):
+        load_bundle(path)
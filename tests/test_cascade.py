@@ -0,0 +1,60 @@
+import pytest
+from conftest import random_texts
+from ai_text_detector.models import CascadeDetector
+
+class FixedStage:
+    """First stage whose probability per text is given up front."""
+    def __init__(self, probs):
+        self.probs = probs
+
+    def predict(self, text, max_length=768, threshold=0.5):
+        p = self.probs[text]
+        return p, 1 if p >= threshold else 0
+
+    def predict_batch(self, texts, max_length=768, threshold=0.5, batch_size=16):
+        return [self.predict(t, max_length, threshold) for t in texts]
+
+def test_cascade_escalates_inside_the_band_only(tiny_detector):
+    texts = random_texts(6, 3, 20, seed=21)
+    first = dict(zip(texts, [0.02, 0.5, 0.95, 0.1, 0.9, 0.3]))
+    cascade = CascadeDetector(FixedStage(first), tiny_detector, low=0.1, high=0.9)
+    full = tiny_detector.predict_batch(texts, max_length=32)
+
+    results = cascade.predict_batch(texts, max_length=32)
+    inside = [1, 3, 4, 5]  # the band is inclusive
+    for i, (p, label) in enumerate(results):
+        if i in inside:
+            assert p == pytest.approx(full[i][0], abs=1e-6)
+        else:
+            assert (p, label) == (first[texts[i]], 1 if first[texts[i]] >= 0.5 else 0)
+    assert cascade.predict(texts[1], max_length=32)[0] == pytest.approx(full[1][0], abs=1e-6)
+    assert cascade.predict(texts[0], max_length=32) == (0.02, 0)
+
+    stats = cascade.stats()
+    assert (stats["texts"], stats["escalated"], stats["stage1_answered"]) == (8, 5, 3)
+
+def test_cascade_rejects_an_empty_band(tiny_detector):
+    with pytest.raises(ValueError):
+        CascadeDetector(FixedStage({}), tiny_detector, low=0.9, high=0.1)
+
+def test_length_escalation_rescoring_only_truncated_texts(tiny_detector):
+    from ai_text_detector.models import AdaptiveLengthDetector
+    short = random_texts(4, 2, 7, seed=22)     # fit in the 8-token prefix
+    long = random_texts(4, 12, 30, seed=23)    # truncated at 8 tokens
+    texts = short + long
+    prefix = tiny_detector.predict_batch(texts, max_length=8)
+    full = tiny_detector.predict_batch(texts, max_length=32)
+
+    # The band covers every probability, so every truncated text is uncertain
+    escalating = AdaptiveLengthDetector(tiny_detector, short_length=8, low=0.0, high=1.0)
+    results = escalating.predict_batch(texts, max_length=32)
+    assert [p for p, _ in results] == pytest.approx([p for p, _ in prefix[:4] + full[4:]], abs=1e-6)
+    stats = escalating.stats()
+    assert (stats["texts"], stats["escalated"]) == (8, 4)
+    assert stats["tokens"] == sum(len(t.split()) for t in short) + 4 * 8 + sum(len(t.split()) for t in long)
+
+    # A zero-width band: nothing is re-scored, long texts keep their prefix score
+    confident = AdaptiveLengthDetector(tiny_detector, short_length=8, low=0.5, high=0.5)
+    results = confident.predict_batch(texts, max_length=32)
+    assert [p for p, _ in results] == pytest.approx([p for p, _ in prefix], abs=1e-6)
+    assert confident.stats()["escalated"] == sum(p == 0.5 for p, _ in prefix)
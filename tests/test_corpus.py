@@ -0,0 +1,39 @@
+import os
+import pandas as pd
+from ai_text_detector.corpus import build_corpus, read_corpus, expand_inputs
+from ai_text_detector.download_data import file_sha256
+
+def test_sources_are_relative_paths(tmp_path):
+    root = tmp_path / "raw"
+    for sub, texts in (("a", ["one text", "shared text"]), ("b", ["shared text", "other text"])):
+        os.makedirs(root / sub)
+        pd.DataFrame({"text": texts, "label": ["human", "ai"]}).to_csv(root / sub / "data.csv", index=False)
+
+    assert [s for _, s in expand_inputs([str(root)])] == ["a/data.csv", "b/data.csv"]
+    manifest = build_corpus([str(root)], str(tmp_path / "corpus"), workers=1)
+    corpus = read_corpus(str(tmp_path / "corpus"))
+    assert sorted(corpus["source"].unique()) == ["a/data.csv", "b/data.csv"]
+    assert len(corpus) == 3
+    removed = {s["source"]: s["duplicates_removed"] for s in manifest["sources"]}
+    assert removed == {"a/data.csv": 0, "b/data.csv": 1}
+    assert manifest["sources"][0]["sha256"] == file_sha256(str(root / "a" / "data.csv"))
+
+def test_dataset_source_is_abstract(tmp_path):
+    import pytest
+    from ai_text_detector.download_data import DatasetSource, LocalDirectorySource
+    with pytest.raises(TypeError):
+        DatasetSource()
+    os.makedirs(tmp_path / "owner" / "set")
+    assert LocalDirectorySource(str(tmp_path)).fetch("owner/set") == str(tmp_path / "owner" / "set")
+
+def test_rebuild_inside_its_own_input_tree(tmp_path):
+    pd.DataFrame({"text": ["first text", "second text"], "label": [0, 1]}).to_csv(tmp_path / "data.csv", index=False)
+    out = str(tmp_path / "corpus")
+    build_corpus([str(tmp_path)], out, workers=1)
+    # The second run must not read the first run's shards or corpus.json
+    manifest = build_corpus([str(tmp_path)], out, workers=1)
+    assert [s["source"] for s in manifest["sources"]] == ["data.csv"]
+    assert manifest["rows"] == 2
+    # Nor a corpus written somewhere else in the tree
+    manifest = build_corpus([str(tmp_path)], str(tmp_path / "other"), workers=1)
+    assert [s["source"] for s in manifest["sources"]] == ["data.csv"]
@@ -0,0 +1,42 @@
+import numpy as np
+from ai_text_detector.dedup import find_near_duplicates, cross_split_duplicates
+
+def _corpus(n_base=200, n_planted=50, words=80, seed=0):
+    """Distinct random documents, then near-copies of some (one word changed, one appended)."""
+    rng = np.random.default_rng(seed)
+    base = [[f"t{w}" for w in rng.integers(0, 20_000, words)] for _ in range(n_base)]
+    texts = [" ".join(doc) for doc in base]
+    planted = {}
+    for src in rng.choice(n_base, n_planted, replace=False):
+        doc = list(base[src])
+        doc[rng.integers(words)] = "changed"
+        planted[len(texts)] = int(src)
+        texts.append(" ".join(doc + ["extra"]))
+    return texts, planted
+
+def test_planted_near_duplicates_are_found():
+    texts, planted = _corpus()
+    keep, pairs = find_near_duplicates(texts, threshold=0.8, workers=1)
+    found = {i: j for i, j, _ in pairs}
+    recall = sum(found.get(i) == src for i, src in planted.items()) / len(planted)
+    assert recall >= 0.95
+    # Nothing but the planted copies is dropped, and every original is kept
+    assert set(found) <= set(planted)
+    assert keep[:200].all()
+    assert all(sim >= 0.8 for _, _, sim in pairs)
+
+def test_cross_split_leaks_point_at_their_training_text():
+    texts, planted = _corpus(seed=1)
+    val = [texts[i] for i in planted] + ["a completely different validation text with its own words"]
+    leaks = cross_split_duplicates(texts[:200], val, threshold=0.8, workers=1)
+    sources = list(planted.values())
+    assert len(leaks) >= 0.95 * len(planted)
+    assert all(train_i == sources[val_i] for val_i, train_i, _ in leaks)
+    assert len(val) - 1 not in {val_i for val_i, _, _ in leaks}
+
+def test_worker_processes_match_a_single_process():
+    texts, _ = _corpus(n_base=60, n_planted=15, seed=2)
+    serial = find_near_duplicates(texts, threshold=0.8, batch_size=16, workers=1)
+    parallel = find_near_duplicates(texts, threshold=0.8, batch_size=16, workers=2)
+    assert serial[0].tolist() == parallel[0].tolist()
+    assert serial[1] == parallel[1]
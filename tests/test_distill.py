@@ -0,0 +1,45 @@
+import os
+import numpy as np
+import pytest
+from conftest import random_texts
+
+def test_shallow_student_trains_and_rejects_empty_corpus(tiny_detector):
+    from ai_text_detector.config import Config
+    from ai_text_detector.distill import build_student, train_student
+    cfg = Config(batch_size=4, max_length=32, distill_epochs=1, logging_steps=100, lr=1e-3)
+    texts = random_texts(8, 1, 20, seed=5)
+    logits = np.asarray(tiny_detector.logits_batch(texts, max_length=32), dtype=np.float32)
+
+    student = build_student(tiny_detector, "shallow", num_layers=1)
+    assert student.model.config.num_hidden_layers == 1
+    assert student.model is not tiny_detector.model
+    train_student(student, texts, logits, cfg)
+    assert len(student.predict_batch(texts, max_length=32)) == len(texts)
+
+    with pytest.raises(ValueError):
+        train_student(student, [], np.zeros(0, dtype=np.float32), cfg)
+
+def test_teacher_logit_cache_follows_the_weights(tiny_detector, tmp_path):
+    import copy
+    import torch
+    from ai_text_detector.distill import cached_teacher_logits
+    from ai_text_detector.scores import PlattCalibrator
+    texts = random_texts(6, 1, 20, seed=8)
+    cache = str(tmp_path)
+    first = cached_teacher_logits(tiny_detector, texts, cache, max_length=32)
+    assert len(os.listdir(cache)) == 1
+    assert cached_teacher_logits(tiny_detector, texts, cache, max_length=32).tolist() == first.tolist()
+    assert len(os.listdir(cache)) == 1
+
+    # Same name, retrained head: the old logits must not be reused
+    retrained = copy.deepcopy(tiny_detector)
+    with torch.no_grad():
+        retrained.model.classifier.weight.mul_(-1)
+    second = cached_teacher_logits(retrained, texts, cache, max_length=32)
+    assert retrained.model_name == tiny_detector.model_name
+    assert second.tolist() != first.tolist()
+    assert len(os.listdir(cache)) == 2
+
+    retrained.calibration = PlattCalibrator(2.0, 0.5)
+    third = cached_teacher_logits(retrained, texts, cache, max_length=32)
+    assert third == pytest.approx(second * 2.0 + 0.5, abs=1e-5)
@@ -0,0 +1,50 @@
+import os
+import copy
+import json
+import numpy as np
+import pytest
+from conftest import random_texts
+
+def _frame(texts):
+    pd = pytest.importorskip("pandas")
+    # Label texts by a word the tiny model can see, so a head can learn it
+    return pd.DataFrame({"text": texts, "label": [int("w1" in t.split()) for t in texts]})
+
+def test_cache_resume_and_head_written_back(tiny_detector, tmp_path):
+    torch = pytest.importorskip("torch")
+    from ai_text_detector.embeddings import build_embeddings, load_embeddings, fit_head, write_head, head_logits
+    from ai_text_detector.models import DetectorModel
+    from ai_text_detector.scores import PlattCalibrator, CALIBRATION_NAME
+
+    df = _frame(random_texts(30, 1, 20, seed=3))
+    cache = str(tmp_path / "emb")
+    meta = build_embeddings(tiny_detector, df, cache, max_length=32, batch_size=4, flush_every=2)
+    X, labels, splits, _ = load_embeddings(cache)
+    assert X.shape == (30, tiny_detector.model.config.hidden_size) and X.dtype == np.float16
+    with torch.no_grad():
+        enc = tiny_detector.tokenizer([df["text"][7]], return_tensors="pt")
+        direct = tiny_detector.model.embed(enc["input_ids"], enc["attention_mask"]).numpy()[0]
+    np.testing.assert_allclose(X[7], direct, rtol=1e-2, atol=1e-2)
+
+    # Pretend the run stopped halfway: only the remaining rows are recomputed
+    meta["rows_done"] = 12
+    with open(os.path.join(cache, "embeddings.json"), "w") as f:
+        json.dump(meta, f)
+    before = np.array(X)
+    build_embeddings(tiny_detector, df, cache, max_length=32, batch_size=4)
+    np.testing.assert_allclose(load_embeddings(cache)[0], before, atol=1e-3)
+
+    out = tmp_path / "model"
+    out.mkdir()
+    PlattCalibrator(3.0, 1.0).save(str(out))  # stale fit from an earlier head
+    w, b = fit_head(X, labels, np.arange(len(labels)), method="linear")
+    # A copy, so the session-wide fixture keeps its own head
+    detector = DetectorModel.from_parts(copy.deepcopy(tiny_detector.model), tiny_detector.tokenizer, True, "tiny")
+    write_head(detector, w, b).save(str(out))
+    assert not (out / CALIBRATION_NAME).exists()
+
+    reloaded = DetectorModel.load(str(out))
+    assert reloaded.calibration is None
+    probs = np.array([reloaded.predict(t, max_length=32)[0] for t in df["text"]])
+    expected = 1 / (1 + np.exp(-head_logits(X, w, b)))
+    np.testing.assert_allclose(probs, expected, atol=1e-2)
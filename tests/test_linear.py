@@ -0,0 +1,37 @@
+from conftest import random_texts
+from ai_text_detector.linear import LinearDetector
+
+def test_predict_is_stable_for_extreme_logits():
+    texts = random_texts(20, 3, 12, seed=2)
+    model = LinearDetector(n_features=2**10).fit(texts, [i % 2 for i in range(20)])
+    for intercept, expected in ((1e4, (1.0, 1)), (-1e4, (0.0, 0))):
+        model.intercept = intercept
+        assert model.predict(texts[0]) == expected
+        assert model.predict_batch(texts[:3]) == [expected] * 3
+
+_NO_TORCH_SCRIPT = """
+import sys
+from ai_text_detector.cli import main
+for argv in (["eval", "--config", sys.argv[3], "--model-path", sys.argv[1], "--data", sys.argv[2]],
+             ["predict", "--model-path", sys.argv[1], "--text", "w1 w2 w3"]):
+    sys.argv = ["ai-detector"] + argv
+    main()
+print("TORCH_IMPORTED", "torch" in sys.modules)
+"""
+
+def test_cli_serves_linear_models_without_torch(tmp_path):
+    import os
+    import subprocess
+    import sys
+    import pandas as pd
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    texts = random_texts(20, 3, 12, seed=6)
+    model_dir = str(tmp_path / "linear")
+    LinearDetector(n_features=2**10).fit(texts, [i % 2 for i in range(20)]).save(model_dir)
+    data = tmp_path / "data.csv"
+    pd.DataFrame({"text": texts, "label": [i % 2 for i in range(20)]}).to_csv(data, index=False)
+    result = subprocess.run([sys.executable, "-c", _NO_TORCH_SCRIPT, model_dir, str(data),
+                             os.path.join(root, "configs", "default.yaml")],
+                            cwd=str(tmp_path), capture_output=True, text=True, env={**os.environ, "PYTHONPATH": root})
+    assert result.returncode == 0, result.stderr
+    assert "TORCH_IMPORTED False" in result.stdout
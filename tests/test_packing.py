@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from ai_text_detector.packing import pack_lengths, build_packed_batch
+from conftest import random_texts
+
+def test_pack_lengths_respects_capacity_and_keeps_every_text():
+    lengths = [5, 30, 7, 12, 1, 9, 24, 3]
+    packs = pack_lengths(lengths, 24)
+    assert sorted(i for p in packs for i in p) == list(range(len(lengths)))
+    for pack in packs:
+        # A text longer than the capacity gets a pack of its own
+        assert sum(lengths[i] for i in pack) <= 24 or len(pack) == 1
+
+def test_block_mask_separates_segments():
+    torch = pytest.importorskip("torch")
+    input_ids, token_mask, block_mask, position_ids, segments = build_packed_batch(
+        [[5, 6, 7], [8, 9], [10]], [[0, 1], [2]], pad_token_id=0)
+    assert input_ids.shape == (2, 5)
+    assert position_ids[0].tolist() == [0, 1, 2, 0, 1]
+    assert segments[1].tolist() == [2, -1, -1, -1, -1]
+    assert token_mask[1].tolist() == [1, 0, 0, 0, 0]
+    assert block_mask[0, 0].tolist() == [1, 1, 1, 0, 0]
+    assert block_mask[0, 4].tolist() == [0, 0, 0, 1, 1]
+    assert not block_mask[1, 1].any()
+
+def test_packed_matches_predict(tiny_detector):
+    # Mixed lengths: many short texts share packs, the longest exceed pack_length
+    texts = random_texts(40, 1, 40, seed=1)
+    max_length, pack_length = 32, 24
+    lengths = [len(ids) for ids in tiny_detector.tokenizer(texts, truncation=True, max_length=max_length)["input_ids"]]
+    packs = pack_lengths(lengths, pack_length)
+    assert any(len(p) > 1 for p in packs)
+    assert any(lengths[p[0]] > pack_length for p in packs if len(p) == 1)
+
+    reference = np.array([tiny_detector.predict(t, max_length=max_length)[0] for t in texts])
+    packed = np.array([p for p, _ in tiny_detector.predict_packed(texts, max_length=max_length,
+                                                                  pack_length=pack_length, packs_per_batch=3)])
+    assert reference.std() > 0.01  # the check would be vacuous on constant outputs
+    np.testing.assert_allclose(packed, reference, atol=1e-5)
+
+def test_padded_batch_matches_predict(tiny_detector):
+    texts = random_texts(10, 1, 40, seed=2)
+    reference = np.array([tiny_detector.predict(t, max_length=32)[0] for t in texts])
+    batched = np.array([p for p, _ in tiny_detector.predict_batch(texts, max_length=32, batch_size=4)])
+    np.testing.assert_allclose(batched, reference, atol=1e-5)
@@ -0,0 +1,23 @@
+import os
+import pytest
+
+torch = pytest.importorskip("torch")
+from ai_text_detector.profiling import StepProfiler
+
+def _run(profiler, steps):
+    with profiler:
+        for _ in range(steps):
+            torch.ones(64, 64) @ torch.ones(64, 64)
+            profiler.step()
+
+def test_single_step_run_is_still_traced(tmp_path):
+    _run(StepProfiler(str(tmp_path), wait=1, warmup=1, active=5, expected_steps=1), 1)
+    assert os.path.isfile(tmp_path / "trace.json")
+    assert os.path.isfile(tmp_path / "ops_by_cpu.txt")
+
+def test_run_without_trace_says_so(tmp_path, capsys):
+    _run(StepProfiler(str(tmp_path), wait=1, warmup=1, active=5), 1)
+    out = capsys.readouterr().out
+    assert not os.path.exists(tmp_path / "trace.json")
+    assert os.path.isfile(tmp_path / "rss_timeline.csv")
+    assert "No trace recorded" in out and "Profile written" not in out
@@ -0,0 +1,51 @@
+import os
+import importlib.util
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_spec = importlib.util.spec_from_file_location("sample_dataset", os.path.join(ROOT, "scripts", "sample_dataset.py"))
+sample_dataset = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sample_dataset)
+
+def test_label_spellings_share_a_class():
+    assert list(sample_dataset.label_keys([1, 0.0, "1", "AI", "human", "other", "x"])) == \
+        ["1", "0", "1", "1", "0", "unknown", "unknown"]
+    assert sample_dataset.parse_class_ratio("human=0.7,ai=0.3") == {"0": 0.7, "1": 0.3}
+
+def test_stream_sampling_stratifies_across_chunks(tmp_path):
+    # Chunk types differ: the first file's labels read as ints, the second's as words
+    pd.DataFrame({"text": [f"a{i}" for i in range(40)], "label": [i % 2 for i in range(40)]}).to_csv(
+        tmp_path / "one.csv", index=False)
+    pd.DataFrame({"text": [f"b{i}" for i in range(40)], "label": ["ai", "human"] * 20}).to_csv(
+        tmp_path / "two.csv", index=False)
+    out = tmp_path / "sample.csv"
+    sample_dataset.stream_sample_dataset([str(tmp_path / "one.csv"), str(tmp_path / "two.csv")], str(out),
+                                         n_samples=20, class_ratio={"0": 0.75, "1": 0.25}, chunksize=7)
+    sampled = pd.read_csv(out)
+    assert len(sampled) == 20
+    counts = pd.Series(sample_dataset.label_keys(sampled["label"])).value_counts().to_dict()
+    assert counts == {"0": 15, "1": 5}
+
+def test_label_column_is_detected_per_file(tmp_path):
+    # The first file labels with "label", the second with "target"
+    pd.DataFrame({"text": [f"a{i}" for i in range(20)], "label": [i % 2 for i in range(20)]}).to_csv(
+        tmp_path / "one.csv", index=False)
+    pd.DataFrame({"text": [f"b{i}" for i in range(20)], "target": ["ai"] * 20,
+                  "notes": [f"note {i}" for i in range(20)]}).to_csv(tmp_path / "two.csv", index=False)
+    out = tmp_path / "sample.csv"
+    sample_dataset.stream_sample_dataset([str(tmp_path / "one.csv"), str(tmp_path / "two.csv")], str(out),
+                                         n_samples=40, chunksize=7)
+    sampled = pd.read_csv(out)
+    ai = sampled["text"].str.startswith("b") | (sampled["label"] == 1)
+    assert len(sampled) == 40
+    assert int(ai.sum()) == 30  # 10 from the first file, all 20 from the second
+
+def test_unknown_labels_share_one_reservoir(tmp_path):
+    pd.DataFrame({"text": [f"t{i}" for i in range(30)],
+                  "label": [f"category {i}" for i in range(28)] + ["ai", "human"]}).to_csv(
+        tmp_path / "data.csv", index=False)
+    out = tmp_path / "sample.csv"
+    sample_dataset.stream_sample_dataset([str(tmp_path / "data.csv")], str(out), n_samples=6, chunksize=5)
+    keys = sample_dataset.label_keys(pd.read_csv(out)["label"])
+    assert sorted(set(keys)) == ["0", "1", "unknown"]
+    assert len(keys) == 6
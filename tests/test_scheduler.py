@@ -0,0 +1,84 @@
+import time
+import threading
+from collections import OrderedDict
+from ai_text_detector.scheduler import PriorityScheduler
+
+class GatedDetector:
+    """Records each batch; the first call blocks until `gate` is set."""
+    def __init__(self):
+        self.batches = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def predict_batch(self, texts, max_length=None, threshold=0.5, batch_size=None):
+        self.batches.append(list(texts))
+        self.started.set()
+        self.gate.wait(5)
+        return [(0.9 if t.startswith("i") else 0.1, 0) for t in texts]
+
+def _hold_first_batch(scheduler, detector, bulk):
+    future = scheduler.submit(bulk, "bulk")
+    assert detector.started.wait(5)
+    return future
+
+def test_interactive_preempts_bulk_at_the_next_batch():
+    detector = GatedDetector()
+    scheduler = PriorityScheduler(detector, max_batch_size=4)
+    bulk = _hold_first_batch(scheduler, detector, [f"b{i}" for i in range(12)])
+    first = scheduler.submit(["i0"], "interactive")
+    second = scheduler.submit(["i1", "i2"], "interactive")
+    detector.gate.set()
+    assert first.result(5) == [(0.9, 1)]
+    assert second.result(5) == [(0.9, 1), (0.9, 1)]
+    assert len(bulk.result(5)) == 12
+    # Queued interactive requests are micro-batched into the very next model call
+    assert detector.batches == [["b0", "b1", "b2", "b3"], ["i0", "i1", "i2"],
+                                ["b4", "b5", "b6", "b7"], ["b8", "b9", "b10", "b11"]]
+    assert scheduler.stats()["interactive"]["completed"] == 2
+    scheduler.close()
+
+def test_overdue_bulk_gets_one_batch_then_yields():
+    detector = GatedDetector()
+    classes = OrderedDict([("interactive", 60.0), ("bulk", 0.05)])
+    scheduler = PriorityScheduler(detector, classes=classes, max_batch_size=2)
+    interactive = scheduler.submit([f"i{i}" for i in range(8)], "interactive")
+    assert detector.started.wait(5)
+    bulk = scheduler.submit(["b0", "b1", "b2", "b3"], "bulk")
+    time.sleep(0.1)  # bulk is now past its target
+    detector.gate.set()
+    interactive.result(5), bulk.result(5)
+    # One batch for the overdue bulk job, then its wait restarts and interactive work resumes
+    assert detector.batches == [["i0", "i1"], ["b0", "b1"], ["i2", "i3"], ["i4", "i5"], ["i6", "i7"], ["b2", "b3"]]
+    scheduler.close()
+
+def test_long_bulk_job_does_not_starve_interactive():
+    class SlowDetector:
+        def predict_batch(self, texts, max_length=None, threshold=0.5, batch_size=None):
+            time.sleep(0.01)
+            return [(0.5, 1)] * len(texts)
+
+    classes = OrderedDict([("interactive", 0.5), ("bulk", 0.2)])
+    scheduler = PriorityScheduler(SlowDetector(), classes=classes, max_batch_size=4)
+    bulk = scheduler.submit([f"b{i}" for i in range(400)], "bulk")  # ~1 s of model time
+    latencies = []
+    time.sleep(0.3)  # well past the bulk target before interactive traffic starts
+    while not bulk.done():
+        t0 = time.perf_counter()
+        scheduler.predict("i")
+        latencies.append(time.perf_counter() - t0)
+        time.sleep(0.02)
+    assert len(bulk.result(5)) == 400
+    assert len(latencies) >= 5
+    # At most a batch in flight plus the occasional overdue bulk batch, not the rest of the job
+    assert max(latencies) < 0.1
+    scheduler.close()
+
+def test_errors_reach_every_job_in_the_batch():
+    class Failing:
+        def predict_batch(self, texts, **kwargs):
+            raise RuntimeError("boom")
+    scheduler = PriorityScheduler(Failing(), max_batch_size=8)
+    futures = [scheduler.submit(["x"], "interactive") for _ in range(3)]
+    for f in futures:
+        assert isinstance(f.exception(5), RuntimeError)
+    scheduler.close()
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from ai_text_detector.scores import (PlattCalibrator, save_calibration, load_calibration, threshold_sweep,
+                                     metrics_at, roc_pr, write_scores, read_scores)
+
+def _labels_and_probs(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, n)
+    # Rounded so that ties between thresholds occur
+    p = np.round(np.clip(0.35 * y + rng.random(n) * 0.65, 0, 1), 2)
+    return y, p
+
+def test_platt_round_trip(tmp_path):
+    calibration = PlattCalibrator(1.7, -0.4, meta={"fitted_on_rows": 10})
+    save_calibration(calibration, str(tmp_path))
+    loaded = load_calibration(str(tmp_path))
+    assert (loaded.a, loaded.b, loaded.meta) == (1.7, -0.4, {"fitted_on_rows": 10})
+    p = np.linspace(0.01, 0.99, 50)
+    assert loaded.apply(p) == pytest.approx(calibration.apply(p))
+    save_calibration(None, str(tmp_path))
+    assert load_calibration(str(tmp_path)) is None
+
+def test_then_composes_in_order():
+    first, second = PlattCalibrator(2.0, 0.5), PlattCalibrator(0.3, -1.2)
+    logits = np.linspace(-8, 8, 33)
+    assert first.then(second).apply_logits(logits) == pytest.approx(second.apply_logits(first.apply_logits(logits)))
+    assert first.then(second).apply_logits(logits) != pytest.approx(second.then(first).apply_logits(logits))
+
+def test_fit_recovers_a_known_calibration():
+    rng = np.random.default_rng(1)
+    logits = rng.normal(0, 2, 20_000)
+    y = rng.random(len(logits)) < 1 / (1 + np.exp(-(0.5 * logits + 0.8)))
+    fitted = PlattCalibrator.fit(y, 1 / (1 + np.exp(-logits)))
+    assert fitted.a == pytest.approx(0.5, abs=0.05)
+    assert fitted.b == pytest.approx(0.8, abs=0.05)
+
+def test_sweep_matches_brute_force():
+    y, p = _labels_and_probs()
+    sweep = threshold_sweep(y, p)
+    assert list(sweep["thresholds"]) == sorted(set(p), reverse=True)
+    for i, t in enumerate(sweep["thresholds"]):
+        m = metrics_at(y, p, t)
+        assert [[sweep["tn"][i], sweep["fp"][i]], [sweep["fn"][i], sweep["tp"][i]]] == m["confusion"]
+        assert sweep["f1_macro"][i] == pytest.approx(m["f1_macro"])
+        assert sweep["accuracy"][i] == pytest.approx(m["accuracy"])
+
+def test_auc_and_average_precision_match_sklearn():
+    metrics = pytest.importorskip("sklearn.metrics")
+    y, p = _labels_and_probs(seed=2)
+    curves = roc_pr(threshold_sweep(y, p))
+    assert curves["roc_auc"] == pytest.approx(metrics.roc_auc_score(y, p))
+    assert curves["average_precision"] == pytest.approx(metrics.average_precision_score(y, p))
+
+def test_score_file_round_trip(tmp_path):
+    y, p = _labels_and_probs(n=20)
+    path = write_scores(str(tmp_path / "scores.parquet"), p, labels=y,
+                        texts=[f"text {i}" for i in range(20)], meta={"model": "m"})
+    cols, meta = read_scores(path)
+    assert cols["probability"].tolist() == p.tolist()
+    assert cols["label"].tolist() == y.tolist()
+    assert (meta["model"], meta["rows"]) == ("m", 20)
+
+def test_score_rows_rescores_only_new_or_changed_rows(tmp_path):
+    import pandas as pd
+    pytest.importorskip("torch")
+    from ai_text_detector.evaluate import score_rows
+    path = str(tmp_path / "scores.parquet")
+    calls = []
+
+    def score_fn(texts):
+        calls.append(list(texts))
+        return [len(t) / 100 for t in texts]
+
+    df = pd.DataFrame({"text": [f"text number {i}" for i in range(10)], "label": [i % 2 for i in range(10)]})
+    first = score_rows(df, score_fn, path, {"fingerprint": "f1"})
+    df.loc[3, "text"] = "an edited text"
+    grown = pd.concat([df, pd.DataFrame({"text": ["a new row"], "label": [1]})], ignore_index=True)
+    second = score_rows(grown, score_fn, path, {"fingerprint": "f1"})
+    assert calls[1] == ["an edited text", "a new row"]
+    assert second[:3].tolist() == first[:3].tolist()
+    assert second.tolist() == [len(t) / 100 for t in grown["text"]]
+
+    # Another fingerprint (a different model or max_length) rescores everything
+    score_rows(grown, score_fn, path, {"fingerprint": "f2"})
+    assert len(calls[2]) == len(grown)
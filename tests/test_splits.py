@@ -0,0 +1,27 @@
+import os
+import numpy as np
+import pandas as pd
+from conftest import random_texts
+from ai_text_detector.splits import TRAIN, VAL, SplitIndex, dataset_splits, split_index_path, text_keys
+
+def test_appending_rows_keeps_existing_assignments(tmp_path):
+    data_path = str(tmp_path / "data.csv")
+    texts = [f"{t} #{i}" for i, t in enumerate(random_texts(2000, 3, 15, seed=3))]
+    first = pd.DataFrame({"text": texts[:1500]})
+    before = dataset_splits(first, data_path, val_fraction=0.2, seed=7)
+    assert os.path.exists(split_index_path(data_path))
+    assert abs((before == VAL).mean() - 0.2) < 0.04
+
+    # Appended rows, shuffled order, and a different config: old rows keep their split
+    grown = pd.DataFrame({"text": texts}).sample(frac=1.0, random_state=0)
+    after = dataset_splits(grown, data_path, val_fraction=0.5, seed=99)
+    lookup = dict(zip(grown["text"], after))
+    assert [lookup[t] for t in first["text"]] == before.tolist()
+    assert set(np.unique(after)) <= {TRAIN, VAL}
+
+def test_identical_texts_share_a_split():
+    index = SplitIndex(val_fraction=0.5, seed=1)
+    texts = random_texts(200, 3, 10, seed=4)
+    splits = index.assign(text_keys(texts + texts))
+    assert (splits[:200] == splits[200:]).all()
+    assert len(index) == len(set(texts))